@@ -0,0 +1,82 @@
+"""
+Measure record <-> TodoItem conversion throughput.
+
+Compares the shared codec (_decode_todo/_encode_todo) with the per-call
+code TodoManager used before: copy the record, look enums up by value and
+call TodoItem(**record) to decode; build a dict literal from the public
+attributes to encode. Usage:
+
+    python benchmarks/bench_codec.py [--size 100000] [--repeat 3]
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from bench_storage import make_records  # noqa: E402
+from models import Priority, Status, TodoItem, _decode_todo, _encode_todo  # noqa: E402
+
+
+def legacy_decode(record: dict) -> TodoItem:
+    todo_dict = record.copy()
+    todo_dict["priority"] = Priority(record["priority"])
+    todo_dict["status"] = Status(record["status"])
+    return TodoItem(**todo_dict)
+
+
+def legacy_encode(todo: TodoItem) -> dict:
+    return {
+        "id": todo.id,
+        "title": todo.title,
+        "details": todo.details,
+        "priority": todo.priority.value,
+        "status": todo.status.value,
+        "owner": todo.owner,
+        "created_at": todo.created_at,
+        "updated_at": todo.updated_at,
+    }
+
+
+def records_per_second(func, items: list, repeat: int) -> float:
+    """Return the best throughput of ``func`` mapped over ``items``."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for item in items:
+            func(item)
+        best = min(best, time.perf_counter() - start)
+    return len(items) / best
+
+
+def main():
+    """Run the benchmark and print records/sec for each path."""
+    parser = argparse.ArgumentParser(description="Record codec benchmark")
+    parser.add_argument("--size", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    records = make_records(args.size)
+    # Half the todos have been edited since they were created
+    edited = datetime.utcnow().isoformat()
+    for record in records[::2]:
+        record["updated_at"] = edited
+    todos = [_decode_todo(record) for record in records]
+    cases = [
+        ("decode", "legacy", legacy_decode, records),
+        ("decode", "codec", _decode_todo, records),
+        ("encode", "legacy", legacy_encode, todos),
+        ("encode", "codec", _encode_todo, todos),
+    ]
+
+    print(f"{'direction':<10} {'path':<7} {'records/sec':>12}")
+    for direction, path, func, items in cases:
+        rate = records_per_second(func, items, args.repeat)
+        print(f"{direction:<10} {path:<7} {rate:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
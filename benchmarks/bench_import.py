@@ -0,0 +1,88 @@
+"""
+Report TodoManager.import_stream/export_stream throughput and peak memory.
+
+For each size an input file of that many todos is written, imported into a
+fresh store and exported again, once timed and once under tracemalloc. The
+peak should stay flat as the size grows (for stores that don't load every
+todo into memory on a write, such as sqlite). Usage:
+
+    python benchmarks/bench_import.py [--sizes 10000 100000] [--format jsonl]
+        [--storage sqlite] [--chunk-size 1000]
+"""
+
+import argparse
+import csv
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from models import STORAGE_BACKENDS, TRANSFER_FORMATS, TodoManager  # noqa: E402
+
+
+def write_input(path: str, count: int, format: str):
+    """Write ``count`` todos without ids or timestamps to ``path``."""
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        if format == "csv":
+            writer.writerow(["title", "details", "priority", "status", "owner"])
+        for i in range(count):
+            row = {
+                "title": f"Todo {i}",
+                "details": "Benchmark item",
+                "priority": random.choice(["HIGH", "MID", "LOW"]),
+                "status": random.choice(["PENDING", "COMPLETED"]),
+                "owner": f"user{i % 100}",
+            }
+            if format == "csv":
+                writer.writerow(row.values())
+            else:
+                f.write(json.dumps(row) + "\n")
+
+
+def transfer(data_dir: str, path: str, args) -> tuple[float, float]:
+    """Import ``path`` into a fresh store and export it; return both times."""
+    manager = TodoManager(data_dir=data_dir, storage=args.storage, durability="none")
+    start = time.perf_counter()
+    with open(path, newline="") as f:
+        manager.import_stream(f, args.format, chunk_size=args.chunk_size)
+    imported = time.perf_counter()
+    with open(os.path.join(data_dir, "export"), "w", newline="") as f:
+        manager.export_stream(f, args.format)
+    return imported - start, time.perf_counter() - imported
+
+
+def main():
+    """Run every size and print a table."""
+    parser = argparse.ArgumentParser(description="Bulk import/export benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--format", default="jsonl", choices=TRANSFER_FORMATS)
+    parser.add_argument("--storage", default="sqlite", choices=sorted(STORAGE_BACKENDS))
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    print(f"{'todos':>8} {'import/s':>10} {'export/s':>10} {'peak MiB':>9}")
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, f"input.{args.format}")
+            write_input(path, size, args.format)
+            os.mkdir(os.path.join(tmp, "timed"))
+            import_time, export_time = transfer(os.path.join(tmp, "timed"), path, args)
+            os.mkdir(os.path.join(tmp, "traced"))
+            tracemalloc.start()
+            transfer(os.path.join(tmp, "traced"), path, args)
+            peak = tracemalloc.get_traced_memory()[1] / 2**20
+            tracemalloc.stop()
+        print(
+            f"{size:>8} {size / import_time:>10.0f} "
+            f"{size / export_time:>10.0f} {peak:>9.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Compare the JSON codecs on todos.json size and save/load latency.
+
+Every installed codec in JSON_CODECS is run in pretty and compact mode
+against the same N records through JsonTodoStorage. Usage:
+
+    python benchmarks/bench_json_codec.py [--size 100000] [--repeat 3]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from bench_storage import make_records  # noqa: E402
+from models import JSON_CODECS, JsonTodoStorage, get_json_codec  # noqa: E402
+
+
+def best_millis(func, repeat: int) -> float:
+    """Return the fastest of ``repeat`` calls to ``func()`` in milliseconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    """Run the benchmark and print a table per codec and layout."""
+    parser = argparse.ArgumentParser(description="JSON codec benchmark")
+    parser.add_argument("--size", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    records = make_records(args.size)
+    print(f"{'codec':<8} {'layout':<8} {'file MiB':>9} {'save ms':>9} {'load ms':>9}")
+    for name in JSON_CODECS:
+        for pretty in (True, False):
+            with tempfile.TemporaryDirectory() as data_dir:
+                storage = JsonTodoStorage(
+                    data_dir,
+                    durability="none",
+                    codec=get_json_codec(name, pretty),
+                )
+                save = best_millis(lambda: storage.save(records), args.repeat)
+                load = best_millis(storage.load, args.repeat)
+                size = os.path.getsize(storage.todos_file_path) / 2**20
+            layout = "pretty" if pretty else "compact"
+            print(f"{name:<8} {layout:<8} {size:>9.1f} {save:>9.1f} {load:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
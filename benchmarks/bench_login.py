@@ -0,0 +1,70 @@
+"""
+Report AuthManager.login latency and throughput at each password cost level.
+
+For every scheme and cost setting a user is signed up in a fresh data
+directory and logged in repeatedly, so the numbers include reading the user
+store. The legacy unsalted SHA-256 row is the old baseline. Usage:
+
+    python benchmarks/bench_login.py [--logins 20]
+"""
+
+import argparse
+import hashlib
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from models import AuthManager  # noqa: E402
+
+COST_LEVELS = [
+    ("scrypt", {"n": 2**12, "r": 8, "p": 1}),
+    ("scrypt", {"n": 2**13, "r": 8, "p": 1}),
+    ("scrypt", {"n": 2**14, "r": 8, "p": 1}),
+    ("scrypt", {"n": 2**15, "r": 8, "p": 1}),
+    ("scrypt", {"n": 2**16, "r": 8, "p": 1}),
+    ("pbkdf2_sha256", {"iterations": 50_000}),
+    ("pbkdf2_sha256", {"iterations": 200_000}),
+    ("pbkdf2_sha256", {"iterations": 600_000}),
+]
+
+
+def time_logins(auth_manager: AuthManager, logins: int) -> tuple[float, float]:
+    """Return (mean ms per login, logins per second) for ``logins`` logins."""
+    start = time.perf_counter()
+    for _ in range(logins):
+        ok, message = auth_manager.login("bench", "bench-password")
+        assert ok, message
+    elapsed = time.perf_counter() - start
+    return elapsed / logins * 1000, logins / elapsed
+
+
+def main():
+    """Run the benchmark and print a table of the cost levels."""
+    parser = argparse.ArgumentParser(description="Login cost benchmark")
+    parser.add_argument("--logins", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'scheme':<14} {'params':<28} {'ms/login':>9} {'logins/s':>9}")
+    with tempfile.TemporaryDirectory() as data_dir:
+        auth_manager = AuthManager(data_dir=data_dir, kdf="pbkdf2_sha256")
+        legacy = hashlib.sha256(b"bench-password").hexdigest()
+        auth_manager.storage.insert("bench", {"password": legacy})
+        # Compare against the legacy hash without upgrading it
+        auth_manager._needs_rehash = lambda user: False
+        millis, rate = time_logins(auth_manager, args.logins)
+        print(f"{'sha256':<14} {'(legacy, unsalted)':<28} {millis:>9.2f} {rate:>9.0f}")
+
+    for kdf, params in COST_LEVELS:
+        with tempfile.TemporaryDirectory() as data_dir:
+            auth_manager = AuthManager(data_dir=data_dir, kdf=kdf, kdf_params=params)
+            auth_manager.sign_up("bench", "bench-password")
+            millis, rate = time_logins(auth_manager, args.logins)
+        label = ", ".join(f"{key}={value}" for key, value in params.items())
+        print(f"{kdf:<14} {label:<28} {millis:>9.2f} {rate:>9.0f}")
+
+
+if __name__ == "__main__":
+    main()
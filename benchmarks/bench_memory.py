@@ -0,0 +1,67 @@
+"""
+Measure peak memory of reading todos.json eagerly versus streaming it.
+
+Each size is written to a fresh todos.json and read three ways under
+tracemalloc: get_all_todos (the whole list of TodoItems), iterating
+iter_todos, and iterating iter_todos for one owner. The streaming peaks
+should stay flat as the file grows. Usage:
+
+    python benchmarks/bench_memory.py [--sizes 10000 100000 1000000]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from bench_storage import OWNERS, make_records  # noqa: E402
+from models import JsonTodoStorage, TodoManager  # noqa: E402
+
+
+def peak_bytes(func) -> int:
+    """Return the peak traced allocation while ``func()`` runs."""
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def drain(iterator):
+    """Consume an iterator without keeping its items."""
+    for _ in iterator:
+        pass
+
+
+def main():
+    """Run the benchmark and print a table of peak memory."""
+    parser = argparse.ArgumentParser(description="Streaming reader memory benchmark")
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000]
+    )
+    args = parser.parse_args()
+
+    print(f"{'size':>9} {'file MiB':>9} {'reader':<22} {'peak MiB':>9}")
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as data_dir:
+            JsonTodoStorage(data_dir, durability="none").save(make_records(size))
+            manager = TodoManager(data_dir=data_dir)
+            file_mib = os.path.getsize(manager.todos_file_path) / 2**20
+            readers = {
+                "get_all_todos": manager.get_all_todos,
+                "iter_todos": lambda: drain(manager.iter_todos()),
+                "iter_todos(owner=...)": lambda: drain(
+                    manager.iter_todos(owner=f"user{OWNERS // 2}")
+                ),
+            }
+            for name, reader in readers.items():
+                peak = peak_bytes(reader) / 2**20
+                print(f"{size:>9} {file_mib:>9.1f} {name:<22} {peak:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Time full-text search lookups against a large SearchIndex.
+
+Builds the index from N synthetic records spread over a pool of owners,
+then times single-term, prefix and multi-term lookups for random owners.
+Only the index lookup is timed; fetching the matching todos from storage
+is a separate cost proportional to the number of hits. Usage:
+
+    python benchmarks/bench_search.py [--size 1000000] [--queries 1000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from bench_storage import OWNERS, make_records  # noqa: E402
+from models import SearchIndex  # noqa: E402
+
+WORDS = (
+    "buy groceries milk eggs bread call mom dentist appointment report draft "
+    "review pull request deploy server fix bug write tests plan sprint book "
+    "flight hotel pay rent invoice email team meeting notes clean kitchen"
+).split()
+
+
+def main():
+    """Build the index and print the mean latency per kind of query."""
+    parser = argparse.ArgumentParser(description="Search index benchmark")
+    parser.add_argument("--size", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=1000)
+    args = parser.parse_args()
+
+    records = make_records(args.size)
+    for i, record in enumerate(records):
+        record["title"] = " ".join(random.sample(WORDS, 3)) + f" item{i}"
+        record["details"] = " ".join(random.sample(WORDS, 5))
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        index = SearchIndex(data_dir)
+        start = time.perf_counter()
+        index.build(records)
+        print(f"built index of {args.size} todos in {time.perf_counter() - start:.1f}s")
+        del records
+
+        def random_owner() -> str:
+            return f"user{random.randrange(OWNERS)}"
+
+        def unique_word() -> tuple[str, str]:
+            i = random.randrange(args.size)
+            return f"user{i % OWNERS}", f"item{i}"
+
+        kinds = {
+            "term": lambda: (random_owner(), random.choice(WORDS)),
+            "prefix": lambda: (random_owner(), random.choice(WORDS)[:3]),
+            "two terms": lambda: (random_owner(), " ".join(random.sample(WORDS, 2))),
+            "unique word": unique_word,
+        }
+        print(f"{'query':<12} {'mean ms':>9} {'mean hits':>10}")
+        for kind, make_query in kinds.items():
+            queries = [make_query() for _ in range(args.queries)]
+            hits = 0
+            start = time.perf_counter()
+            for owner, text in queries:
+                hits += len(index.search(owner, text, list))
+            elapsed = (time.perf_counter() - start) / args.queries
+            print(f"{kind:<12} {elapsed * 1000:>9.3f} {hits / args.queries:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
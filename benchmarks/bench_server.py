@@ -0,0 +1,142 @@
+"""
+Load-test the HTTP server with 1, 16 and 256 concurrent clients.
+
+The server runs in a subprocess on a fresh data directory seeded with one
+user and N todos. Each client keeps one connection open and sends a mix of
+GET /todos?limit=10 and POST /todos requests, authenticated with a session
+token from POST /login. Usage:
+
+    python benchmarks/bench_server.py [--clients 1 16 256] [--requests 4000]
+        [--write-ratio 0.1] [--seed 10000] [--storage json]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from bench_storage import make_records  # noqa: E402
+from models import STORAGE_BACKENDS, AuthManager  # noqa: E402
+
+SERVER = os.path.join(os.path.dirname(__file__), "..", "src", "server.py")
+USER, PASSWORD = "user0", "benchmark"
+
+
+def login(port: int) -> str:
+    """Return a session token for the benchmark user."""
+    data = json.dumps({"username": USER, "password": PASSWORD}).encode()
+    url = f"http://127.0.0.1:{port}/login"
+    with urllib.request.urlopen(urllib.request.Request(url, data)) as response:
+        return json.load(response)["token"]
+
+
+async def request(reader, writer, token, method: str, path: str, body=None) -> int:
+    """Send one keep-alive request and return the response status."""
+    data = b"" if body is None else json.dumps(body).encode()
+    writer.write(
+        (
+            f"{method} {path} HTTP/1.1\r\n"
+            "Host: localhost\r\n"
+            f"Authorization: Bearer {token}\r\n"
+            f"Content-Length: {len(data)}\r\n"
+            "\r\n"
+        ).encode()
+        + data
+    )
+    head = await reader.readuntil(b"\r\n\r\n")
+    lines = head.decode("latin-1").split("\r\n")
+    length = 0
+    for line in lines[1:]:
+        name, _, value = line.partition(":")
+        if name.lower() == "content-length":
+            length = int(value)
+    await reader.readexactly(length)
+    return int(lines[0].split(" ")[1])
+
+
+async def client(
+    port: int, token: str, count: int, write_ratio: float, latencies: list[float]
+):
+    """Send ``count`` requests over one connection, recording latencies."""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    try:
+        for i in range(count):
+            start = time.perf_counter()
+            if random.random() < write_ratio:
+                status = await request(
+                    reader, writer, token, "POST", "/todos", {"title": f"Load {i}"}
+                )
+            else:
+                status = await request(reader, writer, token, "GET", "/todos?limit=10")
+            latencies.append(time.perf_counter() - start)
+            if status >= 400:
+                raise RuntimeError(f"Request failed with status {status}")
+    finally:
+        writer.close()
+
+
+async def run_level(
+    port: int, token: str, clients: int, requests: int, write_ratio: float
+):
+    """Run one concurrency level and return (requests/sec, p50 ms, p99 ms)."""
+    latencies: list[float] = []
+    per_client = max(1, requests // clients)
+    start = time.perf_counter()
+    await asyncio.gather(
+        *(
+            client(port, token, per_client, write_ratio, latencies)
+            for _ in range(clients)
+        )
+    )
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2] * 1000
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000
+    return len(latencies) / elapsed, p50, p99
+
+
+def main():
+    """Start a server, run every concurrency level and print a table."""
+    parser = argparse.ArgumentParser(description="HTTP server load benchmark")
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 16, 256])
+    parser.add_argument("--requests", type=int, default=4000)
+    parser.add_argument("--write-ratio", type=float, default=0.1)
+    parser.add_argument("--seed", type=int, default=10_000)
+    parser.add_argument("--storage", default="json", choices=sorted(STORAGE_BACKENDS))
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        STORAGE_BACKENDS[args.storage](data_dir, durability="none").save(
+            make_records(args.seed)
+        )
+        AuthManager(data_dir=data_dir).sign_up(USER, PASSWORD)
+        server = subprocess.Popen(
+            [sys.executable, SERVER, "--port", "0", "--data-dir", data_dir]
+            + ["--storage", args.storage],
+            stdout=subprocess.PIPE,
+            text=True,
+        )
+        try:
+            port = int(server.stdout.readline().rsplit(":", 1)[1])
+            token = login(port)
+            print(f"{'clients':>7} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8}")
+            for clients in args.clients:
+                rate, p50, p99 = asyncio.run(
+                    run_level(port, token, clients, args.requests, args.write_ratio)
+                )
+                print(f"{clients:>7} {rate:>9.0f} {p50:>8.2f} {p99:>8.2f}")
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
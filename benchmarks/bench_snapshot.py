@@ -0,0 +1,78 @@
+"""
+Compare counting todos by status and priority from todos.json and from a
+columnar snapshot.
+
+The JSON path loads every todo with get_all_todos and counts in Python;
+the snapshot path counts over the memory-mapped code columns. Usage:
+
+    python benchmarks/bench_snapshot.py [--sizes 10000 100000 1000000]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import Counter
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from bench_storage import make_records  # noqa: E402
+from models import JsonTodoStorage, Status, TodoManager  # noqa: E402
+
+
+def measure(func) -> tuple[float, float]:
+    """Return (milliseconds, peak traced MiB) of one ``func()`` call."""
+    tracemalloc.start()
+    try:
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return elapsed * 1000, peak / 2**20
+
+
+def count_from_json(manager: TodoManager):
+    todos = manager.get_all_todos()
+    Counter(todo.status for todo in todos)
+    Counter(todo.priority for todo in todos)
+
+
+def count_from_snapshot(manager: TodoManager):
+    with manager.open_snapshot() as snapshot:
+        snapshot.count_by("status")
+        snapshot.count_by("priority")
+        snapshot.count(owner="user7", status=Status.PENDING)
+
+
+def main():
+    """Run the benchmark and print time and peak memory for each path."""
+    parser = argparse.ArgumentParser(description="Columnar snapshot benchmark")
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000]
+    )
+    args = parser.parse_args()
+
+    print(f"{'size':>9} {'source':<9} {'file MiB':>9} {'ms':>9} {'peak MiB':>9}")
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as data_dir:
+            JsonTodoStorage(data_dir, durability="none").save(make_records(size))
+            manager = TodoManager(data_dir=data_dir)
+            snapshot_path = manager.write_snapshot()
+            sources = [
+                ("json", manager.todos_file_path, count_from_json),
+                ("snapshot", snapshot_path, count_from_snapshot),
+            ]
+            for name, path, func in sources:
+                millis, peak = measure(lambda: func(manager))
+                file_mib = os.path.getsize(path) / 2**20
+                print(
+                    f"{size:>9} {name:<9} {file_mib:>9.1f} {millis:>9.1f} {peak:>9.2f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
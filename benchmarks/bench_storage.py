@@ -0,0 +1,102 @@
+"""
+Compare TodoManager latency on the JSON and SQLite storage backends.
+
+Each backend is seeded with N todos spread over a fixed pool of owners, then
+timed on the hot per-user operations. Usage:
+
+    python benchmarks/bench_storage.py [--sizes 10000 100000 1000000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+from uuid import uuid4
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from models import STORAGE_BACKENDS, Status, TodoItem, TodoManager  # noqa: E402
+
+OWNERS = 1000
+
+
+def make_records(count: int) -> list[dict]:
+    """Build ``count`` todo records spread over OWNERS owners."""
+    now = datetime.utcnow().isoformat()
+    return [
+        {
+            "id": str(uuid4()),
+            "title": f"Todo {i}",
+            "details": "Benchmark item",
+            "priority": random.choice(["HIGH", "MID", "LOW"]),
+            "status": random.choice(["PENDING", "COMPLETED"]),
+            "owner": f"user{i % OWNERS}",
+            "created_at": now,
+            "updated_at": now,
+        }
+        for i in range(count)
+    ]
+
+
+def timed(func, repeat: int) -> float:
+    """Return the mean wall time of ``func()`` in milliseconds."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def bench_backend(backend: str, records: list[dict], repeat: int) -> dict:
+    """Seed one backend and time its operations."""
+    with tempfile.TemporaryDirectory() as data_dir:
+        STORAGE_BACKENDS[backend](data_dir).save(records)
+        manager = TodoManager(data_dir=data_dir, storage=backend)
+        ids = [random.choice(records)["id"] for _ in range(repeat)]
+        owners = [f"user{random.randrange(OWNERS)}" for _ in range(repeat)]
+
+        id_iter = iter(ids)
+        owner_iter = iter(owners)
+        complete_iter = iter(ids)
+        return {
+            "get_todo_by_id": timed(
+                lambda: manager.get_todo_by_id(next(id_iter)), repeat
+            ),
+            "get_user_todos": timed(
+                lambda: manager.get_user_todos(next(owner_iter)), repeat
+            ),
+            "add_todo": timed(
+                lambda: manager.add_todo(
+                    TodoItem(title="New", owner="user0", status=Status.PENDING)
+                ),
+                repeat,
+            ),
+            "mark_as_completed": timed(
+                lambda: manager.mark_as_completed(next(complete_iter)), repeat
+            ),
+        }
+
+
+def main():
+    """Run the benchmark and print a table of mean latencies."""
+    parser = argparse.ArgumentParser(description="Storage backend benchmark")
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000]
+    )
+    parser.add_argument("--backends", nargs="+", default=["json", "sqlite"])
+    parser.add_argument("--repeat", type=int, default=5, help="calls per operation")
+    args = parser.parse_args()
+
+    print(f"{'size':>9} {'backend':<8} {'operation':<18} {'mean ms':>10}")
+    for size in args.sizes:
+        records = make_records(size)
+        for backend in args.backends:
+            results = bench_backend(backend, records, args.repeat)
+            for operation, millis in results.items():
+                print(f"{size:>9} {backend:<8} {operation:<18} {millis:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Report the memory held per TodoItem after loading todos.json.
+
+Compares the current slotted TodoItem (interned owners, integer timestamps)
+with the previous plain dataclass layout, each built from a freshly parsed
+file so no strings are shared with the input. Usage:
+
+    python benchmarks/bench_todo_item.py [--size 100000]
+"""
+
+import argparse
+import gc
+import json
+import os
+import sys
+import tempfile
+import tracemalloc
+from dataclasses import dataclass
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from bench_storage import make_records  # noqa: E402
+from models import JsonTodoStorage, Priority, Status, TodoItem  # noqa: E402
+
+
+@dataclass
+class LegacyTodoItem:
+    """TodoItem as it was before it became slotted."""
+
+    id: str
+    title: str
+    details: str
+    priority: Priority
+    status: Status
+    owner: str
+    created_at: str
+    updated_at: str
+
+
+def load_items(path: str, cls) -> list:
+    """Parse ``path`` and build one ``cls`` per record, keeping only the items."""
+    with open(path) as f:
+        records = json.load(f)
+    items = []
+    for record in records:
+        record["priority"] = Priority(record["priority"])
+        record["status"] = Status(record["status"])
+        items.append(cls(**record))
+    return items
+
+
+def bytes_per_item(path: str, cls, size: int) -> float:
+    """Return the traced memory retained per item after loading ``path``."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        items = load_items(path, cls)
+        gc.collect()
+        retained = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    assert len(items) == size
+    return retained / size
+
+
+def main():
+    """Run the benchmark and print bytes per item for both layouts."""
+    parser = argparse.ArgumentParser(description="TodoItem memory benchmark")
+    parser.add_argument("--size", type=int, default=100_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        storage = JsonTodoStorage(data_dir, durability="none")
+        storage.save(make_records(args.size))
+        before = bytes_per_item(storage.todos_file_path, LegacyTodoItem, args.size)
+        after = bytes_per_item(storage.todos_file_path, TodoItem, args.size)
+
+    print(f"{'layout':<10} {'bytes/item':>11}")
+    print(f"{'dataclass':<10} {before:>11.0f}")
+    print(f"{'slotted':<10} {after:>11.0f}")
+    print(f"saved {1 - after / before:.0%}")
+
+
+if __name__ == "__main__":
+    main()
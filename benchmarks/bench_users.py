@@ -0,0 +1,71 @@
+"""
+Compare registering users one at a time with sign_up_many on each user store.
+
+Password hashing is set to a single PBKDF2 iteration so the numbers show the
+cost of the user store itself. Usage:
+
+    python benchmarks/bench_users.py [--sizes 1000 10000] [--lookups 1000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from models import USER_STORAGE_BACKENDS, AuthManager  # noqa: E402
+
+
+def make_manager(data_dir: str, storage: str) -> AuthManager:
+    """Return an AuthManager whose password hashing is nearly free."""
+    return AuthManager(
+        data_dir=data_dir,
+        storage=storage,
+        durability="none",
+        kdf="pbkdf2_sha256",
+        kdf_params={"iterations": 1},
+    )
+
+
+def seconds(func) -> float:
+    """Return the wall time of one ``func()`` call in seconds."""
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def main():
+    """Run the benchmark and print a table per store and size."""
+    parser = argparse.ArgumentParser(description="User store benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10_000])
+    parser.add_argument("--lookups", type=int, default=1000)
+    args = parser.parse_args()
+
+    print(
+        f"{'store':<7} {'users':>7} {'sign_up s':>10} {'many s':>8} "
+        f"{'login us':>9}"
+    )
+    for storage in USER_STORAGE_BACKENDS:
+        for size in args.sizes:
+            credentials = [(f"user{i}", f"password{i}") for i in range(size)]
+            with tempfile.TemporaryDirectory() as data_dir:
+                auth = make_manager(data_dir, storage)
+                one_by_one = seconds(
+                    lambda: [auth.sign_up(*pair) for pair in credentials]
+                )
+            with tempfile.TemporaryDirectory() as data_dir:
+                auth = make_manager(data_dir, storage)
+                bulk = seconds(lambda: auth.sign_up_many(credentials))
+                picks = random.choices(credentials, k=args.lookups)
+                login = seconds(lambda: [auth.login(*pair) for pair in picks])
+            print(
+                f"{storage:<7} {size:>7} {one_by_one:>10.2f} {bulk:>8.3f} "
+                f"{login / args.lookups * 1e6:>9.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
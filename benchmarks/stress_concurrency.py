@@ -0,0 +1,98 @@
+"""
+Multi-process stress test for TodoManager locking and compare-and-swap.
+
+N worker processes share one data directory. Each one adds its own todos
+and increments a shared counter todo through compare_and_update, retrying
+on conflict. At the end the counter must equal the total number of
+increments and every added todo must exist; anything less is a lost update.
+
+    python benchmarks/stress_concurrency.py [--workers 8] [--ops 200]
+"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from models import (  # noqa: E402
+    STORAGE_BACKENDS,
+    TodoItem,
+    TodoManager,
+    UpdateResult,
+)
+
+COUNTER_OWNER = "counter"
+
+
+def worker(data_dir: str, backend: str, counter_id: str, worker_id: int, ops: int):
+    """Add ``ops`` todos and perform ``ops`` counter increments."""
+    manager = TodoManager(data_dir=data_dir, storage=backend, cache=True)
+    conflicts = 0
+    for i in range(ops):
+        manager.add_todo(TodoItem(title=f"w{worker_id}-{i}", owner=f"user{worker_id}"))
+        while True:
+            counter = manager.get_todo_by_id(counter_id, owner=COUNTER_OWNER)
+            counter.title = str(int(counter.title) + 1)
+            result = manager.compare_and_update(counter_id, counter, counter.updated_at)
+            if result is UpdateResult.UPDATED:
+                break
+            conflicts += 1
+    return conflicts
+
+
+def run_stress(data_dir: str, backend: str, workers: int, ops: int) -> dict:
+    """Run the stress test and return counts and throughput."""
+    manager = TodoManager(data_dir=data_dir, storage=backend)
+    counter = TodoItem(title="0", owner=COUNTER_OWNER)
+    manager.add_todo(counter)
+
+    context = multiprocessing.get_context("spawn")
+    start = time.perf_counter()
+    with context.Pool(workers) as pool:
+        conflicts = pool.starmap(
+            worker,
+            [(data_dir, backend, counter.id, w, ops) for w in range(workers)],
+        )
+    elapsed = time.perf_counter() - start
+
+    manager = TodoManager(data_dir=data_dir, storage=backend)
+    expected = workers * ops
+    final_count = int(manager.get_todo_by_id(counter.id).title)
+    added = len(manager.get_all_todos()) - 1
+    return {
+        "expected": expected,
+        "counter": final_count,
+        "added": added,
+        "lost_updates": (expected - final_count) + (expected - added),
+        "conflicts": sum(conflicts),
+        "ops_per_sec": 2 * expected / elapsed,
+    }
+
+
+def main():
+    """Run the stress test for each backend and print a summary."""
+    parser = argparse.ArgumentParser(description="Concurrent TodoManager stress test")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--ops", type=int, default=200, help="adds and updates each")
+    parser.add_argument("--backends", nargs="+", default=sorted(STORAGE_BACKENDS))
+    args = parser.parse_args()
+
+    print(f"{'backend':<8} {'ops':>7} {'lost':>5} {'conflicts':>10} {'ops/sec':>10}")
+    failed = False
+    for backend in args.backends:
+        with tempfile.TemporaryDirectory() as data_dir:
+            stats = run_stress(data_dir, backend, args.workers, args.ops)
+        failed |= stats["lost_updates"] != 0
+        print(
+            f"{backend:<8} {2 * stats['expected']:>7} {stats['lost_updates']:>5} "
+            f"{stats['conflicts']:>10} {stats['ops_per_sec']:>10.1f}"
+        )
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,364 @@
+"""
+Non-interactive command interface for the To-Do List application.
+
+Usage:
+    export TODO_PASSWORD=...
+    export TODO_TOKEN=$(python src/main.py --user alice token)  # optional
+    python src/main.py --user alice add --title "Buy milk" [--priority HIGH]
+    python src/main.py --user alice list [--status PENDING] [--limit 20]
+    python src/main.py --user alice complete TODO_ID
+    python src/main.py --user alice edit TODO_ID [--title ...] [--status ...]
+    python src/main.py --user alice import todos.jsonl   # "-" reads stdin
+    python src/main.py --user alice import todos.csv [--chunk-size N] [--progress]
+    python src/main.py --user alice export [todos.jsonl] [--format csv]
+    python src/main.py --user alice script [commands.txt]
+
+Commands authenticate with TODO_TOKEN when it is set, which skips the
+password hash, and with TODO_PASSWORD otherwise. "token" logs in with the
+password and prints a session token (the only command not in JSON lines).
+A script holds one command per line in the same syntax (without the global
+options); blank lines and lines starting with "#" are skipped. Every command
+writes JSON lines to stdout: one object per todo for list and export, and
+{"ok": ..., "op": ...} for everything else. The exit status is 1 if any
+command failed.
+
+import and export read and write JSON Lines, or CSV with a header row for
+files ending in .csv or with --format csv. Imports are committed every
+--chunk-size records, and --progress reports records/s on stderr.
+"""
+
+import argparse
+import io
+import json
+import os
+import shlex
+import sys
+from collections.abc import Callable, Iterable
+from contextlib import ExitStack
+from itertools import islice
+from typing import BinaryIO
+
+from models import (
+    STORAGE_BACKENDS,
+    TRANSFER_FORMATS,
+    AuthManager,
+    Priority,
+    Status,
+    TodoItem,
+    TodoManager,
+)
+
+PASSWORD_ENV = "TODO_PASSWORD"
+TOKEN_ENV = "TODO_TOKEN"
+
+# Script commands are committed in batches of this many, so a long script
+# rewrites the data files once per batch instead of once per command
+COMMIT_EVERY = 1000
+
+
+class CommandError(ValueError):
+    """A command was malformed or could not be carried out."""
+
+
+class _CommandParser(argparse.ArgumentParser):
+    """ArgumentParser that raises CommandError instead of exiting."""
+
+    def error(self, message):
+        raise CommandError(message)
+
+
+def _int_at_least(minimum: int) -> Callable[[str], int]:
+    """Return an argparse type for integers no smaller than ``minimum``."""
+
+    def parse(text: str) -> int:
+        value = int(text)
+        if value < minimum:
+            raise argparse.ArgumentTypeError(f"must be at least {minimum}: {value}")
+        return value
+
+    parse.__name__ = "int"  # for argparse's "invalid int value" message
+    return parse
+
+
+def _build_command_parser() -> argparse.ArgumentParser:
+    parser = _CommandParser(prog="todo", add_help=False)
+    commands = parser.add_subparsers(
+        dest="op", required=True, parser_class=_CommandParser
+    )
+
+    add = commands.add_parser("add")
+    add.add_argument("--title", required=True)
+    add.add_argument("--details", default="")
+    add.add_argument(
+        "--priority", type=str.upper, choices=Priority.__members__, default="MID"
+    )
+
+    list_ = commands.add_parser("list")
+    list_.add_argument("--status", type=str.upper, choices=Status.__members__)
+    list_.add_argument("--limit", type=_int_at_least(0))
+
+    complete = commands.add_parser("complete")
+    complete.add_argument("id")
+
+    edit = commands.add_parser("edit")
+    edit.add_argument("id")
+    edit.add_argument("--title")
+    edit.add_argument("--details")
+    edit.add_argument("--priority", type=str.upper, choices=Priority.__members__)
+    edit.add_argument("--status", type=str.upper, choices=Status.__members__)
+
+    import_ = commands.add_parser("import")
+    import_.add_argument("file", nargs="?", default="-")
+    import_.add_argument("--chunk-size", type=_int_at_least(1), default=COMMIT_EVERY)
+
+    export = commands.add_parser("export")
+    export.add_argument("file", nargs="?", default="-")
+
+    for transfer in (import_, export):
+        transfer.add_argument("--format", choices=TRANSFER_FORMATS)
+        transfer.add_argument("--progress", action="store_true")
+
+    script = commands.add_parser("script")
+    script.add_argument("file", nargs="?", default="-")
+    return parser
+
+
+def _open_input(path: str):
+    """Open ``path`` for reading, or stdin for "-" (left open on close)."""
+    if path == "-":
+        return open(sys.stdin.fileno(), newline="", closefd=False)
+    return open(path, newline="")
+
+
+def _format(args) -> str:
+    """Return the --format of an import/export, else guess it from the file."""
+    if args.format:
+        return args.format
+    return "csv" if os.path.splitext(args.file)[1].lower() == ".csv" else "jsonl"
+
+
+class CommandRunner:
+    """Runs commands for one user against a single loaded TodoManager."""
+
+    def __init__(self, todo_manager: TodoManager, user: str, out: BinaryIO):
+        """Initialize the runner.
+
+        Args:
+            todo_manager: Manager shared by every command of the run
+            user: The authenticated user; commands only see their todos
+            out: Binary stream the JSON lines are written to
+        """
+        self.todo_manager = todo_manager
+        self.user = user
+        self.out = out
+        self.failures = 0
+        self._parser = _build_command_parser()
+        self._codec = todo_manager.storage.codec
+        self._pending: list[bytes] = []
+
+    def _emit(self, obj: dict):
+        self._pending.append(self._codec.dumps(obj, pretty=False) + b"\n")
+
+    def _flush(self):
+        self.out.write(b"".join(self._pending))
+        self.out.flush()
+        self._pending = []
+
+    def run(self, argv: list[str]):
+        """Parse and run one command, reporting errors as JSON lines."""
+        self._run(argv)
+        self._flush()
+
+    def _run(self, argv: list[str], line: int | None = None):
+        result = {} if line is None else {"line": line}
+        try:
+            args = self._parser.parse_args(argv)
+            result["op"] = args.op
+            result.update(getattr(self, f"_do_{args.op}")(args))
+        except (ValueError, OSError) as e:  # CommandError is a ValueError
+            self.failures += 1
+            result.update(ok=False, error=str(e))
+        else:
+            result["ok"] = True
+        self._emit(result)
+
+    def _own_todo(self, todo_id: str) -> TodoItem:
+        todo = self.todo_manager.get_todo_by_id(todo_id, owner=self.user)
+        if todo is None or todo.owner != self.user:
+            raise CommandError(f"No todo with id {todo_id!r}")
+        return todo
+
+    def _do_add(self, args) -> dict:
+        todo = TodoItem(
+            title=args.title,
+            details=args.details,
+            priority=Priority[args.priority],
+            owner=self.user,
+        )
+        self.todo_manager.add_todo(todo)
+        return {"id": todo.id}
+
+    def _do_list(self, args) -> dict:
+        todos = self.todo_manager.query(
+            owner=self.user,
+            status=None if args.status is None else Status[args.status],
+            limit=args.limit,
+        )
+        count = 0
+        for todo in todos:
+            self._emit(todo.to_dict())
+            count += 1
+        return {"count": count}
+
+    def _do_complete(self, args) -> dict:
+        self._own_todo(args.id)
+        if not self.todo_manager.mark_as_completed(args.id, owner=self.user):
+            raise CommandError(f"No todo with id {args.id!r}")
+        return {"id": args.id}
+
+    def _do_edit(self, args) -> dict:
+        todo = self._own_todo(args.id)
+        updated_todo = TodoItem(
+            id=todo.id,
+            title=todo.title if args.title is None else args.title,
+            details=todo.details if args.details is None else args.details,
+            priority=(
+                todo.priority if args.priority is None else Priority[args.priority]
+            ),
+            status=todo.status if args.status is None else Status[args.status],
+            owner=todo.owner,
+            created_at=todo.created_at,
+        )
+        if not self.todo_manager.update_todo(todo.id, updated_todo):
+            raise CommandError(f"No todo with id {args.id!r}")
+        return {"id": todo.id}
+
+    def _progress(self, op: str) -> Callable[[int, float], None]:
+        def report(count: int, rate: float):
+            print(f"{op}: {count} records ({rate:.0f} records/s)", file=sys.stderr)
+
+        return report
+
+    def _do_import(self, args) -> dict:
+        def on_error(line: int, message: str):
+            self.failures += 1
+            self._emit({"line": line, "ok": False, "error": message})
+
+        with _open_input(args.file) as f:
+            count = self.todo_manager.import_stream(
+                f,
+                _format(args),
+                owner=self.user,
+                chunk_size=args.chunk_size,
+                progress=self._progress("import") if args.progress else None,
+                on_error=on_error,
+            )
+        return {"count": count}
+
+    def _do_export(self, args) -> dict:
+        with ExitStack() as stack:
+            if args.file == "-":
+                # Earlier results go first so the lines stay in order
+                self._flush()
+                f = io.TextIOWrapper(self.out, "utf-8", newline="")
+                stack.callback(f.detach)
+                stack.callback(f.flush)
+            else:
+                f = stack.enter_context(open(args.file, "w", newline=""))
+            count = self.todo_manager.export_stream(
+                f,
+                _format(args),
+                owner=self.user,
+                progress=self._progress("export") if args.progress else None,
+            )
+        return {"count": count}
+
+    def _do_script(self, args) -> dict:
+        with _open_input(args.file) as f:
+            return {"count": self.run_script(f)}
+
+    def run_script(self, lines: Iterable[str]) -> int:
+        """Run one command per line, committing every COMMIT_EVERY commands.
+
+        Results of a batch are written once it has been committed.
+
+        Returns:
+            The number of commands run
+        """
+        count = 0
+        commands = self._script_commands(lines)
+        while True:
+            # Read ahead outside the batch so input isn't awaited under the lock
+            chunk = list(islice(commands, COMMIT_EVERY))
+            with self.todo_manager.batch():
+                for line, argv in chunk:
+                    if isinstance(argv, ValueError):
+                        error = str(argv)
+                    elif argv[0] == "script":
+                        error = "Scripts cannot nest"
+                    else:
+                        self._run(argv, line)
+                        continue
+                    self.failures += 1
+                    self._emit({"line": line, "ok": False, "error": error})
+            self._flush()
+            count += len(chunk)
+            if len(chunk) < COMMIT_EVERY:
+                return count
+
+    @staticmethod
+    def _script_commands(lines: Iterable[str]):
+        """Yield (line number, argv) per command, or the line's parse error."""
+        for line, text in enumerate(lines, 1):
+            text = text.strip()
+            if text and not text.startswith("#"):
+                try:
+                    argv = shlex.split(text)
+                except ValueError as e:  # e.g. an unbalanced quote
+                    argv = e
+                yield line, argv
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Authenticate, run the given command and return the exit status."""
+    parser = argparse.ArgumentParser(
+        description=__doc__.strip().splitlines()[0],
+        epilog="commands: add, list, complete, edit, import, export, script, token",
+    )
+    parser.add_argument("--user", required=True, help="user to act as")
+    parser.add_argument("--data-dir", default=".", help="directory holding the data")
+    parser.add_argument("--storage", default="json", choices=sorted(STORAGE_BACKENDS))
+    parser.add_argument("command", nargs=argparse.REMAINDER)
+    args = parser.parse_args(argv)
+    if not args.command:
+        parser.error("a command is required")
+
+    auth_manager = AuthManager(data_dir=args.data_dir)
+    token = os.environ.get(TOKEN_ENV)
+    password = os.environ.get(PASSWORD_ENV)
+    if args.command[0] == "token":
+        if password is None:
+            parser.error(f"set {PASSWORD_ENV} to the user's password")
+        token = auth_manager.issue_token(args.user, password)
+        if token is None:
+            print("Invalid username or password.", file=sys.stderr)
+            return 1
+        print(token)
+        return 0
+
+    if token:
+        ok = auth_manager.validate_token(token) == args.user
+        message = "Invalid or expired token."
+    elif password is not None:
+        ok, message = auth_manager.login(args.user, password)
+    else:
+        parser.error(f"set {TOKEN_ENV} or {PASSWORD_ENV}")
+    out = sys.stdout.buffer
+    if not ok:
+        out.write(json.dumps({"ok": False, "error": message}).encode() + b"\n")
+        return 1
+
+    todo_manager = TodoManager(data_dir=args.data_dir, cache=True, storage=args.storage)
+    runner = CommandRunner(todo_manager, args.user, out)
+    runner.run(args.command)
+    return 1 if runner.failures else 0
@@ -2,18 +2,44 @@
 Entry point for the Python CLI To-Do List Application.
 """
 
-from models import AuthManager, TodoManager, TodoItem, Priority, Status
-from datetime import datetime
+import sys
+from collections.abc import Callable, Hashable
+from datetime import UTC, datetime
+
+import cli
+from models import (
+    AuthManager,
+    Priority,
+    Status,
+    TodoItem,
+    TodoManager,
+    UpdateResult,
+)
+
+
+def _utc_now() -> str:
+    """Return the current UTC time in the naive ISO form todos are stored in."""
+    return datetime.now(UTC).replace(tzinfo=None).isoformat()
 
 
 class App:
     """Main application class for the CLI To-Do List."""
 
+    PAGE_SIZE = 10
+
     def __init__(self):
         """Initialize the application."""
         self.auth_manager = AuthManager(data_dir=".")
-        self.todo_manager = TodoManager(data_dir=".")
+        # Cached, so the menus' queries and the app's own writes don't
+        # re-parse the todo file while nothing else has changed it
+        self.todo_manager = TodoManager(data_dir=".", cache=True)
         self.current_user = None
+        # Pages and counts queried this session, updated in place by the
+        # app's own writes and dropped when the storage's data version for
+        # the user moves on for any other reason
+        self._results: dict[tuple, list[TodoItem] | int] = {}
+        self._results_owner: str | None = None
+        self._results_version: Hashable = None
 
     def display_pre_login_menu(self):
         """Display the main menu before login."""
@@ -69,7 +95,8 @@ class App:
             print("[3] Edit Todo")
             print("[4] Mark as Completed")
             print("[5] View Todo Details")
-            print("[6] Logout")
+            print("[6] Search")
+            print("[7] Logout")
             choice = input("Select an option: ").strip()
 
             if choice == "1":
@@ -83,8 +110,11 @@ class App:
             elif choice == "5":
                 self.handle_view_todo_details()
             elif choice == "6":
+                self.handle_search()
+            elif choice == "7":
                 print("Logging out...")
                 self.current_user = None
+                self._results = {}
                 break
             else:
                 print("Invalid option. Please try again.")
@@ -102,6 +132,7 @@ class App:
             print("Invalid priority. Defaulting to MID.")
             priority = Priority.MID
 
+        now = _utc_now()
         todo = TodoItem(
             id=None,  # Will be assigned by TodoManager
             title=title,
@@ -109,139 +140,320 @@ class App:
             priority=priority,
             status=Status.PENDING,
             owner=self.current_user,
-            created_at=datetime.utcnow().isoformat(),
-            updated_at=datetime.utcnow().isoformat(),
+            created_at=now,
+            updated_at=now,
         )
+        version = self.todo_manager.data_version(self.current_user)
         self.todo_manager.add_todo(todo)
+        self._remember(version, todo)
         print("Todo added successfully!")
 
+    def _cached(self, key: tuple, compute: Callable):
+        """Return a query result cached for the current data version.
+
+        The cache only holds what was actually shown (pages and counts), and
+        is dropped as soon as the storage reports a change for the user, so
+        writes from the app or from anywhere else are always picked up.
+        """
+        version = self.todo_manager.data_version(self.current_user)
+        if version != self._results_version or self._results_owner != self.current_user:
+            self._results = {}
+            self._results_owner = self.current_user
+            self._results_version = version
+        if key not in self._results:
+            self._results[key] = compute()
+        return self._results[key]
+
+    def _count(self, **filters) -> int:
+        """Return how many of the current user's todos match the filters."""
+        return self._cached(
+            ("count", *sorted(filters.items())),
+            lambda: self.todo_manager.query(owner=self.current_user, **filters).count(),
+        )
+
+    def _page(self, filters: dict, page: int) -> list[TodoItem]:
+        """Return one page of the current user's todos matching the filters."""
+        return self._cached(
+            ("page", page, *sorted(filters.items())),
+            lambda: self.todo_manager.query(
+                owner=self.current_user,
+                **filters,
+                limit=self.PAGE_SIZE,
+                offset=page * self.PAGE_SIZE,
+            ).all(),
+        )
+
+    @staticmethod
+    def _matches(todo: TodoItem, filters: tuple) -> bool:
+        return all(getattr(todo, name) == value for name, value in filters)
+
+    def _remember(
+        self, version: Hashable, todo: TodoItem, previous: TodoItem | None = None
+    ):
+        """Apply a write the app just made to the cached pages and counts.
+
+        ``version`` is the data version read before the write and
+        ``previous`` the todo as it was listed (None for a new one). If the
+        version no longer matches the cache, something else changed the
+        storage as well, so the cache is dropped and re-queried instead.
+        Pages of a view the todo joins or leaves are dropped too, since the
+        todos after it move; counts are adjusted.
+        """
+        if version != self._results_version or self._results_owner != self.current_user:
+            self._results = {}
+            return
+        results = {}
+        for key, value in self._results.items():
+            filters = key[2:] if key[0] == "page" else key[1:]
+            was = previous is not None and self._matches(previous, filters)
+            now = self._matches(todo, filters)
+            if key[0] == "page":
+                if was != now:
+                    continue
+                if now:
+                    value = [todo if known.id == todo.id else known for known in value]
+            elif was != now:
+                value += 1 if now else -1
+            results[key] = value
+        self._results = results
+        self._results_version = self.todo_manager.data_version(self.current_user)
+
+    def _write(self, lines: list[str]):
+        """Write a block of output lines with a single buffered write."""
+        sys.stdout.write("\n".join(lines) + "\n")
+        sys.stdout.flush()
+
+    def _browse(
+        self,
+        heading: str,
+        filters: dict,
+        total: int,
+        prompt: str | None = None,
+        show_status: bool = True,
+        show_details: bool = True,
+    ) -> TodoItem | None:
+        """Show a list of todos a page at a time.
+
+        Only the visible page is fetched from the TodoManager. Between pages
+        the user can enter n/p for the next/previous page, "g N" to jump to
+        page N, Enter to go back or, when ``prompt`` is given, the number of
+        a todo to choose it.
+
+        Args:
+            heading: Title printed above each page
+            filters: Extra TodoManager.query filters besides the owner
+            total: Number of todos matching the filters
+            prompt: What choosing a todo does; None for a read-only view
+            show_status: Include each todo's status
+            show_details: Include each todo's details line
+
+        Returns:
+            The chosen todo, or None
+        """
+        pages = -(-total // self.PAGE_SIZE)
+        page = 0
+        while True:
+            offset = page * self.PAGE_SIZE
+            lines = [f"\n--- {heading} ---"]
+            for i, todo in enumerate(self._page(filters, page), offset + 1):
+                status = f" - {todo.status.value}" if show_status else ""
+                lines.append(
+                    f"[{i}] {todo.title}{status} - Priority: {todo.priority.value}"
+                )
+                if show_details:
+                    lines.append(f"    Details: {todo.details}")
+                    lines.append("")
+            lines.append(f"Page {page + 1}/{pages} ({total} todos)")
+            self._write(lines)
+
+            if pages == 1 and prompt is None:
+                return None
+            choice = (
+                input(
+                    f"{prompt or 'Page'} (n/p: next/previous page, "
+                    "g N: go to page N, Enter: back): "
+                )
+                .strip()
+                .lower()
+            )
+            if not choice:
+                return None
+            if choice in ("n", "p"):
+                step = 1 if choice == "n" else -1
+                if 0 <= page + step < pages:
+                    page += step
+                else:
+                    print("No more pages in that direction.")
+                continue
+            if choice.startswith("g"):
+                try:
+                    target = int(choice[1:])
+                except ValueError:
+                    print("Invalid input.")
+                    continue
+                if 1 <= target <= pages:
+                    page = target - 1
+                else:
+                    print("Invalid page.")
+                continue
+            if prompt is None:
+                print("Invalid option.")
+                continue
+
+            try:
+                number = int(choice)
+            except ValueError:
+                print("Invalid input.")
+                return None
+            if not 1 <= number <= total:
+                print("Invalid choice.")
+                return None
+            todos = self._page(filters, (number - 1) // self.PAGE_SIZE)
+            index = (number - 1) % self.PAGE_SIZE
+            if index >= len(todos):
+                # Deleted elsewhere since the count was taken
+                print("Invalid choice.")
+                return None
+            return todos[index]
+
     def handle_view_todos(self):
         """Handle viewing all todos."""
-        todos = self.todo_manager.get_user_todos(self.current_user)
-        if not todos:
+        total = self._count()
+        if not total:
             print("No todos found.")
             return
 
-        print("\n--- Your Todos ---")
-        for i, todo in enumerate(todos, 1):
-            print(
-                f"[{i}] {todo.title} - {todo.status.value} - Priority: {todo.priority.value}"
-            )
-            print(f"    Details: {todo.details}")
-            print()
+        self._browse("Your Todos", {}, total)
 
     def handle_edit_todo(self):
         """Handle editing an existing todo."""
-        todos = self.todo_manager.get_user_todos(self.current_user)
-        if not todos:
+        total = self._count()
+        if not total:
             print("No todos to edit.")
             return
 
-        self.handle_view_todos()
+        todo = self._browse(
+            "Your Todos", {}, total, prompt="Enter the number of the todo to edit"
+        )
+        if todo is None:
+            return
+
+        print(f"\nEditing: {todo.title}")
+        title = input(f"Title ({todo.title}): ").strip() or todo.title
+        details = input(f"Details ({todo.details}): ").strip() or todo.details
+        priority_input = input(f"Priority ({todo.priority.value}): ").strip().upper()
         try:
-            choice = int(input("Enter the number of the todo to edit: ").strip())
-            if 1 <= choice <= len(todos):
-                todo = todos[choice - 1]
-                print(f"\nEditing: {todo.title}")
-                title = input(f"Title ({todo.title}): ").strip() or todo.title
-                details = input(f"Details ({todo.details}): ").strip() or todo.details
-                priority_input = (
-                    input(f"Priority ({todo.priority.value}): ").strip().upper()
-                )
-                try:
-                    priority = (
-                        Priority[priority_input]
-                        if priority_input in Priority.__members__
-                        else todo.priority
-                    )
-                except KeyError:
-                    priority = todo.priority
-                status_input = input(f"Status ({todo.status.value}): ").strip().upper()
-                try:
-                    status = (
-                        Status[status_input]
-                        if status_input in Status.__members__
-                        else todo.status
-                    )
-                except KeyError:
-                    status = todo.status
-
-                updated_todo = TodoItem(
-                    id=todo.id,
-                    title=title,
-                    details=details,
-                    priority=priority,
-                    status=status,
-                    owner=todo.owner,
-                    created_at=todo.created_at,
-                    updated_at=datetime.utcnow().isoformat(),
-                )
-                self.todo_manager.update_todo(todo.id, updated_todo)
-                print("Todo updated successfully!")
-            else:
-                print("Invalid choice.")
-        except ValueError:
-            print("Invalid input.")
+            priority = (
+                Priority[priority_input]
+                if priority_input in Priority.__members__
+                else todo.priority
+            )
+        except KeyError:
+            priority = todo.priority
+        status_input = input(f"Status ({todo.status.value}): ").strip().upper()
+        try:
+            status = (
+                Status[status_input]
+                if status_input in Status.__members__
+                else todo.status
+            )
+        except KeyError:
+            status = todo.status
+
+        updated_todo = TodoItem(
+            id=todo.id,
+            title=title,
+            details=details,
+            priority=priority,
+            status=status,
+            owner=todo.owner,
+            created_at=todo.created_at,
+            updated_at=_utc_now(),
+        )
+        version = self.todo_manager.data_version(self.current_user)
+        if self.todo_manager.update_todo(todo.id, updated_todo):
+            self._remember(version, updated_todo, todo)
+        print("Todo updated successfully!")
 
     def handle_mark_as_completed(self):
         """Handle marking a todo as completed."""
-        todos = self.todo_manager.get_user_todos(self.current_user)
-        if not todos:
-            print("No todos to mark as completed.")
+        pending = {"status": Status.PENDING}
+        total = self._count(**pending)
+        if not total:
+            if not self._count():
+                print("No todos to mark as completed.")
+            else:
+                print("No pending todos to mark as completed.")
             return
 
-        # Filter to show only pending todos
-        pending_todos = [todo for todo in todos if todo.status == Status.PENDING]
-        if not pending_todos:
-            print("No pending todos to mark as completed.")
+        todo = self._browse(
+            "Your Pending Todos",
+            pending,
+            total,
+            prompt="Enter the number of the todo to mark as completed",
+            show_status=False,
+        )
+        if todo is None:
             return
 
-        print("\n--- Your Pending Todos ---")
-        for i, todo in enumerate(pending_todos, 1):
-            print(f"[{i}] {todo.title} - Priority: {todo.priority.value}")
-            print(f"    Details: {todo.details}")
-            print()
-
-        try:
-            choice = int(
-                input("Enter the number of the todo to mark as completed: ").strip()
-            )
-            if 1 <= choice <= len(pending_todos):
-                todo = pending_todos[choice - 1]
-                success = self.todo_manager.mark_as_completed(todo.id)
-                if success:
-                    print(f"Todo '{todo.title}' marked as completed!")
-                else:
-                    print("Failed to mark todo as completed.")
-            else:
-                print("Invalid choice.")
-        except ValueError:
-            print("Invalid input.")
+        completed = TodoItem(
+            id=todo.id,
+            title=todo.title,
+            details=todo.details,
+            priority=todo.priority,
+            status=Status.COMPLETED,
+            owner=todo.owner,
+            created_at=todo.created_at,
+            updated_at=_utc_now(),
+        )
+        version = self.todo_manager.data_version(self.current_user)
+        result = self.todo_manager.compare_and_update(
+            todo.id, completed, todo.updated_at
+        )
+        if result is UpdateResult.UPDATED:
+            self._remember(version, completed, todo)
+        # Edited elsewhere since it was listed: let the manager re-read it
+        success = result is UpdateResult.UPDATED or (
+            result is UpdateResult.CONFLICT
+            and self.todo_manager.mark_as_completed(todo.id, owner=self.current_user)
+        )
+        if success:
+            print(f"Todo '{todo.title}' marked as completed!")
+        else:
+            print("Failed to mark todo as completed.")
 
     def handle_view_todo_details(self):
         """Handle viewing details of a specific todo item."""
-        todos = self.todo_manager.get_user_todos(self.current_user)
-        if not todos:
+        total = self._count()
+        if not total:
             print("No todos found.")
             return
 
-        print("\n--- Your Todos ---")
+        todo = self._browse(
+            "Your Todos",
+            {},
+            total,
+            prompt="Enter the number of the todo to view details",
+            show_details=False,
+        )
+        if todo is not None:
+            self._display_todo_item_details(todo)
+
+    def handle_search(self):
+        """Handle searching todos by title and details."""
+        text = input("Search for: ").strip()
+        todos = self.todo_manager.search(self.current_user, text)
+        if not todos:
+            print("No matching todos found.")
+            return
+
+        print(f"\n--- Search Results ({len(todos)}) ---")
         for i, todo in enumerate(todos, 1):
             print(
                 f"[{i}] {todo.title} - {todo.status.value} - Priority: {todo.priority.value}"
             )
-
-        try:
-            choice = int(
-                input("Enter the number of the todo to view details: ").strip()
-            )
-            if 1 <= choice <= len(todos):
-                todo = todos[choice - 1]
-                self._display_todo_item_details(todo)
-            else:
-                print("Invalid choice.")
-        except ValueError:
-            print("Invalid input.")
+            print(f"    Details: {todo.details}")
+            print()
 
     def _display_todo_item_details(self, todo: TodoItem):
         """Display detailed information for a todo item.
@@ -267,7 +479,14 @@ class App:
 
 
 def main():
-    """Main entry point."""
+    """Main entry point.
+
+    With arguments, runs a non-interactive command (see cli.py) instead of
+    the menus.
+    """
+    if len(sys.argv) > 1:
+        sys.exit(cli.main(sys.argv[1:]))
+
     print("Welcome to the Python CLI To-Do List Application!")
     app = App()
     app.display_pre_login_menu()
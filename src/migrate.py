@@ -0,0 +1,34 @@
+"""
+One-shot migration of todo and user data between storage backends.
+
+Usage:
+    python src/migrate.py --to sqlite [--from json] [--data-dir .]
+    python src/migrate.py --to sharded   # split todos.json per owner
+"""
+
+import argparse
+
+from models import STORAGE_BACKENDS, migrate_storage
+
+
+def main():
+    """Parse arguments and run the migration."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--data-dir", default=".", help="directory holding the data")
+    parser.add_argument(
+        "--from", dest="source", default="json", choices=sorted(STORAGE_BACKENDS)
+    )
+    parser.add_argument(
+        "--to", dest="target", required=True, choices=sorted(STORAGE_BACKENDS)
+    )
+    args = parser.parse_args()
+
+    if args.source == args.target:
+        parser.error("--from and --to must differ")
+
+    todos, users = migrate_storage(args.data_dir, args.target, args.source)
+    print(f"Migrated {todos} todos and {users} users to {args.target}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,13 +2,48 @@
 Data models for the Python CLI To-Do List Application.
 """
 
-from dataclasses import dataclass, field
+from collections.abc import Callable, Hashable, Iterable, Iterator
+from dataclasses import MISSING, dataclass
 from enum import Enum
+from typing import Self
 from uuid import uuid4
-from datetime import datetime
+
+try:
+    import fcntl
+except ImportError:  # Windows: only in-process (thread) locking is available
+    fcntl = None
+try:
+    import orjson
+except ImportError:
+    orjson = None
+try:
+    import ujson
+except ImportError:
+    ujson = None
+import asyncio
+import bisect
+import csv
+import hashlib
+import heapq
+import hmac
 import json
+import mmap
 import os
-import hashlib
+import re
+import secrets
+import sqlite3
+import struct
+import sys
+import tempfile
+import threading
+import time
+from array import array
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import ExitStack, contextmanager
+from datetime import UTC, datetime, timedelta
+from functools import partial
+from itertools import islice
+from operator import itemgetter
 
 
 class Priority(Enum):
@@ -22,27 +57,573 @@ class Status(Enum):
     COMPLETED = "COMPLETED"
 
 
-@dataclass
+class UpdateResult(Enum):
+    """Outcome of a compare-and-swap update."""
+
+    UPDATED = "UPDATED"
+    NOT_FOUND = "NOT_FOUND"
+    CONFLICT = "CONFLICT"
+
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def _utcnow() -> datetime:
+    """Return the current UTC time as a naive datetime, as todos store it."""
+    return datetime.now(UTC).replace(tzinfo=None)
+
+
+def _pack_timestamp(value: str) -> int | str:
+    """Return an ISO timestamp as integer microseconds since the epoch.
+
+    The string is returned unchanged if converting back wouldn't reproduce it
+    exactly (timezone offsets, dates without a time, unparseable values).
+    """
+    try:
+        dt = datetime.fromisoformat(value)
+    except (ValueError, TypeError):
+        return value
+    # Only the exact layout isoformat() gives a naive datetime reads back
+    # unchanged; checking it directly is much cheaper than formatting
+    if (
+        dt.tzinfo is not None
+        or len(value) != (26 if dt.microsecond else 19)
+        or value[4:17:3] != "--T::"
+    ):
+        return value
+    delta = dt - _EPOCH
+    return (delta.days * 86400 + delta.seconds) * 1_000_000 + delta.microseconds
+
+
+def _packed_now() -> int:
+    """Return the current UTC time as _pack_timestamp would pack it."""
+    return time.time_ns() // 1000
+
+
+def _unpack_timestamp(value: int | str) -> str:
+    """Inverse of _pack_timestamp."""
+    if isinstance(value, str):
+        return value
+    seconds, micros = divmod(value, 1_000_000)
+    return (_EPOCH + timedelta(0, seconds, micros)).isoformat()
+
+
+@dataclass(init=False)
 class TodoItem:
-    id: str = field(default_factory=lambda: str(uuid4()))
-    title: str = ""
-    details: str = ""
-    priority: Priority = Priority.MID
-    status: Status = Status.PENDING
-    owner: str = ""
-    created_at: str = field(default_factory=lambda: datetime.utcnow().isoformat())
-    updated_at: str = field(default_factory=lambda: datetime.utcnow().isoformat())
+    """A single todo.
 
+    Instances are slotted and lean so that millions of them fit in memory:
+    owners are interned, so all items of a user share one string, and
+    timestamps are kept as epoch microseconds with the ISO strings of
+    ``created_at``/``updated_at`` produced on access.
 
-class AuthManager:
-    """Manages user authentication (sign up and login) with JSON storage."""
+    The timestamps are still ordinary dataclass fields, backed by properties
+    over the packed slots, so repr(), fields(), asdict() and replace() see
+    the ISO strings.
+    """
 
-    USERS_FILE = "users.json"
+    __slots__ = (
+        "_created",
+        "_updated",
+        "details",
+        "id",
+        "owner",
+        "priority",
+        "status",
+        "title",
+    )
+
+    id: str
+    title: str
+    details: str
+    priority: Priority
+    status: Status
+    owner: str
+    created_at: str
+    updated_at: str
+
+    def __init__(
+        self,
+        id: str | None = None,
+        title: str = "",
+        details: str = "",
+        priority: Priority = Priority.MID,
+        status: Status = Status.PENDING,
+        owner: str = "",
+        created_at: str | None = None,
+        updated_at: str | None = None,
+    ):
+        self.id = str(uuid4()) if id is None else id
+        self.title = title
+        self.details = details
+        self.priority = priority
+        self.status = status
+        self.owner = sys.intern(owner)
+        if created_at is None or updated_at is None:
+            now = _packed_now()
+        self._created = now if created_at is None else _pack_timestamp(created_at)
+        self._updated = now if updated_at is None else _pack_timestamp(updated_at)
+
+    @property
+    def created_at(self) -> str:
+        return _unpack_timestamp(self._created)
+
+    @created_at.setter
+    def created_at(self, value: str):
+        self._created = _pack_timestamp(value)
+
+    @property
+    def updated_at(self) -> str:
+        return _unpack_timestamp(self._updated)
+
+    @updated_at.setter
+    def updated_at(self, value: str):
+        self._updated = _pack_timestamp(value)
+
+    def to_dict(self) -> dict:
+        """Return the todo as a plain dict in the todos.json schema."""
+        return _encode_todo(self)
+
+
+# The properties took the place of the timestamp fields' class defaults
+for _name in ("created_at", "updated_at"):
+    TodoItem.__dataclass_fields__[_name].default = MISSING
+
+_PRIORITIES = {member.value: member for member in Priority}
+_STATUSES = {member.value: member for member in Status}
+_new_todo = TodoItem.__new__
+
+
+def _decode_todo(record: dict) -> TodoItem:
+    """Build a TodoItem from a storage record (the todos.json schema).
+
+    This is the hot path of every read, so it fills the slots directly
+    instead of copying the record and going through __init__, and maps enum
+    values through prebuilt dicts rather than calling the Enum classes.
+    """
+    todo = _new_todo(TodoItem)
+    # Optional fields fall back to the TodoItem defaults, so older or
+    # hand-edited files with missing keys still load
+    todo_id = record.get("id")
+    todo.id = str(uuid4()) if todo_id is None else todo_id
+    todo.title = record.get("title", "")
+    todo.details = record.get("details", "")
+    todo.priority = _PRIORITIES[record.get("priority", "MID")]
+    todo.status = _STATUSES[record.get("status", "PENDING")]
+    todo.owner = sys.intern(record.get("owner", ""))
+    created_at = record.get("created_at")
+    updated_at = record.get("updated_at")
+    if created_at is None or updated_at is None:
+        now = _packed_now()
+    todo._created = now if created_at is None else _pack_timestamp(created_at)
+    # Never-edited todos carry the same timestamp twice
+    if updated_at is None:
+        todo._updated = now
+    elif updated_at == created_at:
+        todo._updated = todo._created
+    else:
+        todo._updated = _pack_timestamp(updated_at)
+    return todo
+
+
+def _encode_todo(todo: TodoItem) -> dict:
+    """Build the storage record for a TodoItem; inverse of _decode_todo."""
+    created_at = _unpack_timestamp(todo._created)
+    updated_at = (
+        created_at
+        if todo._updated == todo._created
+        else _unpack_timestamp(todo._updated)
+    )
+    return {
+        "id": todo.id,
+        "title": todo.title,
+        "details": todo.details,
+        "priority": todo.priority._value_,
+        "status": todo.status._value_,
+        "owner": todo.owner,
+        "created_at": created_at,
+        "updated_at": updated_at,
+    }
+
+
+# Column order of the todos.json schema, used for SQLite rows and CSV files
+TODO_FIELDS = (
+    "id",
+    "title",
+    "details",
+    "priority",
+    "status",
+    "owner",
+    "created_at",
+    "updated_at",
+)
+
+# File formats understood by TodoManager.import_stream and export_stream
+TRANSFER_FORMATS = ("jsonl", "csv")
+
+
+def _import_todo(record, owner: str | None = None) -> TodoItem:
+    """Validate an imported record and build a TodoItem from it.
+
+    Missing or empty ids and timestamps are generated; priority and status
+    default to MID and PENDING and are matched case-insensitively.
+
+    Args:
+        record: One parsed JSON object or CSV row
+        owner: Owner to give the todo; the record's own "owner" is required
+            when this is None and ignored otherwise
+
+    Raises:
+        TypeError: If the record or one of its fields has the wrong type
+        ValueError: If the record is otherwise not a valid todo
+    """
+    if not isinstance(record, dict):
+        raise TypeError("Expected an object")
+    title = record.get("title")
+    if not isinstance(title, str) or not title:
+        raise ValueError("Missing title")
+    if owner is None:
+        owner = record.get("owner")
+        if not isinstance(owner, str) or not owner:
+            raise ValueError("Missing owner")
+    fields = {}
+    for name in ("id", "details", "created_at", "updated_at"):
+        value = record.get(name)
+        if value is None or value == "":
+            continue
+        if not isinstance(value, str):
+            raise TypeError(f"{name} must be a string")
+        fields[name] = value
+    for name in ("created_at", "updated_at"):
+        if name in fields:
+            try:
+                datetime.fromisoformat(fields[name])
+            except ValueError:
+                raise ValueError(f"Invalid {name}: {fields[name]!r}") from None
+    # A single timestamp stands for both, as for a never-edited todo
+    fields.setdefault("created_at", fields.get("updated_at"))
+    fields.setdefault("updated_at", fields["created_at"])
+    try:
+        priority = _PRIORITIES[(record.get("priority") or "MID").upper()]
+    except (AttributeError, KeyError):
+        raise ValueError(f"Invalid priority: {record['priority']!r}") from None
+    try:
+        status = _STATUSES[(record.get("status") or "PENDING").upper()]
+    except (AttributeError, KeyError):
+        raise ValueError(f"Invalid status: {record['status']!r}") from None
+    return TodoItem(
+        title=title, priority=priority, status=status, owner=owner, **fields
+    )
+
+
+SQLITE_FILE = "todo.db"
+
+# How hard saves work to survive a crash or power loss:
+#   "none" - atomic rename only, no fsync (fastest, for bulk imports)
+#   "file" - fsync the new file before renaming it into place
+#   "dir"  - also fsync the directory so the rename itself is durable
+DURABILITY_LEVELS = ("none", "file", "dir")
+
+# SQLite's equivalent of each durability level in WAL mode
+_SQLITE_SYNCHRONOUS = {"none": "OFF", "file": "NORMAL", "dir": "FULL"}
+
+
+def _check_durability(durability: str) -> str:
+    if durability not in DURABILITY_LEVELS:
+        raise ValueError(f"Unknown durability level: {durability!r}")
+    return durability
+
+
+def _fsync_dir(directory: str):
+    """Flush a directory entry (e.g. a rename) to disk."""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        # Directories can't be opened on some platforms (Windows)
+        return
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _replace_file(path: str, write, durability: str = "dir"):
+    """Atomically replace ``path`` with the output of ``write(f)``.
+
+    ``f`` is a binary file.
+
+    The data is written to a temp file in the same directory and renamed over
+    ``path``, so a crash leaves either the old or the new contents, never a
+    truncated file. ``durability`` picks which fsyncs happen on the way.
+    """
+    directory, name = os.path.split(path)
+    directory = directory or "."
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{name}.", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            write(f)
+            if durability != "none":
+                f.flush()
+                os.fsync(f.fileno())
+        try:
+            os.chmod(tmp_path, os.stat(path).st_mode & 0o777)
+        except FileNotFoundError:
+            pass
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    if durability == "dir":
+        _fsync_dir(directory)
+
+
+def _file_signature(path: str) -> tuple[int, int, int] | None:
+    """Return (inode, size, mtime_ns) of a file, or None if missing."""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_ino, st.st_size, st.st_mtime_ns)
+
+
+def _connect_sqlite(path: str, durability: str = "dir") -> sqlite3.Connection:
+    """Open a SQLite database in WAL mode.
+
+    WAL lets readers proceed while a writer commits. ``durability`` maps to
+    the synchronous pragma: NORMAL survives application crashes, FULL also
+    survives power loss.
+    """
+    conn = sqlite3.connect(path, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute(f"PRAGMA synchronous={_SQLITE_SYNCHRONOUS[durability]}")
+    return conn
+
+
+class JsonCodec:
+    """Serializes the JSON data files with the standard library.
+
+    Subclasses swap in faster libraries. Every codec reads both layouts, so
+    switching codec or ``pretty`` never requires converting existing files.
+    """
 
-    def __init__(self, data_dir: str = "."):
-        """Initialize AuthManager with a data directory."""
+    def __init__(self, pretty: bool = True):
+        """Initialize the codec.
+
+        Args:
+            pretty: Write indented JSON; compact output is smaller and faster
+        """
+        self.pretty = pretty
+
+    def dumps(self, obj, pretty: bool | None = None) -> bytes:
+        """Encode ``obj``; ``pretty`` overrides the codec's setting."""
+        if self.pretty if pretty is None else pretty:
+            return json.dumps(obj, indent=2).encode()
+        return json.dumps(obj, separators=(",", ":")).encode()
+
+    def loads(self, data: bytes | str):
+        """Decode a document; raises ValueError if it is malformed."""
+        return json.loads(data)
+
+
+class OrjsonCodec(JsonCodec):
+    """JSON codec backed by orjson."""
+
+    def dumps(self, obj, pretty: bool | None = None) -> bytes:
+        if self.pretty if pretty is None else pretty:
+            return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+        return orjson.dumps(obj)
+
+    def loads(self, data: bytes | str):
+        return orjson.loads(data)
+
+
+class UjsonCodec(JsonCodec):
+    """JSON codec backed by ujson."""
+
+    def dumps(self, obj, pretty: bool | None = None) -> bytes:
+        indent = 2 if (self.pretty if pretty is None else pretty) else 0
+        return ujson.dumps(obj, indent=indent, escape_forward_slashes=False).encode()
+
+    def loads(self, data: bytes | str):
+        return ujson.loads(data)
+
+
+# Codecs whose library is installed, from slowest to fastest
+JSON_CODECS: dict[str, type[JsonCodec]] = {"json": JsonCodec}
+if ujson is not None:
+    JSON_CODECS["ujson"] = UjsonCodec
+if orjson is not None:
+    JSON_CODECS["orjson"] = OrjsonCodec
+
+
+def get_json_codec(name: str = "auto", pretty: bool = True) -> JsonCodec:
+    """Return a codec by name from JSON_CODECS.
+
+    Args:
+        name: A JSON_CODECS key, or "auto" for the fastest one installed
+        pretty: Write indented rather than compact JSON
+    """
+    if name == "auto":
+        name = list(JSON_CODECS)[-1]
+    try:
+        codec = JSON_CODECS[name]
+    except KeyError:
+        raise ValueError(f"Unknown or unavailable JSON codec: {name!r}") from None
+    return codec(pretty)
+
+
+class _FileLock:
+    """Reentrant inter-process reader/writer lock on a side file.
+
+    Uses fcntl.flock: shared holds admit concurrent readers and an exclusive
+    hold admits a single writer. Nested holds reuse the outermost one, which
+    must therefore be exclusive if any nested hold is. flock does not
+    exclude threads of one process, so callers serialize threads themselves.
+    The lock file is opened per outermost hold so a forked child never
+    shares the parent's lock.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._fd: int | None = None
+        self._depth = 0
+        self._exclusive = False
+
+    @contextmanager
+    def hold(self, exclusive: bool = False):
+        if fcntl is None:
+            yield
+            return
+        if self._depth == 0:
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            except BaseException:
+                os.close(fd)
+                raise
+            self._fd = fd
+            self._exclusive = exclusive
+        elif exclusive and not self._exclusive:
+            raise RuntimeError("Cannot upgrade a shared lock to exclusive")
+        self._depth += 1
+        try:
+            yield
+        finally:
+            self._depth -= 1
+            if self._depth == 0:
+                # Closing the descriptor releases the flock
+                os.close(self._fd)
+                self._fd = None
+
+
+class UserStorage:
+    """Base class for user storage backends.
+
+    Users are plain dicts keyed by username (the users.json schema). The
+    default lookups and inserts load the whole mapping and save it back.
+    """
+
+    def __init__(
+        self,
+        data_dir: str,
+        durability: str = "dir",
+        codec: JsonCodec | None = None,
+    ):
+        """Initialize the backend.
+
+        Args:
+            data_dir: Directory holding the backend's files
+            durability: One of DURABILITY_LEVELS
+            codec: JSON codec for the files; defaults to get_json_codec()
+        """
         self.data_dir = data_dir
+        self.durability = _check_durability(durability)
+        self.codec = codec or get_json_codec()
+        self._lock = threading.RLock()
+        self._file_lock: _FileLock | None = None
+
+    @contextmanager
+    def _locked(self, exclusive: bool = False):
+        """Hold the thread lock and, if the backend has one, the file lock."""
+        with self._lock:
+            if self._file_lock is None:
+                yield
+            else:
+                with self._file_lock.hold(exclusive):
+                    yield
+
+    def load(self) -> dict[str, dict]:
+        """Load all users."""
+        raise NotImplementedError
+
+    def save(self, users: dict[str, dict]):
+        """Replace all users."""
+        raise NotImplementedError
+
+    def get(self, username: str) -> dict | None:
+        """Return the record for a username, or None."""
+        return self.load().get(username)
+
+    def insert(self, username: str, record: dict) -> bool:
+        """Add a new user.
+
+        Returns:
+            bool: False if the username is already taken
+        """
+        with self._locked(exclusive=True):
+            users = self.load()
+            if username in users:
+                return False
+            users[username] = record
+            self.save(users)
+            return True
+
+    def update(self, username: str, record: dict):
+        """Create or overwrite the record for a username."""
+        with self._locked(exclusive=True):
+            users = self.load()
+            users[username] = record
+            self.save(users)
+
+    def insert_many(self, records: Iterable[tuple[str, dict]]) -> list[bool]:
+        """Add several users with one load and one save.
+
+        Returns:
+            list: insert's result for each (username, record) pair, in order
+        """
+        with self._locked(exclusive=True):
+            users = self.load()
+            results = []
+            for username, record in records:
+                results.append(username not in users)
+                users.setdefault(username, record)
+            if any(results):
+                self.save(users)
+            return results
+
+
+class JsonUserStorage(UserStorage):
+    """Stores all users in a single users.json object.
+
+    The parsed object is kept in memory and only re-read when the file's
+    stat signature (inode, size, mtime) changes, so lookups don't parse the
+    file each time.
+    """
+
+    USERS_FILE = "users.json"
+
+    def __init__(
+        self,
+        data_dir: str,
+        durability: str = "dir",
+        codec: JsonCodec | None = None,
+    ):
+        super().__init__(data_dir, durability, codec)
         self.users_file_path = os.path.join(data_dir, self.USERS_FILE)
+        self._file_lock = _FileLock(f"{self.users_file_path}.lock")
+        self._cached_users: dict[str, dict] | None = None
+        self._cached_signature: tuple | None = None
         self._ensure_users_file()
 
     def _ensure_users_file(self):
@@ -51,22 +632,387 @@ class AuthManager:
             with open(self.users_file_path, "w") as f:
                 json.dump({}, f)
 
-    def _hash_password(self, password: str) -> str:
-        """Hash a password using SHA-256."""
-        return hashlib.sha256(password.encode()).hexdigest()
+    def _users(self) -> dict[str, dict]:
+        """Return the cached users, re-reading the file if it changed."""
+        with self._locked():
+            signature = _file_signature(self.users_file_path)
+            if self._cached_users is None or signature != self._cached_signature:
+                try:
+                    with open(self.users_file_path, "rb") as f:
+                        users = self.codec.loads(f.read())
+                except (ValueError, FileNotFoundError):
+                    users = {}
+                self._cached_users = users
+                self._cached_signature = signature
+            return self._cached_users
 
-    def _load_users(self) -> dict:
+    def load(self) -> dict[str, dict]:
         """Load users from JSON file."""
-        try:
-            with open(self.users_file_path, "r") as f:
-                return json.load(f)
-        except (json.JSONDecodeError, FileNotFoundError):
-            return {}
+        # A copy, so callers can modify it without touching the cache
+        return dict(self._users())
+
+    def get(self, username: str) -> dict | None:
+        return self._users().get(username)
+
+    def save(self, users: dict[str, dict]):
+        """Save users to JSON file via an atomic replace."""
+        with self._locked(exclusive=True):
+            _replace_file(
+                self.users_file_path,
+                lambda f: f.write(self.codec.dumps(users)),
+                self.durability,
+            )
+            self._cached_users = dict(users)
+            self._cached_signature = _file_signature(self.users_file_path)
+
+
+class SqliteUserStorage(UserStorage):
+    """Stores users as rows of a SQLite table keyed by username."""
+
+    def __init__(
+        self,
+        data_dir: str,
+        durability: str = "dir",
+        codec: JsonCodec | None = None,
+    ):
+        super().__init__(data_dir, durability, codec)
+        self.db_path = os.path.join(data_dir, SQLITE_FILE)
+        self._lock = threading.Lock()
+        self._conn = _connect_sqlite(self.db_path, self.durability)
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS users ("
+                "username TEXT PRIMARY KEY, data TEXT NOT NULL)"
+            )
+
+    def close(self):
+        """Close the database connection."""
+        self._conn.close()
+
+    def _dumps(self, record: dict) -> str:
+        return self.codec.dumps(record, pretty=False).decode()
+
+    def load(self) -> dict[str, dict]:
+        with self._lock:
+            rows = self._conn.execute("SELECT username, data FROM users").fetchall()
+        return {username: self.codec.loads(data) for username, data in rows}
+
+    def save(self, users: dict[str, dict]):
+        rows = [(username, self._dumps(record)) for username, record in users.items()]
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM users")
+            self._conn.executemany("INSERT INTO users VALUES (?, ?)", rows)
+
+    def get(self, username: str) -> dict | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data FROM users WHERE username = ?", (username,)
+            ).fetchone()
+        return None if row is None else self.codec.loads(row[0])
+
+    def insert(self, username: str, record: dict) -> bool:
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "INSERT OR IGNORE INTO users VALUES (?, ?)",
+                (username, self._dumps(record)),
+            )
+        return cursor.rowcount == 1
+
+    def insert_many(self, records: Iterable[tuple[str, dict]]) -> list[bool]:
+        results = []
+        with self._lock, self._conn:
+            for username, record in records:
+                cursor = self._conn.execute(
+                    "INSERT OR IGNORE INTO users VALUES (?, ?)",
+                    (username, self._dumps(record)),
+                )
+                results.append(cursor.rowcount == 1)
+        return results
+
+    def update(self, username: str, record: dict):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO users VALUES (?, ?)",
+                (username, self._dumps(record)),
+            )
 
-    def _save_users(self, users: dict):
-        """Save users to JSON file."""
-        with open(self.users_file_path, "w") as f:
-            json.dump(users, f, indent=2)
+
+USER_STORAGE_BACKENDS: dict[str, type[UserStorage]] = {
+    "json": JsonUserStorage,
+    "sqlite": SqliteUserStorage,
+}
+
+# Password hashing schemes and their default cost parameters. scrypt's n
+# must be a power of two and it needs about 128 * n * r bytes of memory.
+PASSWORD_KDFS: dict[str, dict[str, int]] = {
+    "scrypt": {"n": 2**14, "r": 8, "p": 1},
+    "pbkdf2_sha256": {"iterations": 200_000},
+}
+_SALT_BYTES = 16
+
+
+def _derive_key(password: str, salt: bytes, kdf: str, params: dict) -> str:
+    """Return the hex digest of ``password`` under a PASSWORD_KDFS scheme."""
+    if kdf == "scrypt":
+        n, r, p = params["n"], params["r"], params["p"]
+        key = hashlib.scrypt(
+            password.encode(),
+            salt=salt,
+            n=n,
+            r=r,
+            p=p,
+            maxmem=256 * n * r * p,
+            dklen=32,
+        )
+    elif kdf == "pbkdf2_sha256":
+        key = hashlib.pbkdf2_hmac(
+            "sha256", password.encode(), salt, params["iterations"], dklen=32
+        )
+    else:
+        raise ValueError(f"Unknown password hashing scheme: {kdf!r}")
+    return key.hex()
+
+
+def _password_record(password: str, kdf: str, params: dict) -> dict:
+    """Hash a password with a fresh salt into user record fields.
+
+    A module-level function so process pools can run it.
+    """
+    salt = os.urandom(_SALT_BYTES)
+    return {
+        "password": _derive_key(password, salt, kdf, params),
+        "salt": salt.hex(),
+        "kdf": kdf,
+        "params": dict(params),
+    }
+
+
+def available_cores() -> int:
+    """Return the number of CPU cores this process may run on."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:  # Not available on macOS and Windows
+        return os.cpu_count() or 1
+
+
+class TokenStore:
+    """Bounded store of session tokens, persisted in tokens.json.
+
+    Only a SHA-256 of each token is kept, so the file can't be replayed as
+    credentials. Validation is a dict lookup after a stat of the file, which
+    is re-read only when another process has issued or revoked a token.
+    Expired tokens are evicted when seen and whenever a token is issued;
+    past ``max_tokens`` the oldest tokens are dropped first.
+    """
+
+    TOKENS_FILE = "tokens.json"
+
+    def __init__(
+        self,
+        data_dir: str,
+        ttl: float = 3600.0,
+        max_tokens: int = 10_000,
+        durability: str = "dir",
+        codec: JsonCodec | None = None,
+    ):
+        """Initialize the store.
+
+        Args:
+            data_dir: Directory holding tokens.json
+            ttl: Default lifetime of a token in seconds
+            max_tokens: Most tokens kept; the oldest are evicted beyond it
+            durability: One of DURABILITY_LEVELS
+            codec: JSON codec for the file; defaults to get_json_codec()
+        """
+        self.tokens_file_path = os.path.join(data_dir, self.TOKENS_FILE)
+        self.ttl = ttl
+        self.max_tokens = max_tokens
+        self.durability = _check_durability(durability)
+        self.codec = codec or get_json_codec()
+        self._lock = threading.RLock()
+        self._file_lock = _FileLock(f"{self.tokens_file_path}.lock")
+        # SHA-256 of the token -> (username, expiry as epoch seconds)
+        self._tokens: dict[str, tuple[str, float]] = {}
+        self._signature: tuple | None = None
+
+    @staticmethod
+    def _key(token: str) -> str:
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def _sync(self):
+        """Re-read tokens.json if it changed since it was last read."""
+        signature = _file_signature(self.tokens_file_path)
+        if signature == self._signature:
+            return
+        tokens = {}
+        if signature is not None:
+            try:
+                with open(self.tokens_file_path, "rb") as f:
+                    data = self.codec.loads(f.read())
+                tokens = {key: (user, expiry) for key, (user, expiry) in data.items()}
+            except (ValueError, FileNotFoundError):
+                pass
+        self._tokens = tokens
+        self._signature = signature
+
+    def _save(self):
+        _replace_file(
+            self.tokens_file_path,
+            lambda f: f.write(self.codec.dumps(self._tokens)),
+            self.durability,
+        )
+        self._signature = _file_signature(self.tokens_file_path)
+
+    def issue(self, username: str, ttl: float | None = None) -> str:
+        """Create a token for a user, valid for ``ttl`` seconds."""
+        token = secrets.token_urlsafe(32)
+        with self._lock, self._file_lock.hold(exclusive=True):
+            self._sync()
+            now = time.time()
+            self._tokens = {
+                key: entry for key, entry in self._tokens.items() if entry[1] > now
+            }
+            while len(self._tokens) >= self.max_tokens:
+                del self._tokens[next(iter(self._tokens))]
+            self._tokens[self._key(token)] = (
+                username,
+                now + (self.ttl if ttl is None else ttl),
+            )
+            self._save()
+        return token
+
+    def validate(self, token: str) -> str | None:
+        """Return the username a live token was issued to, or None."""
+        key = self._key(token)
+        with self._lock:
+            self._sync()
+            entry = self._tokens.get(key)
+            if entry is None:
+                return None
+            if entry[1] <= time.time():
+                # The file copy goes at the next issue
+                del self._tokens[key]
+                return None
+            return entry[0]
+
+    def revoke(self, token: str) -> bool:
+        """Invalidate a token.
+
+        Returns:
+            bool: False if the token was unknown
+        """
+        key = self._key(token)
+        with self._lock, self._file_lock.hold(exclusive=True):
+            self._sync()
+            if self._tokens.pop(key, None) is None:
+                return False
+            self._save()
+            return True
+
+
+class AuthManager:
+    """Manages user authentication (sign up and login) on a user store."""
+
+    USERS_FILE = "users.json"
+
+    def __init__(
+        self,
+        data_dir: str = ".",
+        storage: str | UserStorage = "json",
+        durability: str = "dir",
+        codec: str = "auto",
+        pretty: bool = True,
+        kdf: str = "scrypt",
+        kdf_params: dict[str, int] | None = None,
+        token_ttl: float = 3600.0,
+    ):
+        """Initialize AuthManager with a data directory.
+
+        Args:
+            data_dir: Directory holding the user data
+            storage: Backend name from USER_STORAGE_BACKENDS ("json" or
+                "sqlite") or a ready-made UserStorage instance
+            durability: One of DURABILITY_LEVELS, used when a backend is
+                created from its name
+            codec: JSON_CODECS name or "auto", used when a backend is created
+                from its name
+            pretty: Write indented rather than compact JSON
+            kdf: Password hashing scheme from PASSWORD_KDFS for new hashes
+            kdf_params: Cost parameters overriding the scheme's defaults;
+                users hashed with other settings are rehashed at login
+            token_ttl: Lifetime in seconds of tokens from issue_token
+        """
+        if kdf not in PASSWORD_KDFS:
+            raise ValueError(f"Unknown password hashing scheme: {kdf!r}")
+        self.kdf = kdf
+        self.kdf_params = {**PASSWORD_KDFS[kdf], **(kdf_params or {})}
+        self.data_dir = data_dir
+        self.users_file_path = os.path.join(data_dir, self.USERS_FILE)
+        if isinstance(storage, str):
+            try:
+                backend = USER_STORAGE_BACKENDS[storage]
+            except KeyError:
+                raise ValueError(f"Unknown storage backend: {storage!r}") from None
+            storage = backend(
+                data_dir,
+                durability=durability,
+                codec=get_json_codec(codec, pretty),
+            )
+        self.storage = storage
+        self.tokens = TokenStore(
+            data_dir, ttl=token_ttl, durability=durability, codec=storage.codec
+        )
+
+    def _hash_password(self, password: str) -> dict:
+        """Hash a password with a fresh salt and the configured scheme.
+
+        Returns:
+            dict: The user record fields (password, salt, kdf, params)
+        """
+        return _password_record(password, self.kdf, self.kdf_params)
+
+    def hash_passwords(
+        self, passwords: list[str], workers: int | None = 1
+    ) -> list[dict]:
+        """Hash many passwords, optionally across a process pool.
+
+        Password hashing is CPU-bound and holds the GIL, so only processes
+        make it run in parallel.
+
+        Args:
+            passwords: The plain passwords
+            workers: Processes to use; None for every available core, 1 to
+                hash in this process
+
+        Returns:
+            list: _hash_password's record fields for each password, in order
+        """
+        if workers is None:
+            workers = available_cores()
+        if workers <= 1 or len(passwords) < 2:
+            return [self._hash_password(password) for password in passwords]
+        hash_one = partial(_password_record, kdf=self.kdf, params=self.kdf_params)
+        with ProcessPoolExecutor(min(workers, len(passwords))) as pool:
+            chunksize = max(1, len(passwords) // (workers * 4))
+            return list(pool.map(hash_one, passwords, chunksize=chunksize))
+
+    @staticmethod
+    def _check_password(user: dict, password: str) -> bool:
+        """Check a password against a user record in constant time.
+
+        Records without a "kdf" field are legacy unsalted SHA-256 hashes.
+        """
+        if "kdf" not in user:
+            hashed_password = hashlib.sha256(password.encode()).hexdigest()
+        else:
+            hashed_password = _derive_key(
+                password, bytes.fromhex(user["salt"]), user["kdf"], user["params"]
+            )
+        return hmac.compare_digest(hashed_password, user["password"])
+
+    def _needs_rehash(self, user: dict) -> bool:
+        """Return True if a record isn't hashed with the current settings."""
+        return user.get("kdf") != self.kdf or user.get("params") != self.kdf_params
 
     def sign_up(self, username: str, password: str) -> tuple[bool, str]:
         """
@@ -78,15 +1024,68 @@ class AuthManager:
         if not username or not password:
             return False, "Username and password cannot be empty."
 
-        users = self._load_users()
-
-        if username in users:
+        if self.storage.get(username) is not None:
             return False, "Username already exists. Please choose a different one."
 
-        users[username] = {"password": self._hash_password(password)}
-        self._save_users(users)
+        record = self._hash_password(password)
+        if not self.storage.insert(username, record):
+            return False, "Username already exists. Please choose a different one."
         return True, f"Sign up successful! Welcome, {username}!"
 
+    def sign_up_many(
+        self,
+        credentials: Iterable[tuple[str, str]],
+        workers: int | None = 1,
+        timings: dict[str, float] | None = None,
+    ) -> list[tuple[bool, str]]:
+        """Register several users with a single write to the user store.
+
+        Args:
+            credentials: (username, password) pairs
+            workers: Processes hashing the passwords (see hash_passwords)
+            timings: If given, filled with the seconds spent in the "hash"
+                and "persist" phases
+
+        Returns:
+            list: sign_up's (success, message) for each pair, in order; a
+            username repeated within the batch fails after its first use
+        """
+        taken = (False, "Username already exists. Please choose a different one.")
+        results: list[tuple[bool, str] | None] = []
+        usernames: list[str] = []
+        passwords: list[str] = []
+        positions: list[int] = []
+        seen: set[str] = set()
+        for username, password in credentials:
+            if not username or not password:
+                results.append((False, "Username and password cannot be empty."))
+                continue
+            # Rejected before hashing, which dominates the cost of a sign-up
+            if username in seen or self.storage.get(username) is not None:
+                results.append(taken)
+                continue
+            seen.add(username)
+            positions.append(len(results))
+            results.append(None)
+            usernames.append(username)
+            passwords.append(password)
+
+        start = time.perf_counter()
+        records = list(zip(usernames, self.hash_passwords(passwords, workers)))
+        hashed = time.perf_counter()
+        inserted = self.storage.insert_many(records)
+        if timings is not None:
+            timings["hash"] = hashed - start
+            timings["persist"] = time.perf_counter() - hashed
+
+        for position, username, ok in zip(positions, usernames, inserted):
+            if ok:
+                results[position] = (True, f"Sign up successful! Welcome, {username}!")
+            else:
+                # Registered by another process while the passwords hashed
+                results[position] = taken
+        return results
+
     def login(self, username: str, password: str) -> tuple[bool, str]:
         """
         Authenticate a user.
@@ -97,156 +1096,2586 @@ class AuthManager:
         if not username or not password:
             return False, "Username and password cannot be empty."
 
-        users = self._load_users()
+        user = self.storage.get(username)
 
-        if username not in users:
+        if user is None:
             return False, "Username not found. Please sign up first."
 
-        hashed_password = self._hash_password(password)
-        if users[username]["password"] != hashed_password:
+        if not self._check_password(user, password):
             return False, "Incorrect password. Please try again."
 
+        if self._needs_rehash(user):
+            # Upgrade legacy SHA-256 and outdated cost settings while the
+            # plain password is at hand
+            self.storage.update(username, {**user, **self._hash_password(password)})
+
         return True, f"Login successful! Welcome, {username}!"
 
+    def issue_token(
+        self, username: str, password: str, ttl: float | None = None
+    ) -> str | None:
+        """Log in and return a session token, or None if login fails.
 
-class TodoManager:
-    """Manages todo items with JSON storage."""
+        The token stands in for the password in later calls: checking it
+        with validate_token costs a dict lookup instead of a password hash.
 
-    TODOS_FILE = "todos.json"
+        Args:
+            username: The user to log in
+            password: Their password
+            ttl: Lifetime in seconds; defaults to the manager's token_ttl
+        """
+        ok, _ = self.login(username, password)
+        return self.tokens.issue(username, ttl) if ok else None
 
-    def __init__(self, data_dir: str = "."):
-        """Initialize TodoManager with a data directory."""
-        self.data_dir = data_dir
-        self.todos_file_path = os.path.join(data_dir, self.TODOS_FILE)
-        self._ensure_todos_file()
+    def validate_token(self, token: str) -> str | None:
+        """Return the username of a live session token, or None."""
+        return self.tokens.validate(token)
 
-    def _ensure_todos_file(self):
-        """Create todos.json if it doesn't exist."""
-        if not os.path.exists(self.todos_file_path):
-            with open(self.todos_file_path, "w") as f:
-                json.dump([], f)
+    def revoke_token(self, token: str) -> bool:
+        """Log a session token out; False if it was unknown."""
+        return self.tokens.revoke(token)
 
-    def _load_todos(self) -> list[dict]:
-        """Load todos from JSON file."""
-        try:
-            with open(self.todos_file_path, "r") as f:
-                return json.load(f)
-        except (json.JSONDecodeError, FileNotFoundError):
-            return []
 
-    def _save_todos(self, todos: list[dict]):
-        """Save todos to JSON file."""
-        with open(self.todos_file_path, "w") as f:
-            json.dump(todos, f, indent=2)
+_JSON_DECODER = json.JSONDecoder()
+_JSON_WHITESPACE = " \t\n\r"
 
-    def get_all_todos(self) -> list[TodoItem]:
-        """Get all todos from the system."""
-        todos_data = self._load_todos()
-        all_todos = []
-        for todo in todos_data:
-            # Convert string values back to enums
-            todo_dict = todo.copy()
-            todo_dict["priority"] = Priority(todo["priority"])
-            todo_dict["status"] = Status(todo["status"])
-            all_todos.append(TodoItem(**todo_dict))
-        return all_todos
 
-    def get_user_todos(self, username: str) -> list[TodoItem]:
-        """Get all todos for a user."""
-        todos_data = self._load_todos()
-        user_todos = []
-        for todo in todos_data:
-            if todo.get("owner") == username:
-                # Convert string values back to enums
-                todo_dict = todo.copy()
-                todo_dict["priority"] = Priority(todo["priority"])
-                todo_dict["status"] = Status(todo["status"])
-                user_todos.append(TodoItem(**todo_dict))
-        return user_todos
+def _iter_json_array(f, chunk_size: int = 64 * 1024) -> Iterator:
+    """Yield the elements of a top-level JSON array from a text file.
 
-    def add_todo(self, todo: TodoItem) -> bool:
-        """Add a new todo item."""
-        todos_data = self._load_todos()
-        todos_data.append(
-            {
-                "id": todo.id,
-                "title": todo.title,
-                "details": todo.details,
-                "priority": todo.priority.value,
-                "status": todo.status.value,
-                "owner": todo.owner,
-                "created_at": todo.created_at,
-                "updated_at": todo.updated_at,
-            }
-        )
-        self._save_todos(todos_data)
-        return True
+    The file is read ``chunk_size`` characters at a time and each element is
+    decoded on its own, so memory is bounded by the chunk size plus the
+    largest single element rather than by the file size. Like the
+    non-streaming readers, malformed or truncated input ends the iteration
+    quietly instead of raising.
+    """
+    buffer, pos, eof = "", 0, False
+    state = "open"  # open -> first -> (sep -> value)* -> done
 
-    def update_todo(self, todo_id: str, updated_todo: TodoItem) -> bool:
-        """Update an existing todo item."""
-        todos_data = self._load_todos()
-        for i, todo in enumerate(todos_data):
-            if todo["id"] == todo_id:
-                updated_data = {
-                    "id": updated_todo.id,
-                    "title": updated_todo.title,
-                    "details": updated_todo.details,
-                    "priority": updated_todo.priority.value,
-                    "status": updated_todo.status.value,
-                    "owner": updated_todo.owner,
-                    "created_at": updated_todo.created_at,
-                    "updated_at": updated_todo.updated_at,
-                }
-                todos_data[i] = updated_data
-                self._save_todos(todos_data)
-                return True
-        return False
+    while True:
+        while pos < len(buffer) and buffer[pos] in _JSON_WHITESPACE:
+            pos += 1
+        if pos == len(buffer):
+            if eof:
+                return
+            chunk = f.read(chunk_size)
+            eof = not chunk
+            buffer, pos = chunk, 0
+            continue
 
-    def delete_todo(self, todo_id: str) -> bool:
-        """Delete a todo item."""
-        todos_data = self._load_todos()
-        todos_data = [todo for todo in todos_data if todo["id"] != todo_id]
-        self._save_todos(todos_data)
+        char = buffer[pos]
+        if state == "open":
+            if char != "[":
+                return
+            pos += 1
+            state = "first"
+        elif state == "sep":
+            if char != ",":
+                return  # "]" closes the array; anything else is malformed
+            pos += 1
+            state = "value"
+        elif state == "first" and char == "]":
+            return
+        else:
+            try:
+                item, end = _JSON_DECODER.raw_decode(buffer, pos)
+                after = end
+                while after < len(buffer) and buffer[after] in _JSON_WHITESPACE:
+                    after += 1
+            except json.JSONDecodeError:
+                end = after = None
+            # A value cut short by the chunk boundary can still decode ("0."
+            # of "0.1" reads as 0), so only trust it once the "," or "]"
+            # after it has been read
+            if end is None or after == len(buffer) or buffer[after] not in ",]":
+                if eof:
+                    return
+                chunk = f.read(chunk_size)
+                eof = not chunk
+                buffer, pos = buffer[pos:] + chunk, 0
+                continue
+            yield item
+            pos = end
+            state = "sep"
+
+
+class _TodoIndex:
+    """The todo list plus id -> position and owner -> [ids] maps.
+
+    Both maps are built lazily on first use and then kept in sync by every
+    mutation. A delete leaves a None hole in the list instead of shifting the
+    positions of later items; ``records()`` compacts holes away when the full
+    list is needed.
+    """
+
+    def __init__(self, todos: list[dict]):
+        self.todos = todos
+        self.holes = 0
+        self._positions: dict[str, int] | None = None
+        self._owners: dict[str, list[str]] | None = None
+
+    @property
+    def positions(self) -> dict[str, int]:
+        """Map of todo id to its position in ``todos``."""
+        if self._positions is None:
+            positions = {}
+            for i, todo in enumerate(self.todos):
+                if todo is not None:
+                    # Keep the first occurrence of a duplicated id
+                    positions.setdefault(todo["id"], i)
+            self._positions = positions
+        return self._positions
+
+    @property
+    def owners(self) -> dict[str, list[str]]:
+        """Map of owner to their todo ids, in list order."""
+        if self._owners is None:
+            owners: dict[str, list[str]] = {}
+            for todo in self.todos:
+                if todo is not None:
+                    owners.setdefault(todo.get("owner"), []).append(todo["id"])
+            self._owners = owners
+        return self._owners
+
+    def records(self) -> list[dict]:
+        """Return the todo list with deleted holes compacted away."""
+        if self.holes:
+            self.todos = [todo for todo in self.todos if todo is not None]
+            self.holes = 0
+            self._positions = None
+        return self.todos
+
+    def get(self, todo_id: str) -> dict | None:
+        i = self.positions.get(todo_id)
+        return None if i is None else self.todos[i]
+
+    def by_owner(self, owner: str) -> list[dict]:
+        todos, positions = self.todos, self.positions
+        return [todos[positions[todo_id]] for todo_id in self.owners.get(owner, ())]
+
+    def insert(self, record: dict):
+        if self._positions is not None:
+            self._positions.setdefault(record["id"], len(self.todos))
+        if self._owners is not None:
+            self._owners.setdefault(record.get("owner"), []).append(record["id"])
+        self.todos.append(record)
+
+    def replace(self, todo_id: str, record: dict) -> bool:
+        positions = self.positions
+        i = positions.get(todo_id)
+        if i is None:
+            return False
+        old = self.todos[i]
+        self.todos[i] = record
+        if record["id"] != todo_id:
+            del positions[todo_id]
+            positions[record["id"]] = i
+        if self._owners is not None and (
+            record["id"] != todo_id or record.get("owner") != old.get("owner")
+        ):
+            self._owners_remove(old.get("owner"), todo_id)
+            owner_ids = self._owners.setdefault(record.get("owner"), [])
+            bisect.insort(owner_ids, record["id"], key=positions.__getitem__)
         return True
 
-    def get_todo_by_id(self, todo_id: str) -> TodoItem | None:
-        """Get a specific todo item by ID.
+    def remove(self, todo_id: str) -> bool:
+        i = self.positions.pop(todo_id, None)
+        if i is None:
+            return False
+        old = self.todos[i]
+        self.todos[i] = None
+        self.holes += 1
+        if self._owners is not None:
+            self._owners_remove(old.get("owner"), todo_id)
+        return True
 
-        Returns:
-            TodoItem if found, None otherwise
-        """
-        todos_data = self._load_todos()
-        for todo in todos_data:
-            if todo["id"] == todo_id:
-                # Convert string values back to enums
-                todo_dict = todo.copy()
-                todo_dict["priority"] = Priority(todo["priority"])
-                todo_dict["status"] = Status(todo["status"])
-                return TodoItem(**todo_dict)
-        return None
+    def _owners_remove(self, owner: str, todo_id: str):
+        owner_ids = self._owners[owner]
+        owner_ids.remove(todo_id)
+        if not owner_ids:
+            del self._owners[owner]
 
-    def mark_as_completed(self, todo_id: str) -> bool:
-        """Mark a specific todo item as completed.
+
+# Fields TodoStorage.query can order by; priorities sort HIGH, MID, LOW
+QUERY_ORDER_FIELDS = ("created_at", "updated_at", "title", "priority")
+_PRIORITY_RANK = {"HIGH": 0, "MID": 1, "LOW": 2}
+
+
+def _priority_rank(record: dict) -> int:
+    """Sort key putting HIGH before MID before LOW."""
+    return _PRIORITY_RANK[record["priority"]]
+
+
+def _parse_order_by(order_by: str) -> tuple[str, bool]:
+    """Split an order_by like "-created_at" into (field, descending)."""
+    descending = order_by.startswith("-")
+    field_name = order_by.lstrip("-")
+    if field_name not in QUERY_ORDER_FIELDS:
+        raise ValueError(f"Cannot order todos by {order_by!r}")
+    return field_name, descending
+
+
+class TodoStorage:
+    """Base class for todo storage backends.
+
+    Backends store todo records as plain dicts following the todos.json
+    schema. List-based subclasses provide ``_read``, ``_write`` and
+    ``_signature``; lookups go through an id/owner index over the loaded
+    list, and mutations update the list in memory and then ``_persist`` it
+    (a full rewrite by default). Inside ``transaction()`` persistence is
+    deferred and done once for the whole batch.
+    """
+
+    def __init__(
+        self,
+        data_dir: str,
+        cache: bool = False,
+        durability: str = "dir",
+        codec: JsonCodec | None = None,
+    ):
+        """Initialize the backend.
 
         Args:
-            todo_id: The ID of the todo item to mark as completed
+            data_dir: Directory holding the backend's files
+            cache: Keep the parsed todos and their indexes in memory and only
+                re-read them when the on-disk signature changes (write-through
+                on save)
+            durability: One of DURABILITY_LEVELS
+            codec: JSON codec for the files; defaults to get_json_codec()
+        """
+        self.data_dir = data_dir
+        self.cache = cache
+        self.durability = _check_durability(durability)
+        self.codec = codec or get_json_codec()
+        self._lock = threading.RLock()
+        self._file_lock: _FileLock | None = None
+        self._cached_index: _TodoIndex | None = None
+        self._cached_signature: tuple | None = None
+        self._txn_index: _TodoIndex | None = None
+        self._txn_entries: list[dict] = []
 
-        Returns:
-            bool: True if successfully marked as completed, False otherwise
+    @contextmanager
+    def _locked(self, exclusive: bool = False):
+        """Hold the thread lock and, if the backend has one, the file lock.
+
+        Readers take the file lock shared and writers take it exclusive, so
+        a load-modify-save cycle can't interleave with another process.
         """
-        todo = self.get_todo_by_id(todo_id)
-        if todo is None:
+        with self._lock:
+            if self._file_lock is None:
+                yield
+            else:
+                with self._file_lock.hold(exclusive):
+                    yield
+
+    def _signature(self) -> tuple | None:
+        """Return a cheap fingerprint of the on-disk state."""
+        raise NotImplementedError
+
+    def _read(self) -> list[dict]:
+        """Read every todo record from disk."""
+        raise NotImplementedError
+
+    def _write(self, todos: list[dict]):
+        """Write every todo record to disk."""
+        raise NotImplementedError
+
+    def _persist(self, index: _TodoIndex, entries: list[dict]):
+        """Make mutations already applied to ``index`` durable.
+
+        Each entry describes one mutation as {"op": "add", "todo": record},
+        {"op": "update", "id": todo_id, "todo": record} or {"op": "delete",
+        "id": todo_id}.
+        """
+        self.save(index.records())
+
+    def _apply(self, index: _TodoIndex, entry: dict):
+        """Persist a mutation now, or queue it inside a transaction."""
+        if self._txn_index is not None:
+            self._txn_entries.append(entry)
+        else:
+            self._persist(index, [entry])
+
+    @contextmanager
+    def transaction(self):
+        """Defer persistence of every mutation until the block exits.
+
+        The exclusive lock is held throughout and mutations apply to one
+        in-memory index. On a clean exit the batch is persisted once; if the
+        block raises, the in-memory changes are dropped and the files are
+        left as they were. Nested transactions join the outermost one.
+        """
+        with self._locked(exclusive=True):
+            if self._txn_index is not None:
+                yield
+                return
+            self._txn_index = self._index()
+            self._txn_entries = []
+            try:
+                yield
+            except BaseException:
+                self.invalidate()
+                raise
+            else:
+                if self._txn_entries:
+                    self._persist(self._txn_index, self._txn_entries)
+            finally:
+                self._txn_index = None
+                self._txn_entries = []
+
+    def _file_signature(self, path: str) -> tuple[int, int, int] | None:
+        """Return (inode, size, mtime_ns) of a file, or None if missing."""
+        return _file_signature(path)
+
+    def invalidate(self):
+        """Drop the in-memory copy so the next load re-reads the disk."""
+        self._cached_index = None
+        self._cached_signature = None
+
+    def version(self, owner: str | None = None) -> Hashable:
+        """Return a token that changes whenever the stored todos change.
+
+        It costs a stat or two rather than a read, so a caller holding a copy
+        of the todos can compare tokens to decide whether to re-read them.
+        Backends that keep owners apart may narrow the check to ``owner``.
+        """
+        return self._signature()
+
+    def _index(self) -> _TodoIndex:
+        """Return the indexed todo list.
+
+        In cached mode the index is reused as long as the signature is
+        unchanged, so an external writer still forces a reload. Inside a
+        transaction the transaction's working index is returned.
+        """
+        if self._txn_index is not None:
+            return self._txn_index
+        signature = self._signature() if self.cache else None
+        if self._cached_index is not None and signature == self._cached_signature:
+            return self._cached_index
+
+        index = _TodoIndex(self._read())
+        if self.cache:
+            self._cached_index = index
+            self._cached_signature = signature
+        return index
+
+    def load(self) -> list[dict]:
+        """Load all todo records.
+
+        The list belongs to the caller. A cached or in-transaction index is
+        shared and changed in place by later writes (a delete leaves a None
+        hole), so a copy of it is taken before the lock is released.
+        """
+        with self._locked():
+            records = self._index().records()
+            if self.cache or self._txn_index is not None:
+                return list(records)
+            return records
+
+    def iter_records(
+        self, owner: str | None = None, status: str | None = None
+    ) -> Iterator[dict]:
+        """Iterate over todo records, optionally filtered.
+
+        Args:
+            owner: Only yield records belonging to this owner
+            status: Only yield records with this status value
+        """
+        records = self.load() if owner is None else self.by_owner(owner)
+        if status is None:
+            return iter(records)
+        return (record for record in records if record["status"] == status)
+
+    def save(self, todos: list[dict]):
+        """Replace all todo records on disk."""
+        with self._locked(exclusive=True):
+            try:
+                self._write(todos)
+            except BaseException:
+                # The cached list may already hold the unsaved mutation
+                self.invalidate()
+                raise
+
+            if self.cache:
+                if self._cached_index is None or self._cached_index.todos is not todos:
+                    self._cached_index = _TodoIndex(todos)
+                self._cached_signature = self._signature()
+
+    def get(self, todo_id: str, owner: str | None = None) -> dict | None:
+        """Return the record with the given id, or None.
+
+        ``owner`` is an optional hint of the todo's current owner; backends
+        that partition data by owner use it to avoid searching.
+        """
+        with self._locked():
+            return self._index().get(todo_id)
+
+    def get_many(self, todo_ids: Iterable[str], owner: str | None = None) -> list[dict]:
+        """Return the records with the given ids, skipping missing ones.
+
+        Unlike repeated ``get`` calls this reads the storage only once.
+        """
+        with self._locked():
+            index = self._index()
+            return [record for record in map(index.get, todo_ids) if record is not None]
+
+    def by_owner(self, owner: str) -> list[dict]:
+        """Return all records belonging to an owner."""
+        with self._locked():
+            return self._index().by_owner(owner)
+
+    def query(
+        self,
+        owner: str | None = None,
+        status: str | None = None,
+        priority: str | None = None,
+        created_after: str | None = None,
+        order_by: str | None = None,
+        limit: int | None = None,
+        offset: int = 0,
+    ) -> Iterator[dict]:
+        """Iterate over the records matching every given filter.
+
+        Owner and status go to ``iter_records`` (and so to the owner index or
+        the streaming reader); the remaining filters are applied on the fly.
+        Ordering only keeps ``offset + limit`` records when a limit is given.
+
+        Args:
+            owner: Only records belonging to this owner
+            status: Only records with this status value
+            priority: Only records with this priority value
+            created_after: Only records created strictly after this ISO
+                timestamp
+            order_by: A QUERY_ORDER_FIELDS name, prefixed with "-" for
+                descending order; insertion order by default
+            limit: Return at most this many records
+            offset: Skip this many matching records first
+        """
+        records = self._filtered(owner, status, priority, created_after)
+        if order_by is not None:
+            field_name, descending = _parse_order_by(order_by)
+            if field_name == "priority":
+                key = _priority_rank
+            else:
+                key = itemgetter(field_name)
+            if limit is None:
+                records = iter(sorted(records, key=key, reverse=descending))
+            else:
+                select = heapq.nlargest if descending else heapq.nsmallest
+                records = iter(select(offset + limit, records, key=key))
+        stop = None if limit is None else offset + limit
+        return islice(records, offset, stop)
+
+    def count(
+        self,
+        owner: str | None = None,
+        status: str | None = None,
+        priority: str | None = None,
+        created_after: str | None = None,
+    ) -> int:
+        """Count the records matching every given filter (see ``query``)."""
+        return sum(1 for _ in self._filtered(owner, status, priority, created_after))
+
+    def _filtered(
+        self,
+        owner: str | None,
+        status: str | None,
+        priority: str | None,
+        created_after: str | None,
+    ) -> Iterator[dict]:
+        records = self.iter_records(owner=owner, status=status)
+        if priority is not None:
+            records = (record for record in records if record["priority"] == priority)
+        if created_after is not None:
+            records = (
+                record for record in records if record["created_at"] > created_after
+            )
+        return records
+
+    def insert(self, record: dict):
+        """Append a new record."""
+        with self._locked(exclusive=True):
+            index = self._index()
+            index.insert(record)
+            self._apply(index, {"op": "add", "todo": record})
+
+    def replace(self, todo_id: str, record: dict, owner: str | None = None) -> bool:
+        """Replace the record with the given id.
+
+        Returns:
+            bool: True if the record existed, False otherwise
+        """
+        with self._locked(exclusive=True):
+            index = self._index()
+            if not index.replace(todo_id, record):
+                return False
+            self._apply(index, {"op": "update", "id": todo_id, "todo": record})
+            return True
+
+    def compare_and_replace(
+        self,
+        todo_id: str,
+        record: dict,
+        expected_updated_at: str,
+        owner: str | None = None,
+    ) -> UpdateResult:
+        """Replace a record only if its updated_at still matches.
+
+        The check and the write happen under one exclusive lock, so of two
+        writers that read the same version only the first one wins.
+        """
+        with self._locked(exclusive=True):
+            index = self._index()
+            current = index.get(todo_id)
+            if current is None:
+                return UpdateResult.NOT_FOUND
+            if current["updated_at"] != expected_updated_at:
+                return UpdateResult.CONFLICT
+            index.replace(todo_id, record)
+            self._apply(index, {"op": "update", "id": todo_id, "todo": record})
+            return UpdateResult.UPDATED
+
+    def remove(self, todo_id: str, owner: str | None = None) -> bool:
+        """Remove the record with the given id.
+
+        Returns:
+            bool: True if the record existed, False otherwise
+        """
+        with self._locked(exclusive=True):
+            index = self._index()
+            if not index.remove(todo_id):
+                return False
+            self._apply(index, {"op": "delete", "id": todo_id})
+            return True
+
+
+class JsonTodoStorage(TodoStorage):
+    """Stores all todos in a single pretty-printed todos.json array."""
+
+    TODOS_FILE = "todos.json"
+
+    def __init__(
+        self,
+        data_dir: str,
+        cache: bool = False,
+        durability: str = "dir",
+        file_name: str | None = None,
+        create: bool = True,
+        codec: JsonCodec | None = None,
+    ):
+        """Initialize the JSON backend.
+
+        Args:
+            data_dir: Directory holding the JSON file
+            cache: Keep the parsed todos in memory between calls
+            durability: One of DURABILITY_LEVELS
+            file_name: File to use instead of todos.json
+            create: Create an empty file up front if it doesn't exist
+            codec: JSON codec for the file; defaults to get_json_codec()
+        """
+        super().__init__(data_dir, cache, durability, codec)
+        self.todos_file_path = os.path.join(data_dir, file_name or self.TODOS_FILE)
+        self._file_lock = _FileLock(f"{self.todos_file_path}.lock")
+        if create:
+            self._ensure_todos_file()
+
+    def _ensure_todos_file(self):
+        """Create todos.json if it doesn't exist."""
+        if not os.path.exists(self.todos_file_path):
+            with open(self.todos_file_path, "w") as f:
+                json.dump([], f)
+
+    def _signature(self) -> tuple | None:
+        return self._file_signature(self.todos_file_path)
+
+    def _read(self) -> list[dict]:
+        try:
+            with open(self.todos_file_path, "rb") as f:
+                return self.codec.loads(f.read())
+        except (ValueError, FileNotFoundError):
+            return []
+
+    def _write(self, todos: list[dict]):
+        _replace_file(
+            self.todos_file_path,
+            lambda f: f.write(self.codec.dumps(todos)),
+            self.durability,
+        )
+
+    def iter_records(
+        self, owner: str | None = None, status: str | None = None
+    ) -> Iterator[dict]:
+        """Iterate over todo records, parsing todos.json incrementally.
+
+        Without a cache to fill there is no reason to hold the whole list,
+        so records are decoded and yielded one at a time. No lock is needed:
+        saves replace the file atomically, so the open handle keeps reading
+        one consistent version even if a writer replaces it meanwhile.
+        """
+        if self.cache or self._txn_index is not None:
+            return super().iter_records(owner, status)
+        return self._stream_records(owner, status)
+
+    def _stream_records(self, owner: str | None, status: str | None) -> Iterator[dict]:
+        try:
+            with open(self.todos_file_path, encoding="utf-8") as f:
+                for record in _iter_json_array(f):
+                    if owner is not None and record.get("owner") != owner:
+                        continue
+                    if status is not None and record.get("status") != status:
+                        continue
+                    yield record
+        except FileNotFoundError:
+            return
+
+
+class JournalTodoStorage(JsonTodoStorage):
+    """Appends one JSON line per mutation to todos.journal.
+
+    The current state is todos.json (the snapshot) with the journal replayed
+    over it. Replay is idempotent: an "add" for an id that already exists
+    replaces it, so replaying a journal over a snapshot that already contains
+    it is harmless. This lets compaction rewrite the snapshot first and trim
+    the journal afterwards without a crash window that loses data.
+    """
+
+    JOURNAL_FILE = "todos.journal"
+
+    def __init__(
+        self,
+        data_dir: str,
+        cache: bool = False,
+        durability: str = "dir",
+        compact_ratio: float = 1.0,
+        min_compact_bytes: int = 64 * 1024,
+        background_compaction: bool = False,
+        codec: JsonCodec | None = None,
+    ):
+        """Initialize the journal backend.
+
+        Args:
+            data_dir: Directory holding todos.json and todos.journal
+            cache: Keep the replayed state in memory (recommended)
+            durability: One of DURABILITY_LEVELS; anything but "none" also
+                fsyncs every journal append
+            compact_ratio: Compact once the journal grows beyond this
+                fraction of the snapshot size
+            min_compact_bytes: Never compact journals smaller than this
+            background_compaction: Run compaction in a daemon thread instead
+                of inline with the mutation that crossed the threshold
+            codec: JSON codec for both files; journal lines are always
+                compact
+        """
+        super().__init__(data_dir, cache, durability, codec=codec)
+        self.journal_file_path = os.path.join(data_dir, self.JOURNAL_FILE)
+        self.compact_ratio = compact_ratio
+        self.min_compact_bytes = min_compact_bytes
+        self.background_compaction = background_compaction
+        self._compaction_thread: threading.Thread | None = None
+
+    def _signature(self) -> tuple | None:
+        return (
+            self._file_signature(self.todos_file_path),
+            self._file_signature(self.journal_file_path),
+        )
+
+    def _read(self) -> list[dict]:
+        index = _TodoIndex(super()._read())
+        try:
+            with open(self.journal_file_path, "rb") as f:
+                self._replay_lines(index, f)
+        except FileNotFoundError:
+            pass
+        return index.records()
+
+    def iter_records(
+        self, owner: str | None = None, status: str | None = None
+    ) -> Iterator[dict]:
+        # Journal entries can touch any snapshot record, so the snapshot has
+        # to be materialised before the journal is replayed over it
+        return TodoStorage.iter_records(self, owner, status)
+
+    def _index(self) -> _TodoIndex:
+        """Return the indexed todo list, replaying only new journal lines.
+
+        When another process has only appended to the journal since the last
+        load, the cached state catches up by replaying the appended tail
+        instead of re-reading everything.
+        """
+        if self._txn_index is None and self._cached_index is not None and self.cache:
+            snapshot, journal = self._signature()
+            cached_snapshot, cached_journal = self._cached_signature
+            if (
+                snapshot == cached_snapshot
+                and journal is not None
+                and cached_journal is not None
+                and journal[0] == cached_journal[0]
+                and journal[1] > cached_journal[1]
+            ):
+                with open(self.journal_file_path, "rb") as f:
+                    f.seek(cached_journal[1])
+                    self._replay_lines(self._cached_index, f)
+                self._cached_signature = (snapshot, journal)
+        return super()._index()
+
+    def _replay_lines(self, index: _TodoIndex, lines):
+        """Apply journal lines to an index in order."""
+        for line in lines:
+            try:
+                entry = self.codec.loads(line)
+            except ValueError:
+                # A torn line from an interrupted append
+                continue
+            self._replay(index, entry)
+
+    def _replay(self, index: _TodoIndex, entry: dict):
+        """Apply one journal entry to an index."""
+        op = entry["op"]
+        if op == "delete":
+            index.remove(entry["id"])
+            return
+        record = entry["todo"]
+        if not index.replace(entry.get("id", record["id"]), record) and op == "add":
+            index.insert(record)
+
+    def _write(self, todos: list[dict]):
+        """Write a full snapshot and empty the journal."""
+        super()._write(todos)
+        _replace_file(self.journal_file_path, lambda f: None, self.durability)
+
+    def _persist(self, index: _TodoIndex, entries: list[dict]):
+        """Append journal lines and compact if the threshold is crossed."""
+        line = b"".join(
+            self.codec.dumps(entry, pretty=False) + b"\n" for entry in entries
+        )
+        try:
+            with open(self.journal_file_path, "ab+") as f:
+                if f.tell() > 0:
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b"\n":
+                        # Never glue a new entry onto a torn line
+                        line = b"\n" + line
+                f.write(line)
+                if self.durability != "none":
+                    f.flush()
+                    os.fsync(f.fileno())
+        except BaseException:
+            self.invalidate()
+            raise
+        if self.cache and self._cached_index is index:
+            self._cached_signature = self._signature()
+        self._maybe_compact()
+
+    def _maybe_compact(self):
+        """Compact when the journal outgrows the configured snapshot ratio."""
+        try:
+            journal_size = os.path.getsize(self.journal_file_path)
+            snapshot_size = os.path.getsize(self.todos_file_path)
+        except FileNotFoundError:
+            return
+        if journal_size < self.min_compact_bytes:
+            return
+        if journal_size < snapshot_size * self.compact_ratio:
+            return
+
+        if not self.background_compaction:
+            self.compact()
+        elif self._compaction_thread is None or not self._compaction_thread.is_alive():
+            self._compaction_thread = threading.Thread(target=self.compact, daemon=True)
+            self._compaction_thread.start()
+
+    def compact(self):
+        """Fold the journal into a fresh snapshot and empty the journal.
+
+        Runs under the exclusive lock: a snapshot written while another
+        process appends could otherwise be older than the journal it keeps.
+        """
+        with self._locked(exclusive=True):
+            self.save(self._index().records())
+
+    def wait_for_compaction(self):
+        """Block until a running background compaction has finished."""
+        thread = self._compaction_thread
+        if thread is not None:
+            thread.join()
+
+
+class SqliteTodoStorage(TodoStorage):
+    """Stores todos as rows of an indexed SQLite table.
+
+    Lookups by id use the primary key and lookups by owner use the owner
+    indexes, so neither scans the whole table. Rows keep insertion order via
+    the implicit rowid. SQLite does its own page caching, so ``cache`` is
+    accepted for interface compatibility but not used.
+    """
+
+    COLUMNS = TODO_FIELDS
+    FETCH_SIZE = 1000
+
+    def __init__(
+        self,
+        data_dir: str,
+        cache: bool = False,
+        durability: str = "dir",
+        codec: JsonCodec | None = None,
+    ):
+        super().__init__(data_dir, cache, durability, codec)
+        self.db_path = os.path.join(data_dir, SQLITE_FILE)
+        self._in_txn = False
+        self._writes = 0
+        self._conn = _connect_sqlite(self.db_path, self.durability)
+        self._conn.row_factory = self._row_to_dict
+        self._select = f"SELECT {', '.join(self.COLUMNS)} FROM todos"
+        with self._conn:
+            self._conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS todos (
+                    id TEXT PRIMARY KEY,
+                    title TEXT NOT NULL,
+                    details TEXT NOT NULL,
+                    priority TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    owner TEXT NOT NULL,
+                    created_at TEXT NOT NULL,
+                    updated_at TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_todos_owner ON todos (owner);
+                CREATE INDEX IF NOT EXISTS idx_todos_owner_status
+                    ON todos (owner, status);
+                CREATE INDEX IF NOT EXISTS idx_todos_owner_priority
+                    ON todos (owner, priority);
+                """
+            )
+
+    @classmethod
+    def _row_to_dict(cls, cursor: sqlite3.Cursor, row: tuple) -> dict:
+        return dict(zip(cls.COLUMNS, row))
+
+    def _values(self, record: dict) -> tuple:
+        return tuple(record[column] for column in self.COLUMNS)
+
+    def close(self):
+        """Close the database connection."""
+        self._conn.close()
+
+    @contextmanager
+    def _write_txn(self):
+        """Commit a single write, unless it is part of an open transaction."""
+        self._writes += 1
+        if self._in_txn:
+            yield
+        else:
+            with self._conn:
+                yield
+
+    @contextmanager
+    def transaction(self):
+        """Run the block in one SQLite transaction (rolled back on error)."""
+        with self._lock:
+            if self._in_txn:
+                yield
+                return
+            self._in_txn = True
+            try:
+                with self._conn:
+                    self._conn.execute("BEGIN IMMEDIATE")
+                    yield
+            finally:
+                self._in_txn = False
+
+    def version(self, owner: str | None = None) -> Hashable:
+        # data_version only moves for commits made by other connections, so
+        # this connection's own writes are counted alongside it
+        with self._lock:
+            cursor = self._conn.cursor()
+            cursor.row_factory = None
+            data_version = cursor.execute("PRAGMA data_version").fetchone()[0]
+            return (data_version, self._writes)
+
+    def load(self) -> list[dict]:
+        with self._lock:
+            return self._conn.execute(f"{self._select} ORDER BY rowid").fetchall()
+
+    def iter_records(
+        self, owner: str | None = None, status: str | None = None
+    ) -> Iterator[dict]:
+        return self.query(owner=owner, status=status)
+
+    @staticmethod
+    def _where(
+        owner: str | None,
+        status: str | None,
+        priority: str | None,
+        created_after: str | None,
+    ) -> tuple[str, list]:
+        """Build the WHERE clause and parameters for the given filters."""
+        clauses, params = [], []
+        for clause, value in (
+            ("owner = ?", owner),
+            ("status = ?", status),
+            ("priority = ?", priority),
+            ("created_at > ?", created_after),
+        ):
+            if value is not None:
+                clauses.append(clause)
+                params.append(value)
+        return (f" WHERE {' AND '.join(clauses)}" if clauses else ""), params
+
+    def query(
+        self,
+        owner: str | None = None,
+        status: str | None = None,
+        priority: str | None = None,
+        created_after: str | None = None,
+        order_by: str | None = None,
+        limit: int | None = None,
+        offset: int = 0,
+    ) -> Iterator[dict]:
+        """Run the query in SQL, fetching FETCH_SIZE rows at a time."""
+        where, params = self._where(owner, status, priority, created_after)
+        order = "rowid"
+        if order_by is not None:
+            field_name, descending = _parse_order_by(order_by)
+            if field_name == "priority":
+                field_name = (
+                    "CASE priority WHEN 'HIGH' THEN 0 WHEN 'MID' THEN 1 ELSE 2 END"
+                )
+            order = f"{field_name}{' DESC' if descending else ''}, rowid"
+        sql = f"{self._select}{where} ORDER BY {order} LIMIT ? OFFSET ?"
+        params += [-1 if limit is None else limit, offset]
+        with self._lock:
+            cursor = self._conn.execute(sql, params)
+        return self._fetch(cursor)
+
+    def _fetch(self, cursor: sqlite3.Cursor) -> Iterator[dict]:
+        while True:
+            with self._lock:
+                rows = cursor.fetchmany(self.FETCH_SIZE)
+            if not rows:
+                return
+            yield from rows
+
+    def count(
+        self,
+        owner: str | None = None,
+        status: str | None = None,
+        priority: str | None = None,
+        created_after: str | None = None,
+    ) -> int:
+        where, params = self._where(owner, status, priority, created_after)
+        with self._lock:
+            cursor = self._conn.cursor()
+            cursor.row_factory = None
+            return cursor.execute(
+                f"SELECT COUNT(*) FROM todos{where}", params
+            ).fetchone()[0]
+
+    def save(self, todos: list[dict]):
+        rows = [self._values(todo) for todo in todos]
+        placeholders = ", ".join("?" * len(self.COLUMNS))
+        with self._lock, self._write_txn():
+            self._conn.execute("DELETE FROM todos")
+            self._conn.executemany(f"INSERT INTO todos VALUES ({placeholders})", rows)
+
+    def get(self, todo_id: str, owner: str | None = None) -> dict | None:
+        with self._lock:
+            return self._conn.execute(
+                f"{self._select} WHERE id = ?", (todo_id,)
+            ).fetchone()
+
+    def get_many(self, todo_ids: Iterable[str], owner: str | None = None) -> list[dict]:
+        todo_ids = list(todo_ids)
+        records = []
+        with self._lock:
+            # Stay well below SQLite's limit on bound parameters
+            for start in range(0, len(todo_ids), 500):
+                chunk = todo_ids[start : start + 500]
+                records += self._conn.execute(
+                    f"{self._select} WHERE id IN ({', '.join('?' * len(chunk))})",
+                    chunk,
+                ).fetchall()
+        return records
+
+    def by_owner(self, owner: str) -> list[dict]:
+        with self._lock:
+            return self._conn.execute(
+                f"{self._select} WHERE owner = ? ORDER BY rowid", (owner,)
+            ).fetchall()
+
+    def insert(self, record: dict):
+        placeholders = ", ".join("?" * len(self.COLUMNS))
+        with self._lock, self._write_txn():
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO todos VALUES ({placeholders})",
+                self._values(record),
+            )
+
+    def replace(self, todo_id: str, record: dict, owner: str | None = None) -> bool:
+        assignments = ", ".join(f"{column} = ?" for column in self.COLUMNS)
+        with self._lock, self._write_txn():
+            cursor = self._conn.execute(
+                f"UPDATE todos SET {assignments} WHERE id = ?",
+                (*self._values(record), todo_id),
+            )
+        return cursor.rowcount > 0
+
+    def compare_and_replace(
+        self,
+        todo_id: str,
+        record: dict,
+        expected_updated_at: str,
+        owner: str | None = None,
+    ) -> UpdateResult:
+        assignments = ", ".join(f"{column} = ?" for column in self.COLUMNS)
+        with self._lock, self._write_txn():
+            cursor = self._conn.execute(
+                f"UPDATE todos SET {assignments} WHERE id = ? AND updated_at = ?",
+                (*self._values(record), todo_id, expected_updated_at),
+            )
+            if cursor.rowcount > 0:
+                return UpdateResult.UPDATED
+            exists = self._conn.execute(
+                "SELECT 1 FROM todos WHERE id = ?", (todo_id,)
+            ).fetchone()
+        return UpdateResult.CONFLICT if exists else UpdateResult.NOT_FOUND
+
+    def remove(self, todo_id: str, owner: str | None = None) -> bool:
+        with self._lock, self._write_txn():
+            cursor = self._conn.execute("DELETE FROM todos WHERE id = ?", (todo_id,))
+            return cursor.rowcount > 0
+
+
+class ShardedTodoStorage(TodoStorage):
+    """Stores each owner's todos in their own todos/<owner-hash>.json shard.
+
+    Per-user reads and writes parse and rewrite only that user's shard.
+    Lookups by id alone go through an in-memory id -> shard map that is built
+    by scanning every shard once; on a miss only the shards whose files have
+    changed since are read again. Callers that know the owner pass it as a
+    hint to skip that. Listing all todos streams shard by
+    shard, so the order follows the shards rather than global insertion.
+    """
+
+    SHARD_DIR = "todos"
+    BATCH_LOCK_FILE = "batch.lock"
+
+    def __init__(
+        self,
+        data_dir: str,
+        cache: bool = False,
+        durability: str = "dir",
+        codec: JsonCodec | None = None,
+    ):
+        super().__init__(data_dir, cache, durability, codec)
+        self.shard_dir = os.path.join(data_dir, self.SHARD_DIR)
+        os.makedirs(self.shard_dir, exist_ok=True)
+        self._shards: dict[str, JsonTodoStorage] = {}
+        self._id_shards: dict[str, str] | None = None
+        # File signature of each shard as of its last scan into _id_shards
+        self._id_map_signatures: dict[str, Hashable] = {}
+        self._txn_stack: ExitStack | None = None
+        self._batch_lock = _FileLock(os.path.join(self.shard_dir, self.BATCH_LOCK_FILE))
+
+    @staticmethod
+    def shard_name(owner: str) -> str:
+        """Return the shard file stem for an owner."""
+        return hashlib.sha256(owner.encode()).hexdigest()[:32]
+
+    def _shard(self, name: str, join: bool = True) -> JsonTodoStorage:
+        """Return a shard's storage, adding it to the open batch if ``join``."""
+        shard = self._shards.get(name)
+        if shard is None:
+            shard = JsonTodoStorage(
+                self.shard_dir,
+                self.cache,
+                self.durability,
+                file_name=f"{name}.json",
+                create=False,
+                codec=self.codec,
+            )
+            self._shards[name] = shard
+        if join and self._txn_stack is not None and shard._txn_index is None:
+            self._txn_stack.enter_context(shard.transaction())
+        return shard
+
+    @contextmanager
+    def transaction(self):
+        """Batch mutations per shard until the block exits.
+
+        Each shard touched inside the block joins the batch and is saved
+        once at the end (or left untouched if the block raises). Shards
+        commit one after another, so a crash mid-commit can leave some
+        shards written and others not.
+
+        Shards are locked in the order the batch touches them, so batches
+        in different processes could wait on each other's shards forever.
+        A store-wide batch lock held first rules that out: batches run one
+        at a time, while single operations still only lock their own shard.
+        """
+        with self._lock, self._batch_lock.hold(exclusive=True):
+            if self._txn_stack is not None:
+                yield
+                return
+            with ExitStack() as stack:
+                self._txn_stack = stack
+                try:
+                    yield
+                except BaseException:
+                    self._id_shards = None
+                    raise
+                finally:
+                    self._txn_stack = None
+
+    def _shard_names(self) -> list[str]:
+        return sorted(
+            name[: -len(".json")]
+            for name in os.listdir(self.shard_dir)
+            if name.endswith(".json")
+        )
+
+    def _refresh_id_map(self) -> dict[str, str]:
+        """Bring the id -> shard map up to date and return it.
+
+        Only shards that are new or whose file changed since they were last
+        scanned are read; ids of changed or deleted shards are dropped first.
+        """
+        if self._id_shards is None:
+            self._id_shards, self._id_map_signatures = {}, {}
+        signatures = {
+            name: self._file_signature(os.path.join(self.shard_dir, f"{name}.json"))
+            for name in self._shard_names()
+        }
+        changed = {
+            name
+            for name in signatures.keys() | self._id_map_signatures.keys()
+            if signatures.get(name) != self._id_map_signatures.get(name)
+        }
+        if changed:
+            id_shards = {
+                todo_id: name
+                for todo_id, name in self._id_shards.items()
+                if name not in changed
+            }
+            for name in sorted(changed & signatures.keys()):
+                # Shards are only read here, so they don't join an open batch
+                # and keep their lock only for the read
+                for todo in self._shard(name, join=False).load():
+                    id_shards.setdefault(todo["id"], name)
+            self._id_shards = id_shards
+        # Signatures are taken before the reads, so a shard written in
+        # between is simply read again next time
+        self._id_map_signatures = signatures
+        return self._id_shards
+
+    def _locate(self, todo_id: str, owner: str | None) -> str | None:
+        """Return the shard holding ``todo_id``, or None.
+
+        An owner hint is trusted: only that owner's shard is checked, so
+        looking up an unknown id doesn't read every other owner's shard.
+        """
+        if owner is not None:
+            name = self.shard_name(owner)
+            return name if self._shard(name).get(todo_id) is not None else None
+        if self._id_shards is not None:
+            name = self._id_shards.get(todo_id)
+            if name is not None and self._shard(name).get(todo_id) is not None:
+                return name
+        # Unknown or stale (another process moved it): rescan changed shards
+        return self._refresh_id_map().get(todo_id)
+
+    def _locate_for_update(
+        self, todo_id: str, record: dict, owner: str | None
+    ) -> str | None:
+        """Locate a todo about to be replaced by ``record``."""
+        if owner is not None:
+            return self._locate(todo_id, owner)
+        # Most updates keep the owner, so its shard is the likeliest place;
+        # only a handover to another owner needs the full search
+        name = self._locate(todo_id, record.get("owner", ""))
+        return name if name is not None else self._locate(todo_id, None)
+
+    def iter_records(
+        self, owner: str | None = None, status: str | None = None
+    ) -> Iterator[dict]:
+        if owner is not None:
+            yield from self._shard(self.shard_name(owner)).iter_records(owner, status)
+            return
+        for name in self._shard_names():
+            yield from self._shard(name).iter_records(status=status)
+
+    def version(self, owner: str | None = None) -> Hashable:
+        if owner is not None:
+            names = [self.shard_name(owner)]
+        else:
+            names = self._shard_names()
+        return tuple(
+            (name, self._file_signature(os.path.join(self.shard_dir, f"{name}.json")))
+            for name in names
+        )
+
+    def load(self) -> list[dict]:
+        with self._lock:
+            return list(self.iter_records())
+
+    def save(self, todos: list[dict]):
+        groups: dict[str, list[dict]] = {}
+        for todo in todos:
+            groups.setdefault(self.shard_name(todo.get("owner", "")), []).append(todo)
+        with self._lock:
+            for name in self._shard_names():
+                if name not in groups:
+                    os.remove(self._shard(name).todos_file_path)
+                    self._shards.pop(name).invalidate()
+            for name, shard_todos in groups.items():
+                self._shard(name).save(shard_todos)
+            self._id_shards = {
+                todo["id"]: name
+                for name, shard_todos in groups.items()
+                for todo in reversed(shard_todos)
+            }
+            # Not scanned from the files: check every shard on the next miss
+            self._id_map_signatures = {}
+
+    def get(self, todo_id: str, owner: str | None = None) -> dict | None:
+        with self._lock:
+            name = self._locate(todo_id, owner)
+            return None if name is None else self._shard(name).get(todo_id)
+
+    def get_many(self, todo_ids: Iterable[str], owner: str | None = None) -> list[dict]:
+        if owner is not None:
+            return self._shard(self.shard_name(owner)).get_many(todo_ids)
+        todo_ids = list(todo_ids)
+        with self._lock:
+            id_shards = self._id_shards
+            if id_shards is None or any(i not in id_shards for i in todo_ids):
+                # One refresh for the whole lookup, however many ids miss
+                id_shards = self._refresh_id_map()
+            records = []
+            for todo_id in todo_ids:
+                name = id_shards.get(todo_id)
+                record = None if name is None else self._shard(name).get(todo_id)
+                if record is None and name is not None:
+                    # Stale entry (another process moved it)
+                    record = self.get(todo_id)
+                if record is not None:
+                    records.append(record)
+            return records
+
+    def by_owner(self, owner: str) -> list[dict]:
+        return self._shard(self.shard_name(owner)).by_owner(owner)
+
+    def insert(self, record: dict):
+        name = self.shard_name(record.get("owner", ""))
+        with self._lock:
+            self._shard(name).insert(record)
+            if self._id_shards is not None:
+                self._id_shards.setdefault(record["id"], name)
+
+    def replace(self, todo_id: str, record: dict, owner: str | None = None) -> bool:
+        with self._lock:
+            name = self._locate_for_update(todo_id, record, owner)
+            if name is None:
+                return False
+            new_name = self.shard_name(record.get("owner", ""))
+            if new_name == name:
+                if not self._shard(name).replace(todo_id, record):
+                    return False
+            else:
+                # Write the new shard first: a crash in between duplicates the
+                # todo rather than losing it
+                self._shard(new_name).insert(record)
+                self._shard(name).remove(todo_id)
+            if self._id_shards is not None:
+                self._id_shards.pop(todo_id, None)
+                self._id_shards[record["id"]] = new_name
+            return True
+
+    def compare_and_replace(
+        self,
+        todo_id: str,
+        record: dict,
+        expected_updated_at: str,
+        owner: str | None = None,
+    ) -> UpdateResult:
+        with self._lock:
+            name = self._locate_for_update(todo_id, record, owner)
+            if name is None:
+                return UpdateResult.NOT_FOUND
+            new_name = self.shard_name(record.get("owner", ""))
+            if new_name == name:
+                return self._shard(name).compare_and_replace(
+                    todo_id, record, expected_updated_at
+                )
+            # Moving between shards: hold both, in a fixed order to avoid
+            # deadlocking against a move in the opposite direction
+            with ExitStack() as stack:
+                for shard_name in sorted((name, new_name)):
+                    stack.enter_context(self._shard(shard_name)._locked(True))
+                current = self._shard(name).get(todo_id)
+                if current is None:
+                    return UpdateResult.NOT_FOUND
+                if current["updated_at"] != expected_updated_at:
+                    return UpdateResult.CONFLICT
+                self._shard(new_name).insert(record)
+                self._shard(name).remove(todo_id)
+            if self._id_shards is not None:
+                self._id_shards.pop(todo_id, None)
+                self._id_shards[record["id"]] = new_name
+            return UpdateResult.UPDATED
+
+    def remove(self, todo_id: str, owner: str | None = None) -> bool:
+        with self._lock:
+            name = self._locate(todo_id, owner)
+            if name is None or not self._shard(name).remove(todo_id):
+                return False
+            if self._id_shards is not None:
+                self._id_shards.pop(todo_id, None)
+            return True
+
+
+class ColumnarSnapshot:
+    """Read-only binary snapshot of the todos, stored column by column.
+
+    The file is memory-mapped, so filters and counts only page in the
+    columns they read, and strings are decoded only for rows that are
+    turned into TodoItems. Layout, in native byte order with every section
+    8-byte aligned:
+
+        header    magic, byte-order mark, row count, byte length of each
+                  string column
+        priority  one uint8 per row, an index into PRIORITIES
+        status    one uint8 per row, an index into STATUSES
+        created   one int64 per row: epoch microseconds, or RAW_TIMESTAMP
+                  when the original string didn't pack and is kept in the
+                  created_raw string column
+        updated   likewise, with updated_raw
+        strings   for each of STRING_COLUMNS, row count + 1 uint64 offsets
+                  followed by the UTF-8 data
+    """
+
+    MAGIC = b"TODOSNP1"
+    BYTE_ORDER_MARK = 0x01020304
+    PRIORITIES = tuple(Priority)
+    STATUSES = tuple(Status)
+    STRING_COLUMNS = ("id", "title", "details", "owner", "created_raw", "updated_raw")
+    RAW_TIMESTAMP = -(2**63)
+    _HEADER = struct.Struct(f"=8sIxxxxQ{len(STRING_COLUMNS)}Q")
+
+    def __init__(self, path: str):
+        """Open a snapshot written by ``ColumnarSnapshot.write``.
+
+        Raises:
+            ValueError: If the file is not a snapshot or is truncated
+        """
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self._map_columns()
+        except BaseException:
+            self.close()
+            raise
+
+    def _map_columns(self):
+        if len(self._mmap) < self._HEADER.size:
+            raise ValueError(f"Not a todo snapshot: {self.path}")
+        magic, mark, count, *lengths = self._HEADER.unpack_from(self._mmap)
+        if magic != self.MAGIC:
+            raise ValueError(f"Not a todo snapshot: {self.path}")
+        if mark != self.BYTE_ORDER_MARK:
+            raise ValueError(f"Snapshot has a foreign byte order: {self.path}")
+
+        self._count = count
+        self._views: list[memoryview] = [memoryview(self._mmap)]
+        pos = self._HEADER.size
+
+        def section(size: int, fmt: str = "B") -> memoryview:
+            nonlocal pos
+            if pos + size > len(self._mmap):
+                raise ValueError(f"Truncated todo snapshot: {self.path}")
+            view = self._views[0][pos : pos + size].cast(fmt)
+            self._views.append(view)
+            pos += size + (-size % 8)
+            return view
+
+        self._priority = section(count)
+        self._status = section(count)
+        self._created = section(8 * count, "q")
+        self._updated = section(8 * count, "q")
+        self._strings = {
+            name: (section(8 * (count + 1), "Q"), section(length))
+            for name, length in zip(self.STRING_COLUMNS, lengths)
+        }
+
+    @classmethod
+    def write(cls, path: str, records: Iterable[dict], durability: str = "dir"):
+        """Atomically write a snapshot of storage records to ``path``."""
+        priority_codes = {member.value: i for i, member in enumerate(cls.PRIORITIES)}
+        status_codes = {member.value: i for i, member in enumerate(cls.STATUSES)}
+        priorities, statuses = bytearray(), bytearray()
+        timestamps = {"created": array("q"), "updated": array("q")}
+        strings = {name: (array("Q", [0]), bytearray()) for name in cls.STRING_COLUMNS}
+
+        def add_string(name: str, value: str):
+            offsets, data = strings[name]
+            data += value.encode()
+            offsets.append(len(data))
+
+        for record in records:
+            priorities.append(priority_codes[record["priority"]])
+            statuses.append(status_codes[record["status"]])
+            for name in ("id", "title", "details", "owner"):
+                add_string(name, record[name])
+            for name, column in timestamps.items():
+                packed = _pack_timestamp(record[f"{name}_at"])
+                if isinstance(packed, str):
+                    column.append(cls.RAW_TIMESTAMP)
+                    add_string(f"{name}_raw", packed)
+                else:
+                    column.append(packed)
+                    add_string(f"{name}_raw", "")
+
+        lengths = [len(strings[name][1]) for name in cls.STRING_COLUMNS]
+        sections = [priorities, statuses, timestamps["created"], timestamps["updated"]]
+        for name in cls.STRING_COLUMNS:
+            sections.extend(strings[name])
+
+        def write(f):
+            f.write(
+                cls._HEADER.pack(
+                    cls.MAGIC, cls.BYTE_ORDER_MARK, len(priorities), *lengths
+                )
+            )
+            for data in sections:
+                f.write(data)
+                f.write(bytes(-len(memoryview(data).cast("B")) % 8))
+
+        _replace_file(path, write, durability)
+
+    def close(self):
+        """Unmap the file; views must be released before the mmap closes."""
+        for view in reversed(getattr(self, "_views", [])):
+            view.release()
+        self._mmap.close()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _string(self, name: str, row: int) -> str:
+        offsets, data = self._strings[name]
+        return str(data[offsets[row] : offsets[row + 1]], "utf-8")
+
+    def todo(self, row: int) -> TodoItem:
+        """Decode one row into a TodoItem."""
+        todo = _new_todo(TodoItem)
+        todo.id = self._string("id", row)
+        todo.title = self._string("title", row)
+        todo.details = self._string("details", row)
+        todo.priority = self.PRIORITIES[self._priority[row]]
+        todo.status = self.STATUSES[self._status[row]]
+        todo.owner = sys.intern(self._string("owner", row))
+        created, updated = self._created[row], self._updated[row]
+        if created == self.RAW_TIMESTAMP:
+            created = self._string("created_raw", row)
+        if updated == self.RAW_TIMESTAMP:
+            updated = self._string("updated_raw", row)
+        todo._created, todo._updated = created, updated
+        return todo
+
+    def rows(
+        self,
+        owner: str | None = None,
+        status: Status | None = None,
+        priority: Priority | None = None,
+    ) -> Iterator[int]:
+        """Yield the numbers of the rows matching every given filter."""
+        rows: Iterable[int] = range(self._count)
+        if status is not None:
+            rows = self._matching(rows, self._status, self.STATUSES.index(status))
+        if priority is not None:
+            rows = self._matching(rows, self._priority, self.PRIORITIES.index(priority))
+        if owner is not None:
+            offsets, data = self._strings["owner"]
+            wanted = owner.encode()
+            rows = (
+                row for row in rows if data[offsets[row] : offsets[row + 1]] == wanted
+            )
+        return iter(rows)
+
+    @staticmethod
+    def _matching(rows: Iterable[int], column: memoryview, code: int) -> Iterator[int]:
+        return (row for row in rows if column[row] == code)
+
+    def count(
+        self,
+        owner: str | None = None,
+        status: Status | None = None,
+        priority: Priority | None = None,
+    ) -> int:
+        """Count the rows matching every given filter."""
+        if owner is None and (status is None or priority is None):
+            if status is not None:
+                return self._status.tobytes().count(self.STATUSES.index(status))
+            if priority is not None:
+                return self._priority.tobytes().count(self.PRIORITIES.index(priority))
+            return self._count
+        return sum(1 for _ in self.rows(owner, status, priority))
+
+    def count_by(self, column: str) -> dict:
+        """Count rows per member of the "status" or "priority" column."""
+        members = {"status": self.STATUSES, "priority": self.PRIORITIES}[column]
+        codes = (self._status if column == "status" else self._priority).tobytes()
+        return {member: codes.count(code) for code, member in enumerate(members)}
+
+    def iter_todos(
+        self,
+        owner: str | None = None,
+        status: Status | None = None,
+        priority: Priority | None = None,
+    ) -> Iterator[TodoItem]:
+        """Yield the matching rows as TodoItems, decoding only those rows."""
+        return map(self.todo, self.rows(owner, status, priority))
+
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def _tokenize(text: str) -> list[str]:
+    """Split text into lowercase word tokens."""
+    return _TOKEN_RE.findall(text.lower())
+
+
+class SearchIndex:
+    """Inverted index from the words of todo titles and details to todo ids.
+
+    Each owner has their own token -> ids postings and a sorted token list,
+    so a prefix term is a bisect into that list and a multi-term query is an
+    intersection of per-term results. Nothing scales with the total number of
+    todos.
+
+    The index is persisted as JSON lines in todos.search next to the data:
+    {"op": "add", "id", "owner", "tokens"} or {"op": "delete", "id"}.
+    Replaying the lines rebuilds it. Other processes' appends are picked up
+    by replaying only the new tail. The file is compacted once dead lines
+    dominate. It is derived data: it is built from the todos the first time
+    a search needs it, its appends are not fsynced, and ``build`` recreates
+    it if it ever drifts.
+    """
+
+    INDEX_FILE = "todos.search"
+
+    def __init__(
+        self,
+        data_dir: str,
+        codec: JsonCodec | None = None,
+        compact_ratio: float = 2.0,
+    ):
+        """Initialize the index.
+
+        Args:
+            data_dir: Directory holding todos.search
+            codec: JSON codec for the index lines
+            compact_ratio: Compact once the file holds this many lines per
+                indexed todo
+        """
+        self.path = os.path.join(data_dir, self.INDEX_FILE)
+        self.codec = codec or get_json_codec()
+        self.compact_ratio = compact_ratio
+        self._lock = threading.RLock()
+        self._file_lock = _FileLock(f"{self.path}.lock")
+        self._reset()
+
+    def _reset(self):
+        self._docs: dict[str, tuple[str, tuple[str, ...]]] = {}
+        self._postings: dict[str, dict[str, set[str]]] = {}
+        self._tokens: dict[str, list[str]] = {}
+        self._lines = 0
+        self._inode: int | None = None
+        self._offset = 0
+
+    def _sync(self) -> bool:
+        """Catch up with the file; return False if there is no index yet."""
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            self._reset()
+            return False
+        if st.st_ino != self._inode or st.st_size < self._offset:
+            # Rewritten by a compaction or rebuild: start over
+            self._reset()
+            self._inode = st.st_ino
+        if st.st_size > self._offset:
+            with open(self.path, "rb") as f:
+                f.seek(self._offset)
+                data = f.read(st.st_size - self._offset)
+            # Leave a trailing partial line for when its append completes
+            end = data.rfind(b"\n") + 1
+            for line in data[:end].splitlines():
+                try:
+                    self._replay(self.codec.loads(line))
+                except (ValueError, KeyError, TypeError):
+                    # A torn line from an interrupted append
+                    continue
+            self._offset += end
+        return True
+
+    def _replay(self, entry: dict):
+        """Apply one index line in memory."""
+        todo_id = entry["id"]
+        old = self._docs.pop(todo_id, None)
+        if old is not None:
+            self._unindex(todo_id, *old)
+        if entry["op"] == "add":
+            doc = (entry["owner"], tuple(entry["tokens"]))
+            self._docs[todo_id] = doc
+            self._index(todo_id, *doc)
+        self._lines += 1
+
+    def _index(self, todo_id: str, owner: str, tokens: tuple[str, ...]):
+        postings = self._postings.setdefault(owner, {})
+        for token in tokens:
+            ids = postings.get(token)
+            if ids is None:
+                postings[token] = {todo_id}
+                bisect.insort(self._tokens.setdefault(owner, []), token)
+            else:
+                ids.add(todo_id)
+
+    def _unindex(self, todo_id: str, owner: str, tokens: tuple[str, ...]):
+        postings = self._postings[owner]
+        for token in tokens:
+            ids = postings[token]
+            ids.discard(todo_id)
+            if not ids:
+                del postings[token]
+                sorted_tokens = self._tokens[owner]
+                del sorted_tokens[bisect.bisect_left(sorted_tokens, token)]
+
+    @staticmethod
+    def _entry(record: dict) -> dict:
+        text = f"{record['title']} {record['details']}"
+        return {
+            "op": "add",
+            "id": record["id"],
+            "owner": record["owner"],
+            "tokens": sorted(set(_tokenize(text))),
+        }
+
+    def _write_all(self, entries: Iterable[dict]):
+        """Replace the file with ``entries`` and load them."""
+        self._reset()
+        lines = []
+        for entry in entries:
+            self._replay(entry)
+            lines.append(self.codec.dumps(entry, pretty=False) + b"\n")
+        _replace_file(self.path, lambda f: f.writelines(lines), "none")
+        st = os.stat(self.path)
+        self._inode, self._offset = st.st_ino, st.st_size
+
+    def build(self, records: Iterable[dict]):
+        """Rebuild the index from scratch from storage records."""
+        with self._lock, self._file_lock.hold(exclusive=True):
+            self._write_all(self._entry(record) for record in records)
+
+    def apply(self, changes: Iterable[tuple[str, dict | None]]):
+        """Index changed todos.
+
+        Args:
+            changes: (todo_id, record) pairs; record is the todo's new record,
+                or None if it was deleted
+
+        Changes are ignored while no index exists yet, since the first
+        search builds it from the up-to-date todos anyway.
+        """
+        with self._lock, self._file_lock.hold(exclusive=True):
+            if not self._sync():
+                return
+            entries = []
+            for todo_id, record in changes:
+                # Deleted, or replaced under another id
+                gone = record is None or record["id"] != todo_id
+                if gone and todo_id in self._docs:
+                    entries.append({"op": "delete", "id": todo_id})
+                if record is not None:
+                    entry = self._entry(record)
+                    doc = (entry["owner"], tuple(entry["tokens"]))
+                    if self._docs.get(entry["id"]) != doc:
+                        entries.append(entry)
+            if not entries:
+                return
+            for entry in entries:
+                self._replay(entry)
+            if self._lines > self.compact_ratio * len(self._docs) + 1000:
+                self._write_all(
+                    {"op": "add", "id": todo_id, "owner": owner, "tokens": tokens}
+                    for todo_id, (owner, tokens) in list(self._docs.items())
+                )
+                return
+            data = b"".join(
+                self.codec.dumps(entry, pretty=False) + b"\n" for entry in entries
+            )
+            with open(self.path, "ab+") as f:
+                if f.tell() > 0:
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b"\n":
+                        # Never glue a new line onto a torn one
+                        data = b"\n" + data
+                f.write(data)
+                self._offset = f.tell()
+
+    def search(
+        self, owner: str, text: str, records: Callable[[], Iterable[dict]]
+    ) -> set[str]:
+        """Return the ids of the owner's todos matching every term of ``text``.
+
+        Each term matches any word it is a prefix of. ``records`` supplies
+        the storage records if the index has to be built first.
+        """
+        with self._lock:
+            with self._file_lock.hold():
+                built = self._sync()
+            if not built:
+                with self._file_lock.hold(exclusive=True):
+                    if not self._sync():
+                        self._write_all(self._entry(record) for record in records())
+            return self._lookup(owner, text)
+
+    def _lookup(self, owner: str, text: str) -> set[str]:
+        terms = set(_tokenize(text))
+        postings = self._postings.get(owner)
+        if not terms or not postings:
+            return set()
+        tokens = self._tokens[owner]
+        result: set[str] | None = None
+        # Longer terms tend to match fewer words, so start with them
+        for term in sorted(terms, key=len, reverse=True):
+            ids: set[str] = set()
+            i = bisect.bisect_left(tokens, term)
+            while i < len(tokens) and tokens[i].startswith(term):
+                ids |= postings[tokens[i]]
+                i += 1
+            result = ids if result is None else result & ids
+            if not result:
+                return set()
+        return result
+
+
+def _timestamp_after(previous: str) -> str:
+    """Return the current ISO timestamp, bumped past ``previous`` if needed."""
+    now = _utcnow()
+    try:
+        if now <= datetime.fromisoformat(previous):
+            now = datetime.fromisoformat(previous) + timedelta(microseconds=1)
+    except (ValueError, TypeError):
+        # Unparseable or timezone-aware: any different value still works
+        pass
+    return now.isoformat()
+
+
+STORAGE_BACKENDS: dict[str, type[TodoStorage]] = {
+    "json": JsonTodoStorage,
+    "journal": JournalTodoStorage,
+    "sqlite": SqliteTodoStorage,
+    "sharded": ShardedTodoStorage,
+}
+
+# What reads and writes through a TodoStorage can raise: I/O failures,
+# unreadable data (including JSON decode errors) and SQLite errors
+STORAGE_ERRORS = (OSError, ValueError, sqlite3.Error)
+
+
+def migrate_storage(
+    data_dir: str, target: str, source: str = "json"
+) -> tuple[int, int]:
+    """Copy all todos and users in ``data_dir`` from one backend to another.
+
+    The target's existing contents are replaced, so the migration can be
+    re-run safely. Users are only copied when both backends also exist in
+    USER_STORAGE_BACKENDS (e.g. not for "journal" or "sharded").
+
+    Returns:
+        tuple: (todos copied: int, users copied: int)
+    """
+    todos = STORAGE_BACKENDS[source](data_dir).load()
+    STORAGE_BACKENDS[target](data_dir).save(todos)
+    if source not in USER_STORAGE_BACKENDS or target not in USER_STORAGE_BACKENDS:
+        return len(todos), 0
+    users = USER_STORAGE_BACKENDS[source](data_dir).load()
+    USER_STORAGE_BACKENDS[target](data_dir).save(users)
+    return len(todos), len(users)
+
+
+class TodoQuery:
+    """The lazy result of TodoManager.query.
+
+    Nothing is read until the query is iterated or counted, and each of
+    those runs it against the storage again, so it always sees current data.
+    """
+
+    def __init__(
+        self,
+        storage: TodoStorage,
+        filters: dict,
+        order_by: str | None,
+        limit: int | None,
+        offset: int,
+    ):
+        if order_by is not None:
+            _parse_order_by(order_by)
+        if (limit is not None and limit < 0) or offset < 0:
+            raise ValueError("limit and offset must not be negative")
+        self._storage = storage
+        self._filters = filters
+        self._order_by = order_by
+        self._limit = limit
+        self._offset = offset
+
+    def __iter__(self) -> Iterator[TodoItem]:
+        records = self._storage.query(
+            **self._filters,
+            order_by=self._order_by,
+            limit=self._limit,
+            offset=self._offset,
+        )
+        return map(_decode_todo, records)
+
+    def count(self) -> int:
+        """Count the todos this query yields, without decoding them."""
+        if self._limit is not None:
+            # A page is small: stop scanning as soon as it is full
+            page = self._storage.query(
+                **self._filters, limit=self._limit, offset=self._offset
+            )
+            return sum(1 for _ in page)
+        return max(0, self._storage.count(**self._filters) - self._offset)
+
+    def all(self) -> list[TodoItem]:
+        """Run the query and return the todos as a list."""
+        return list(self)
+
+    def first(self) -> TodoItem | None:
+        """Return the first todo of the query, or None."""
+        return next(iter(self), None)
+
+
+class TodoManager:
+    """Manages todo items on top of a pluggable storage backend."""
+
+    TODOS_FILE = "todos.json"
+    SNAPSHOT_FILE = "todos.snapshot"
+
+    def __init__(
+        self,
+        data_dir: str = ".",
+        cache: bool = False,
+        storage: str | TodoStorage = "json",
+        durability: str = "dir",
+        codec: str = "auto",
+        pretty: bool = True,
+    ):
+        """Initialize TodoManager with a data directory.
+
+        Args:
+            data_dir: Directory holding the todo data
+            cache: Keep the parsed todos in memory and only re-read them when
+                the files change (write-through on save)
+            storage: Backend name from STORAGE_BACKENDS ("json", "journal",
+                "sqlite" or "sharded") or a ready-made TodoStorage instance
+            durability: One of DURABILITY_LEVELS ("none", "file" or "dir"),
+                used when a backend is created from its name; bulk imports can
+                lower it to trade crash safety for throughput
+            codec: JSON_CODECS name or "auto", used when a backend is created
+                from its name
+            pretty: Write indented rather than compact JSON
+        """
+        self.data_dir = data_dir
+        self.todos_file_path = os.path.join(data_dir, self.TODOS_FILE)
+        if isinstance(storage, str):
+            try:
+                backend = STORAGE_BACKENDS[storage]
+            except KeyError:
+                raise ValueError(f"Unknown storage backend: {storage!r}") from None
+            storage = backend(
+                data_dir,
+                cache=cache,
+                durability=durability,
+                codec=get_json_codec(codec, pretty),
+            )
+        self.storage = storage
+        self.search_index = SearchIndex(data_dir, codec=storage.codec)
+        self._index_changes: list[tuple[str, dict | None]] | None = None
+
+    def _changed(self, todo_id: str, record: dict | None):
+        """Pass a todo change on to the search index (deferred in a batch)."""
+        if self._index_changes is not None:
+            self._index_changes.append((todo_id, record))
+        else:
+            self.search_index.apply([(todo_id, record)])
+
+    @contextmanager
+    def batch(self):
+        """Group mutations into a single load/save cycle.
+
+        Usage:
+            with manager.batch():
+                manager.add_todo(...)
+                manager.mark_as_completed(...)
+
+        Changes inside the block are visible to reads in the block, written
+        once on exit, and discarded if the block raises.
+        """
+        if self._index_changes is not None:
+            with self.storage.transaction():
+                yield self
+            return
+        self._index_changes = []
+        try:
+            with self.storage.transaction():
+                yield self
+            changes = self._index_changes
+        finally:
+            self._index_changes = None
+        # Only after the storage lock is released, and only if it committed
+        self.search_index.apply(changes)
+
+    def iter_todos(
+        self, owner: str | None = None, status: Status | None = None
+    ) -> Iterator[TodoItem]:
+        """Yield todos one at a time, optionally filtered.
+
+        With the default non-cached JSON backend the file is parsed
+        incrementally, so memory stays bounded by the largest record rather
+        than by the size of the file.
+
+        Args:
+            owner: Only yield todos belonging to this user
+            status: Only yield todos with this status
+        """
+        records = self.storage.iter_records(
+            owner=owner, status=None if status is None else status.value
+        )
+        return map(_decode_todo, records)
+
+    def get_all_todos(self) -> list[TodoItem]:
+        """Get all todos from the system."""
+        return list(self.iter_todos())
+
+    def get_user_todos(self, username: str) -> list[TodoItem]:
+        """Get all todos for a user."""
+        return list(self.iter_todos(owner=username))
+
+    def data_version(self, owner: str | None = None) -> Hashable:
+        """Return a token that changes whenever the stored todos change.
+
+        Checking it is much cheaper than reading the todos, so callers that
+        keep a copy (e.g. one user's list) can re-read only when it moves.
+
+        Args:
+            owner: Only track this user's todos where the backend can
+        """
+        return self.storage.version(owner)
+
+    def query(
+        self,
+        owner: str | None = None,
+        status: Status | None = None,
+        priority: Priority | None = None,
+        created_after: datetime | str | None = None,
+        order_by: str | None = None,
+        limit: int | None = None,
+        offset: int = 0,
+    ) -> TodoQuery:
+        """Build a lazy query over the todos.
+
+        Filters are pushed down to the storage backend (SQL for SQLite, the
+        owner index or the streaming reader for the file backends), so only
+        the requested page is ever decoded into TodoItems.
+
+        Args:
+            owner: Only todos belonging to this user
+            status: Only todos with this status
+            priority: Only todos with this priority
+            created_after: Only todos created strictly after this time
+            order_by: One of QUERY_ORDER_FIELDS, prefixed with "-" for
+                descending order; insertion order by default
+            limit: Return at most this many todos
+            offset: Skip this many matching todos first
+
+        Returns:
+            TodoQuery: Iterable result with count(), all() and first()
+        """
+        if isinstance(created_after, datetime):
+            created_after = created_after.isoformat()
+        filters = {
+            "owner": owner,
+            "status": None if status is None else status.value,
+            "priority": None if priority is None else priority.value,
+            "created_after": created_after,
+        }
+        return TodoQuery(self.storage, filters, order_by, limit, offset)
+
+    def search(self, owner: str, text: str) -> list[TodoItem]:
+        """Find a user's todos whose title or details match ``text``.
+
+        Every word of ``text`` must match (as a prefix) some word of the
+        todo, so "gro mil" finds "Buy groceries: milk". Results are ordered
+        by creation time.
+        """
+        todo_ids = self.search_index.search(owner, text, self.storage.iter_records)
+        terms = _tokenize(text)
+        results = []
+        for record in self.storage.get_many(todo_ids, owner=owner):
+            # The index is derived data, so confirm each hit against the todo
+            words = _tokenize(f"{record['title']} {record['details']}")
+            if record["owner"] == owner and all(
+                any(word.startswith(term) for word in words) for term in terms
+            ):
+                results.append(record)
+        results.sort(key=itemgetter("created_at"))
+        return [_decode_todo(record) for record in results]
+
+    def write_snapshot(self, path: str | None = None) -> str:
+        """Write a ColumnarSnapshot of all todos for fast read-only analysis.
+
+        Args:
+            path: Where to write it; defaults to todos.snapshot in data_dir
+
+        Returns:
+            str: The path written
+        """
+        path = path or os.path.join(self.data_dir, self.SNAPSHOT_FILE)
+        ColumnarSnapshot.write(
+            path, self.storage.iter_records(), self.storage.durability
+        )
+        return path
+
+    def open_snapshot(self, path: str | None = None) -> ColumnarSnapshot:
+        """Open a snapshot written by write_snapshot.
+
+        The snapshot is a point-in-time copy; later changes to the todos are
+        not reflected until it is written again.
+        """
+        return ColumnarSnapshot(path or os.path.join(self.data_dir, self.SNAPSHOT_FILE))
+
+    def import_stream(
+        self,
+        f,
+        format: str = "jsonl",
+        owner: str | None = None,
+        chunk_size: int = 1000,
+        progress: Callable[[int, float], None] | None = None,
+        on_error: Callable[[int, str], None] | None = None,
+    ) -> int:
+        """Import todos from a JSON Lines or CSV text stream.
+
+        Records are read and committed ``chunk_size`` at a time, so memory
+        stays bounded by one chunk however long the input is. A record whose
+        id already exists replaces that todo if it has the same owner.
+
+        Args:
+            f: Text stream to read (open CSV files with newline="")
+            format: One of TRANSFER_FORMATS; CSV needs a header row naming
+                the TODO_FIELDS columns it provides
+            owner: Import every todo for this user instead of the records'
+                own "owner" field
+            chunk_size: Records committed per batch
+            progress: Called after each chunk with the number of records
+                imported so far and the rate in records per second
+            on_error: Called with the line number and message of each invalid
+                record, which is then skipped; without it the first invalid
+                record raises (earlier chunks stay committed)
+
+        Returns:
+            int: The number of todos imported
+
+        Raises:
+            ValueError: For an unknown format, a chunk_size below 1, or an
+                invalid record when on_error is not given
+        """
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1")
+        if format == "jsonl":
+            rows = (
+                (line, text) for line, text in enumerate(f, 1) if not text.isspace()
+            )
+        elif format == "csv":
+            reader = csv.DictReader(f)
+            rows = ((reader.line_num, row) for row in reader)
+        else:
+            raise ValueError(f"Unknown format: {format!r}")
+        imported = 0
+        start = time.perf_counter()
+        while True:
+            # Read ahead outside the batch so input isn't awaited under the lock
+            chunk = list(islice(rows, chunk_size))
+            with self.batch():
+                parsed = []
+                for line, row in chunk:
+                    try:
+                        if isinstance(row, str):
+                            row = self.storage.codec.loads(row)
+                        todo = _import_todo(row, owner)
+                    except (TypeError, ValueError) as e:
+                        parsed.append((line, e, False))
+                    else:
+                        parsed.append((line, todo, bool(row.get("id"))))
+                # Only ids read from the input can already exist; look them
+                # up once per chunk rather than once per record
+                owners = {
+                    record["id"]: record["owner"]
+                    for record in self.storage.get_many(
+                        todo.id for _, todo, given_id in parsed if given_id
+                    )
+                }
+                for line, todo, _ in parsed:
+                    try:
+                        if isinstance(todo, Exception):
+                            raise todo
+                        self._import(todo, owners)
+                    except (TypeError, ValueError) as e:
+                        if on_error is None:
+                            raise ValueError(f"line {line}: {e}") from None
+                        on_error(line, str(e))
+                        continue
+                    imported += 1
+            if progress is not None and chunk:
+                progress(imported, imported / (time.perf_counter() - start))
+            if len(chunk) < chunk_size:
+                return imported
+
+    def _import(self, todo: TodoItem, owners: dict[str, str]):
+        """Add the todo, or replace the owner's todo with the same id.
+
+        ``owners`` maps the ids known to exist to their owners and is kept
+        up to date with the todos added.
+        """
+        owner = owners.get(todo.id)
+        if owner is None:
+            self.add_todo(todo)
+            owners[todo.id] = todo.owner
+        elif owner == todo.owner:
+            self.update_todo(todo.id, todo)
+        else:
+            raise ValueError(f"Id {todo.id!r} belongs to another user")
+
+    def export_stream(
+        self,
+        f,
+        format: str = "jsonl",
+        owner: str | None = None,
+        status: Status | None = None,
+        chunk_size: int = 1000,
+        progress: Callable[[int, float], None] | None = None,
+    ) -> int:
+        """Write todos to a text stream as JSON Lines or CSV.
+
+        Records are streamed from storage one at a time (see iter_todos), so
+        memory does not grow with the number of todos.
+
+        Args:
+            f: Text stream to write (open CSV files with newline="")
+            format: One of TRANSFER_FORMATS; CSV files get a TODO_FIELDS header
+            owner: Only export todos belonging to this user
+            status: Only export todos with this status
+            chunk_size: Records written between progress calls
+            progress: Called with the number of records written so far and
+                the rate in records per second
+
+        Returns:
+            int: The number of todos written
+        """
+        if format == "jsonl":
+            dumps = self.storage.codec.dumps
+
+            def write(record: dict):
+                f.write(dumps(record, pretty=False).decode())
+                f.write("\n")
+
+        elif format == "csv":
+            writer = csv.DictWriter(f, TODO_FIELDS, extrasaction="ignore")
+            writer.writeheader()
+            write = writer.writerow
+        else:
+            raise ValueError(f"Unknown format: {format!r}")
+        records = self.storage.iter_records(
+            owner=owner, status=None if status is None else status.value
+        )
+        count = 0
+        start = time.perf_counter()
+        for count, record in enumerate(records, 1):
+            write(record)
+            if progress is not None and count % chunk_size == 0:
+                progress(count, count / (time.perf_counter() - start))
+        if progress is not None and count % chunk_size:
+            progress(count, count / (time.perf_counter() - start))
+        return count
+
+    def add_todo(self, todo: TodoItem) -> bool:
+        """Add a new todo item."""
+        record = _encode_todo(todo)
+        self.storage.insert(record)
+        self._changed(todo.id, record)
+        return True
+
+    def update_todo(self, todo_id: str, updated_todo: TodoItem) -> bool:
+        """Update an existing todo item (last writer wins)."""
+        updated_data = _encode_todo(updated_todo)
+        if not self.storage.replace(todo_id, updated_data):
             return False
+        self._changed(todo_id, updated_data)
+        return True
+
+    def compare_and_update(
+        self, todo_id: str, updated_todo: TodoItem, expected_updated_at: str
+    ) -> UpdateResult:
+        """Update a todo only if nobody changed it since it was read.
+
+        Args:
+            todo_id: The ID of the todo item to update
+            updated_todo: The new contents
+            expected_updated_at: The updated_at of the copy the caller read
+
+        Returns:
+            UpdateResult: UPDATED, NOT_FOUND, or CONFLICT if the stored todo
+            has a different updated_at (re-read and retry)
+        """
+        if updated_todo.updated_at == expected_updated_at:
+            # The timestamp is the version: it must move for the CAS to work,
+            # so the caller's item is stamped with a newer one
+            updated_todo.updated_at = _timestamp_after(expected_updated_at)
+        updated_data = _encode_todo(updated_todo)
+        result = self.storage.compare_and_replace(
+            todo_id, updated_data, expected_updated_at
+        )
+        if result is UpdateResult.UPDATED:
+            self._changed(todo_id, updated_data)
+        return result
+
+    def delete_todo(self, todo_id: str, owner: str | None = None) -> bool:
+        """Delete a todo item.
+
+        Args:
+            todo_id: The ID of the todo item to delete
+            owner: Optional owner hint so sharded storage skips the id search
+
+        Returns:
+            bool: Always True; deleting a missing todo is not an error
+        """
+        self._delete(todo_id, owner)
+        return True
+
+    def _delete(self, todo_id: str, owner: str | None = None) -> bool:
+        """Delete a todo and return whether it existed."""
+        if not self.storage.remove(todo_id, owner=owner):
+            return False
+        self._changed(todo_id, None)
+        return True
+
+    def add_todos(self, todos: Iterable[TodoItem]) -> list[bool]:
+        """Add several todo items in one batch.
+
+        Returns:
+            list: add_todo's result for each item, in order
+        """
+        with self.batch():
+            return [self.add_todo(todo) for todo in todos]
+
+    def update_todos(self, todos: Iterable[TodoItem]) -> list[bool]:
+        """Update several todo items (matched by their id) in one batch.
+
+        Returns:
+            list: update_todo's result for each item, in order
+        """
+        with self.batch():
+            return [self.update_todo(todo.id, todo) for todo in todos]
+
+    def delete_todos(self, todo_ids: Iterable[str]) -> list[bool]:
+        """Delete several todo items in one batch.
+
+        Returns:
+            list: For each id, in order, whether that todo existed
+        """
+        with self.batch():
+            return [self._delete(todo_id) for todo_id in todo_ids]
+
+    def mark_many_completed(self, todo_ids: Iterable[str]) -> list[bool]:
+        """Mark several todo items as completed in one batch.
+
+        Returns:
+            list: mark_as_completed's result for each id, in order
+        """
+        with self.batch():
+            return [self.mark_as_completed(todo_id) for todo_id in todo_ids]
+
+    def get_todo_by_id(self, todo_id: str, owner: str | None = None) -> TodoItem | None:
+        """Get a specific todo item by ID.
+
+        Args:
+            todo_id: The ID of the todo item
+            owner: Optional owner hint so sharded storage skips the id search
+
+        Returns:
+            TodoItem if found, None otherwise
+        """
+        todo = self.storage.get(todo_id, owner=owner)
+        return None if todo is None else _decode_todo(todo)
+
+    def mark_as_completed(self, todo_id: str, owner: str | None = None) -> bool:
+        """Mark a specific todo item as completed.
+
+        Args:
+            todo_id: The ID of the todo item to mark as completed
+            owner: Optional owner hint so sharded storage skips the id search
+
+        Returns:
+            bool: True if successfully marked as completed, False otherwise
+        """
+        while True:
+            todo = self.get_todo_by_id(todo_id, owner=owner)
+            if todo is None:
+                return False
+
+            # Update the status to COMPLETED and update the timestamp
+            updated_todo = TodoItem(
+                id=todo.id,
+                title=todo.title,
+                details=todo.details,
+                priority=todo.priority,
+                status=Status.COMPLETED,
+                owner=todo.owner,
+                created_at=todo.created_at,
+                updated_at=_utcnow().isoformat(),
+            )
+            result = self.compare_and_update(todo_id, updated_todo, todo.updated_at)
+            if result is not UpdateResult.CONFLICT:
+                return result is UpdateResult.UPDATED
+            # Someone else edited it in between: re-read so their change stays
+
+
+class _AsyncFacade:
+    """Runs a blocking manager's methods on a bounded thread pool."""
+
+    def __init__(self, max_workers: int, executor: Executor | None):
+        self._owns_executor = executor is None
+        self._executor = executor or ThreadPoolExecutor(
+            max_workers, thread_name_prefix=type(self).__name__
+        )
+
+    async def _run(self, func: Callable, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, partial(func, *args, **kwargs)
+        )
+
+    async def close(self):
+        """Shut down the thread pool if it was created here."""
+        if self._owns_executor:
+            self._executor.shutdown()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+
+class AsyncAuthManager(_AsyncFacade):
+    """Asyncio front end to an AuthManager.
+
+    Each call runs on a bounded thread pool, so the event loop never waits
+    on the user store's file or database I/O.
+    """
+
+    def __init__(
+        self,
+        auth_manager: AuthManager | None = None,
+        max_workers: int = 4,
+        executor: Executor | None = None,
+        **kwargs,
+    ):
+        """Initialize AsyncAuthManager.
+
+        Args:
+            auth_manager: Manager to wrap; by default one is built from kwargs
+            max_workers: Size of the thread pool created when none is given
+            executor: Thread pool to share with other async managers
+            **kwargs: AuthManager arguments (data_dir, storage, ...)
+        """
+        super().__init__(max_workers, executor)
+        self.auth_manager = auth_manager or AuthManager(**kwargs)
+
+    async def sign_up(self, username: str, password: str) -> tuple[bool, str]:
+        """Register a new user (see AuthManager.sign_up)."""
+        return await self._run(self.auth_manager.sign_up, username, password)
+
+    async def login(self, username: str, password: str) -> tuple[bool, str]:
+        """Authenticate a user (see AuthManager.login)."""
+        return await self._run(self.auth_manager.login, username, password)
+
+    async def issue_token(
+        self, username: str, password: str, ttl: float | None = None
+    ) -> str | None:
+        """Log in and return a session token (see AuthManager.issue_token)."""
+        return await self._run(self.auth_manager.issue_token, username, password, ttl)
+
+    async def validate_token(self, token: str) -> str | None:
+        """Return the username of a live session token, or None."""
+        return await self._run(self.auth_manager.validate_token, token)
+
+    async def revoke_token(self, token: str) -> bool:
+        """Log a session token out; False if it was unknown."""
+        return await self._run(self.auth_manager.revoke_token, token)
+
+
+class AsyncTodoManager(_AsyncFacade):
+    """Asyncio front end to a TodoManager.
+
+    Reads run on a bounded thread pool. Mutations are group-committed: those
+    arriving within ``commit_window`` seconds of each other are applied in
+    one TodoManager batch, so they share a single save, and each caller
+    gets the same return value the sync method would give. One failing
+    mutation doesn't affect the others in its group, but if the save itself
+    fails every caller in the group gets that exception.
+    """
+
+    def __init__(
+        self,
+        todo_manager: TodoManager | None = None,
+        max_workers: int = 4,
+        executor: Executor | None = None,
+        commit_window: float = 0.002,
+        **kwargs,
+    ):
+        """Initialize AsyncTodoManager.
+
+        Args:
+            todo_manager: Manager to wrap; by default one is built from kwargs
+            max_workers: Size of the thread pool created when none is given
+            executor: Thread pool to share with other async managers
+            commit_window: Seconds to wait for more mutations before saving
+            **kwargs: TodoManager arguments (data_dir, storage, cache, ...)
+        """
+        super().__init__(max_workers, executor)
+        self.todo_manager = todo_manager or TodoManager(**kwargs)
+        self.commit_window = commit_window
+        self._group: list[tuple[Callable, asyncio.Future]] | None = None
+        self._group_task: asyncio.Task | None = None
+        self._commit_lock: asyncio.Lock | None = None
+
+    def _apply_group(self, calls: list[Callable]) -> list:
+        """Run a group of mutations in one batch; storage errors are returned.
+
+        Any other exception aborts the whole group.
+        """
+        results = []
+        with self.todo_manager.batch():
+            for call in calls:
+                try:
+                    results.append(call())
+                except STORAGE_ERRORS as e:
+                    results.append(e)
+        return results
+
+    async def _commit_group(self):
+        await asyncio.sleep(self.commit_window)
+        if self._commit_lock is None:
+            self._commit_lock = asyncio.Lock()
+        # TodoManager.batch isn't reentrant across threads, so groups commit
+        # one at a time; mutations arriving meanwhile join the waiting group
+        async with self._commit_lock:
+            group, self._group = self._group, None
+            try:
+                results = await self._run(
+                    self._apply_group, [call for call, _ in group]
+                )
+            except STORAGE_ERRORS as e:
+                # The save itself failed, so none of the group is stored
+                results = [e] * len(group)
+            except BaseException as e:
+                # Don't leave the callers waiting on a group that never ran
+                for _, future in group:
+                    if future.done():
+                        continue
+                    if isinstance(e, Exception):
+                        future.set_exception(e)
+                    else:
+                        future.cancel()
+                raise
+        for (_, future), result in zip(group, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    async def _mutate(self, func: Callable, *args, **kwargs):
+        """Queue a mutation for the next group commit and wait for it."""
+        future = asyncio.get_running_loop().create_future()
+        if self._group is None:
+            self._group = []
+            self._group_task = asyncio.create_task(self._commit_group())
+        self._group.append((partial(func, *args, **kwargs), future))
+        return await future
+
+    async def flush(self):
+        """Wait until every queued mutation has been committed."""
+        while self._group_task is not None and not self._group_task.done():
+            await asyncio.shield(self._group_task)
+
+    async def close(self):
+        """Commit queued mutations, then shut down the thread pool."""
+        await self.flush()
+        await super().close()
+
+    async def get_all_todos(self) -> list[TodoItem]:
+        """Get all todos from the system."""
+        return await self._run(self.todo_manager.get_all_todos)
+
+    async def get_user_todos(self, username: str) -> list[TodoItem]:
+        """Get all todos for a user."""
+        return await self._run(self.todo_manager.get_user_todos, username)
+
+    async def get_todo_by_id(
+        self, todo_id: str, owner: str | None = None
+    ) -> TodoItem | None:
+        """Get a specific todo item by ID (see TodoManager.get_todo_by_id)."""
+        return await self._run(self.todo_manager.get_todo_by_id, todo_id, owner)
+
+    async def search(self, owner: str, text: str) -> list[TodoItem]:
+        """Search a user's todos (see TodoManager.search)."""
+        return await self._run(self.todo_manager.search, owner, text)
+
+    async def add_todo(self, todo: TodoItem) -> bool:
+        """Add a new todo item."""
+        return await self._mutate(self.todo_manager.add_todo, todo)
+
+    async def update_todo(self, todo_id: str, updated_todo: TodoItem) -> bool:
+        """Update an existing todo item (last writer wins)."""
+        return await self._mutate(self.todo_manager.update_todo, todo_id, updated_todo)
+
+    async def compare_and_update(
+        self, todo_id: str, updated_todo: TodoItem, expected_updated_at: str
+    ) -> UpdateResult:
+        """Update a todo only if nobody changed it since it was read."""
+        return await self._mutate(
+            self.todo_manager.compare_and_update,
+            todo_id,
+            updated_todo,
+            expected_updated_at,
+        )
+
+    async def delete_todo(self, todo_id: str, owner: str | None = None) -> bool:
+        """Delete a todo item."""
+        return await self._mutate(self.todo_manager.delete_todo, todo_id, owner)
 
-        # Update the status to COMPLETED and update the timestamp
-        updated_todo = TodoItem(
-            id=todo.id,
-            title=todo.title,
-            details=todo.details,
-            priority=todo.priority,
-            status=Status.COMPLETED,
-            owner=todo.owner,
-            created_at=todo.created_at,
-            updated_at=datetime.utcnow().isoformat(),
-        )
-        return self.update_todo(todo_id, updated_todo)
+    async def mark_as_completed(self, todo_id: str, owner: str | None = None) -> bool:
+        """Mark a specific todo item as completed."""
+        return await self._mutate(self.todo_manager.mark_as_completed, todo_id, owner)
@@ -0,0 +1,445 @@
+"""
+HTTP/JSON API for the To-Do List application, built on asyncio streams.
+
+Usage:
+    python src/server.py [--host 127.0.0.1] [--port 8080] [--data-dir .]
+
+Endpoints (todo endpoints take a Bearer token or HTTP Basic credentials):
+    POST   /users                 {"username": ..., "password": ...}
+    POST   /login                 {"username": ..., "password": ...} -> token
+    POST   /logout                revokes the Bearer token
+    GET    /todos                 ?status=PENDING&limit=10&offset=0
+    POST   /todos                 {"title": ..., "details": ..., "priority": ...}
+    GET    /todos/<id>
+    PATCH  /todos/<id>            any of title, details, priority, status
+    POST   /todos/<id>/complete
+    DELETE /todos/<id>
+
+The todos stay resident in a cached TodoManager. Reads run on a thread
+pool; every mutation is queued for a single writer task, which applies
+whatever has queued up in one TodoManager batch so concurrent requests
+share one save.
+"""
+
+import argparse
+import asyncio
+import base64
+import binascii
+import json
+import re
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from urllib.parse import parse_qs, urlsplit
+
+from models import (
+    STORAGE_BACKENDS,
+    STORAGE_ERRORS,
+    AuthManager,
+    Priority,
+    Status,
+    TodoItem,
+    TodoManager,
+)
+
+
+class HTTPError(Exception):
+    """Ends a request with an error status and message."""
+
+    def __init__(self, status: HTTPStatus, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+def _enum_value(enum, value, field: str):
+    try:
+        return enum(value)
+    except ValueError:
+        raise HTTPError(HTTPStatus.BAD_REQUEST, f"Invalid {field}: {value!r}") from None
+
+
+def _text(body: dict, field: str, required: bool = False) -> str | None:
+    value = body.get(field)
+    if value is None and not required:
+        return None
+    if not isinstance(value, str) or (required and not value):
+        raise HTTPError(HTTPStatus.BAD_REQUEST, f"{field} must be a non-empty string")
+    return value
+
+
+def _non_negative_int(query: dict, field: str) -> int | None:
+    value = query.get(field)
+    if value is None:
+        return None
+    try:
+        number = int(value)
+    except ValueError:
+        number = -1
+    if number < 0:
+        raise HTTPError(
+            HTTPStatus.BAD_REQUEST, f"{field} must be a non-negative integer"
+        )
+    return number
+
+
+class TodoServer:
+    """Serves AuthManager and TodoManager operations over HTTP/1.1."""
+
+    # Most mutations one writer batch applies before saving
+    MAX_BATCH = 1000
+    # Largest request body accepted, in bytes
+    MAX_BODY = 1 << 20
+    # Authorization headers remembered after a successful login
+    MAX_SESSIONS = 1024
+
+    def __init__(
+        self,
+        data_dir: str = ".",
+        storage: str = "json",
+        read_threads: int = 4,
+    ):
+        """Initialize the server.
+
+        Args:
+            data_dir: Directory holding the todo and user data
+            storage: Todo backend name from STORAGE_BACKENDS
+            read_threads: Size of the thread pool that serves reads
+        """
+        self.auth_manager = AuthManager(data_dir=data_dir)
+        self.todo_manager = TodoManager(data_dir=data_dir, cache=True, storage=storage)
+        self._readers = ThreadPoolExecutor(read_threads, "todo-read")
+        self._writer_thread = ThreadPoolExecutor(1, "todo-write")
+        self._queue: asyncio.Queue | None = None
+        self._writer_task: asyncio.Task | None = None
+        self._sessions: dict[str, str] = {}
+        self._routes: list[tuple[str, re.Pattern, Callable, bool]] = [
+            ("POST", re.compile(r"/users"), self._sign_up, False),
+            ("POST", re.compile(r"/login"), self._login, False),
+            ("POST", re.compile(r"/logout"), self._logout, False),
+            ("GET", re.compile(r"/todos"), self._list_todos, False),
+            ("POST", re.compile(r"/todos"), self._add_todo, True),
+            ("GET", re.compile(r"/todos/([^/]+)"), self._get_todo, False),
+            ("PATCH", re.compile(r"/todos/([^/]+)"), self._edit_todo, True),
+            ("POST", re.compile(r"/todos/([^/]+)/complete"), self._complete_todo, True),
+            ("DELETE", re.compile(r"/todos/([^/]+)"), self._delete_todo, True),
+        ]
+
+    # Endpoints. Each runs on a worker thread and returns (status, payload);
+    # the ones marked as writes run on the writer thread inside a batch.
+
+    def _sign_up(self, user, query, body):
+        ok, message = self.auth_manager.sign_up(
+            _text(body, "username", True), _text(body, "password", True)
+        )
+        return (HTTPStatus.CREATED if ok else HTTPStatus.CONFLICT), {"message": message}
+
+    def _login(self, user, query, body):
+        token = self.auth_manager.issue_token(
+            _text(body, "username", True), _text(body, "password", True)
+        )
+        if token is None:
+            raise HTTPError(HTTPStatus.UNAUTHORIZED, "Invalid username or password.")
+        expires_in = self.auth_manager.tokens.ttl
+        return HTTPStatus.OK, {"token": token, "expires_in": expires_in}
+
+    def _logout(self, user, query, body, token=None):
+        if token is None or not self.auth_manager.revoke_token(token):
+            raise HTTPError(HTTPStatus.UNAUTHORIZED, "Bearer token required")
+        return HTTPStatus.NO_CONTENT, None
+
+    def _list_todos(self, user, query, body):
+        limit = _non_negative_int(query, "limit")
+        offset = _non_negative_int(query, "offset") or 0
+        status = query.get("status")
+        todos = self.todo_manager.query(
+            owner=user,
+            status=None if status is None else _enum_value(Status, status, "status"),
+            limit=limit,
+            offset=offset,
+        )
+        return HTTPStatus.OK, [todo.to_dict() for todo in todos]
+
+    def _own_todo(self, user: str, todo_id: str) -> TodoItem:
+        todo = self.todo_manager.get_todo_by_id(todo_id, owner=user)
+        if todo is None or todo.owner != user:
+            raise HTTPError(HTTPStatus.NOT_FOUND, f"No todo with id {todo_id!r}")
+        return todo
+
+    def _get_todo(self, user, query, body, todo_id):
+        return HTTPStatus.OK, self._own_todo(user, todo_id).to_dict()
+
+    def _add_todo(self, user, query, body):
+        todo = TodoItem(
+            title=_text(body, "title", True),
+            details=_text(body, "details") or "",
+            priority=_enum_value(Priority, body.get("priority", "MID"), "priority"),
+            owner=user,
+        )
+        self.todo_manager.add_todo(todo)
+        return HTTPStatus.CREATED, todo.to_dict()
+
+    def _edit_todo(self, user, query, body, todo_id):
+        todo = self._own_todo(user, todo_id)
+        title = _text(body, "title")
+        details = _text(body, "details")
+        updated_todo = TodoItem(
+            id=todo.id,
+            title=todo.title if title is None else title,
+            details=todo.details if details is None else details,
+            priority=_enum_value(
+                Priority, body.get("priority", todo.priority.value), "priority"
+            ),
+            status=_enum_value(Status, body.get("status", todo.status.value), "status"),
+            owner=user,
+            created_at=todo.created_at,
+        )
+        self.todo_manager.update_todo(todo.id, updated_todo)
+        return HTTPStatus.OK, updated_todo.to_dict()
+
+    def _complete_todo(self, user, query, body, todo_id):
+        self._own_todo(user, todo_id)
+        self.todo_manager.mark_as_completed(todo_id, owner=user)
+        return HTTPStatus.OK, self._own_todo(user, todo_id).to_dict()
+
+    def _delete_todo(self, user, query, body, todo_id):
+        self._own_todo(user, todo_id)
+        self.todo_manager.delete_todo(todo_id, owner=user)
+        return HTTPStatus.NO_CONTENT, None
+
+    # Writer
+
+    def _apply_batch(self, calls: list[Callable]) -> list:
+        """Run queued mutations in one batch.
+
+        Request and storage errors are returned per mutation; any other
+        exception aborts the whole batch.
+        """
+        results = []
+        with self.todo_manager.batch():
+            for call in calls:
+                try:
+                    results.append(call())
+                except (HTTPError, *STORAGE_ERRORS) as e:
+                    results.append(e)
+        return results
+
+    async def _write_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < self.MAX_BATCH and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            calls = [call for call, _ in batch]
+            try:
+                results = await loop.run_in_executor(
+                    self._writer_thread, self._apply_batch, calls
+                )
+            except STORAGE_ERRORS as e:
+                # The save itself failed, so none of the batch is stored
+                results = [e] * len(batch)
+            except BaseException as e:
+                # Don't leave the requests waiting on a batch that never ran
+                for _, future in batch:
+                    if future.done():
+                        continue
+                    if isinstance(e, Exception):
+                        future.set_exception(e)
+                    else:
+                        future.cancel()
+                raise
+            for (_, future), result in zip(batch, results):
+                if future.done():
+                    continue
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+
+    async def _write(self, call: Callable):
+        """Queue a mutation for the writer task and wait until it is saved."""
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((call, future))
+        return await future
+
+    # HTTP
+
+    def _authenticate(self, headers: dict) -> str:
+        """Return the user named by the credentials, or raise 401.
+
+        Bearer tokens are checked with AuthManager.validate_token. Basic
+        credentials cost a password hash, so headers that passed once are
+        remembered for the life of the server.
+        """
+        header = headers.get("authorization", "")
+        scheme, _, encoded = header.partition(" ")
+        if scheme.lower() == "bearer":
+            user = self.auth_manager.validate_token(encoded)
+            if user is None:
+                raise HTTPError(HTTPStatus.UNAUTHORIZED, "Invalid or expired token")
+            return user
+        user = self._sessions.get(header)
+        if user is not None:
+            return user
+        try:
+            if scheme.lower() != "basic":
+                raise ValueError
+            username, _, password = base64.b64decode(encoded).decode().partition(":")
+        except (ValueError, binascii.Error):
+            raise HTTPError(HTTPStatus.UNAUTHORIZED, "Basic credentials required")
+        ok, message = self.auth_manager.login(username, password)
+        if not ok:
+            raise HTTPError(HTTPStatus.UNAUTHORIZED, message)
+        if len(self._sessions) >= self.MAX_SESSIONS:
+            self._sessions.clear()
+        self._sessions[header] = username
+        return username
+
+    def _route(self, method: str, path: str) -> tuple[Callable, bool, tuple]:
+        allowed = False
+        for route_method, pattern, handler, is_write in self._routes:
+            match = pattern.fullmatch(path)
+            if match is None:
+                continue
+            if route_method == method:
+                return handler, is_write, match.groups()
+            allowed = True
+        if allowed:
+            raise HTTPError(HTTPStatus.METHOD_NOT_ALLOWED, f"{method} not allowed")
+        raise HTTPError(HTTPStatus.NOT_FOUND, f"No such endpoint: {path}")
+
+    async def _dispatch(self, method: str, target: str, headers: dict, body: bytes):
+        """Run one request and return (status, payload)."""
+        url = urlsplit(target)
+        handler, is_write, args = self._route(method, url.path)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        try:
+            data = json.loads(body) if body else {}
+        except ValueError:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Body must be JSON")
+        if not isinstance(data, dict):
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Body must be a JSON object")
+
+        loop = asyncio.get_running_loop()
+        user = None
+        if url.path.startswith("/todos"):
+            user = await loop.run_in_executor(
+                self._readers, self._authenticate, headers
+            )
+        elif url.path == "/logout":
+            scheme, _, token = headers.get("authorization", "").partition(" ")
+            if scheme.lower() == "bearer":
+                args = (token,)
+        if is_write:
+            return await self._write(lambda: handler(user, query, data, *args))
+        return await loop.run_in_executor(
+            self._readers, lambda: handler(user, query, data, *args)
+        )
+
+    async def _handle_connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+                    break
+                lines = head.decode("latin-1").split("\r\n")
+                try:
+                    method, target, version = lines[0].split(" ")
+                except ValueError:
+                    break
+                headers = {}
+                for line in lines[1:]:
+                    name, _, value = line.partition(":")
+                    if name:
+                        headers[name.strip().lower()] = value.strip()
+                keep_alive = (
+                    headers.get("connection", "").lower() != "close"
+                    and version == "HTTP/1.1"
+                )
+
+                try:
+                    length = int(headers.get("content-length", 0))
+                    if not 0 <= length <= self.MAX_BODY:
+                        raise HTTPError(
+                            HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "Body too large"
+                        )
+                    body = await reader.readexactly(length) if length else b""
+                    status, payload = await self._dispatch(
+                        method, target, headers, body
+                    )
+                except HTTPError as e:
+                    status, payload = e.status, {"error": str(e)}
+                    if e.status is HTTPStatus.REQUEST_ENTITY_TOO_LARGE:
+                        keep_alive = False
+                except asyncio.IncompleteReadError:
+                    break
+                except STORAGE_ERRORS as e:
+                    status, payload = (
+                        HTTPStatus.INTERNAL_SERVER_ERROR,
+                        {"error": str(e)},
+                    )
+
+                data = b"" if payload is None else json.dumps(payload).encode()
+                writer.write(
+                    (
+                        f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+                        "Content-Type: application/json\r\n"
+                        f"Content-Length: {len(data)}\r\n"
+                        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+                        "\r\n"
+                    ).encode()
+                    + data
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8080) -> asyncio.Server:
+        """Start the writer task and listen; port 0 picks a free port."""
+        self._queue = asyncio.Queue()
+        self._writer_task = asyncio.create_task(self._write_loop())
+        return await asyncio.start_server(
+            self._handle_connection, host, port, backlog=1024
+        )
+
+    async def close(self):
+        """Stop the writer task and release the thread pools."""
+        if self._writer_task is not None:
+            self._writer_task.cancel()
+        self._readers.shutdown()
+        self._writer_thread.shutdown()
+
+
+async def serve(host: str, port: int, data_dir: str, storage: str):
+    """Run a TodoServer until cancelled."""
+    server = TodoServer(data_dir=data_dir, storage=storage)
+    listener = await server.start(host, port)
+    host, port = listener.sockets[0].getsockname()[:2]
+    print(f"Listening on http://{host}:{port}", flush=True)
+    try:
+        async with listener:
+            await listener.serve_forever()
+    finally:
+        await server.close()
+
+
+def main():
+    """Parse arguments and serve until interrupted."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--data-dir", default=".", help="directory holding the data")
+    parser.add_argument("--storage", default="json", choices=sorted(STORAGE_BACKENDS))
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port, args.data_dir, args.storage))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -3,10 +3,13 @@ Unit tests for the AuthManager authentication module.
 """
 
 import pytest
+import asyncio
+import hashlib
 import json
 import tempfile
+import time
 from pathlib import Path
-from src.models import AuthManager
+from src.models import AsyncAuthManager, AuthManager, migrate_storage
 
 
 class TestAuthManager:
@@ -207,6 +210,53 @@ class TestAuthManager:
         assert success1 is True
         assert success2 is True
 
+    def test_password_hashes_are_salted(self, auth_manager):
+        """Test that equal passwords get different salts and hashes."""
+        auth_manager.sign_up("user1", "shared_password")
+        auth_manager.sign_up("user2", "shared_password")
+        user1 = auth_manager.storage.get("user1")
+        user2 = auth_manager.storage.get("user2")
+
+        assert user1["kdf"] == "scrypt"
+        assert user1["params"] == auth_manager.kdf_params
+        assert user1["salt"] != user2["salt"]
+        assert user1["password"] != user2["password"]
+
+    def test_legacy_sha256_hash_is_upgraded_on_login(self, auth_manager):
+        """Test that an unsalted SHA-256 record is rehashed at login."""
+        legacy = hashlib.sha256(b"old_password").hexdigest()
+        auth_manager.storage.insert("legacy", {"password": legacy})
+
+        assert auth_manager.login("legacy", "wrong")[0] is False
+        assert auth_manager.storage.get("legacy") == {"password": legacy}
+
+        assert auth_manager.login("legacy", "old_password")[0] is True
+        upgraded = auth_manager.storage.get("legacy")
+        assert upgraded["kdf"] == "scrypt"
+        assert upgraded["password"] != legacy
+        assert auth_manager.login("legacy", "old_password")[0] is True
+
+    def test_cost_change_rehashes_on_login(self, temp_dir):
+        """Test that users are rehashed when the cost settings change."""
+        cheap = AuthManager(data_dir=temp_dir, kdf_params={"n": 2**10})
+        cheap.sign_up("user", "password")
+
+        pbkdf2 = AuthManager(
+            data_dir=temp_dir, kdf="pbkdf2_sha256", kdf_params={"iterations": 1000}
+        )
+        assert pbkdf2.login("user", "password")[0] is True
+        record = pbkdf2.storage.get("user")
+        assert record["kdf"] == "pbkdf2_sha256"
+        assert record["params"] == {"iterations": 1000}
+        assert len(record["password"]) == 64
+        assert cheap.login("user", "password")[0] is True
+        assert cheap.storage.get("user")["params"]["n"] == 2**10
+
+    def test_unknown_password_scheme(self, temp_dir):
+        """Test that an unknown hashing scheme is rejected."""
+        with pytest.raises(ValueError):
+            AuthManager(data_dir=temp_dir, kdf="md5")
+
     def test_special_characters_in_credentials(self, auth_manager):
         """Test sign up and login with special characters."""
         username = "user@example.com"
@@ -239,3 +289,193 @@ class TestAuthManager:
 
         login_success, _ = auth_manager.login(username, password)
         assert login_success is True
+
+    # SQLite Storage Tests
+
+    def test_sqlite_sign_up_and_login(self, temp_dir):
+        """Test the sign up and login flow on the SQLite backend."""
+        auth = AuthManager(data_dir=temp_dir, storage="sqlite")
+        assert auth.sign_up("alice", "alice_pass")[0] is True
+        assert auth.sign_up("alice", "other_pass")[0] is False
+
+        reopened = AuthManager(data_dir=temp_dir, storage="sqlite")
+        assert reopened.login("alice", "alice_pass")[0] is True
+        assert reopened.login("alice", "wrong_pass")[0] is False
+        assert reopened.login("bob", "bob_pass")[0] is False
+
+    def test_unknown_storage_backend(self, temp_dir):
+        """Test that an unknown backend name is rejected."""
+        with pytest.raises(ValueError):
+            AuthManager(data_dir=temp_dir, storage="nope")
+
+    def test_migrate_users_to_sqlite(self, auth_manager, temp_dir):
+        """Test that migration copies users.json into the SQLite backend."""
+        auth_manager.sign_up("alice", "alice_pass")
+        auth_manager.sign_up("bob", "bob_pass")
+
+        _, copied = migrate_storage(temp_dir, "sqlite")
+        assert copied == 2
+
+        sqlite_auth = AuthManager(data_dir=temp_dir, storage="sqlite")
+        assert sqlite_auth.login("bob", "bob_pass")[0] is True
+
+    # Durable Save Tests
+
+    def test_interrupted_save_keeps_previous_users(self, auth_manager, monkeypatch):
+        """Test that a sign up killed mid-write leaves existing users intact."""
+        auth_manager.sign_up("alice", "alice_pass")
+
+        def broken_dumps(obj, pretty=None):
+            # Killed while encoding, after the temp file was created
+            raise KeyboardInterrupt
+
+        monkeypatch.setattr(auth_manager.storage.codec, "dumps", broken_dumps)
+        with pytest.raises(KeyboardInterrupt):
+            auth_manager.sign_up("bob", "bob_pass")
+        monkeypatch.undo()
+
+        assert auth_manager.login("alice", "alice_pass")[0] is True
+        assert auth_manager.login("bob", "bob_pass")[0] is False
+
+    def test_compact_users_file(self, temp_dir):
+        """Test that compact output is still readable by a pretty manager."""
+        compact = AuthManager(data_dir=temp_dir, codec="json", pretty=False)
+        compact.sign_up("alice", "alice_pass")
+
+        content = Path(compact.users_file_path).read_text()
+        assert "\n" not in content
+        assert "password" in json.loads(content)["alice"]
+        assert AuthManager(data_dir=temp_dir).login("alice", "alice_pass")[0] is True
+
+    # Bulk Sign Up and User Store Tests
+
+    @pytest.mark.parametrize("storage", ["json", "sqlite"])
+    def test_sign_up_many(self, temp_dir, storage, monkeypatch):
+        """Test bulk sign up results and that it writes the store once."""
+        auth = AuthManager(data_dir=temp_dir, storage=storage, kdf_params={"n": 2**10})
+        auth.sign_up("taken", "password")
+        saves = []
+        monkeypatch.setattr(
+            auth.storage, "insert", lambda *args: saves.append(args) or True
+        )
+        hashed = []
+        original_hash_passwords = auth.hash_passwords
+
+        def recording_hash_passwords(passwords, workers=1):
+            hashed.extend(passwords)
+            return original_hash_passwords(passwords, workers)
+
+        monkeypatch.setattr(auth, "hash_passwords", recording_hash_passwords)
+
+        results = auth.sign_up_many(
+            [("new1", "pass1"), ("taken", "pass"), ("", "pass"), ("new1", "again")]
+            + [("new2", "pass2")]
+        )
+        assert [ok for ok, _ in results] == [True, False, False, False, True]
+        assert "already exists" in results[1][1]
+        assert "cannot be empty" in results[2][1]
+        assert "already exists" in results[3][1]
+        assert saves == []
+        # Taken and repeated usernames are turned away before hashing
+        assert hashed == ["pass1", "pass2"]
+
+        restarted = AuthManager(data_dir=temp_dir, storage=storage)
+        assert restarted.login("new1", "pass1")[0] is True
+        assert restarted.login("new2", "pass2")[0] is True
+        assert restarted.login("taken", "password")[0] is True
+
+    def test_sign_up_many_hashes_in_processes(self, temp_dir):
+        """Test that pooled hashing creates working, distinctly salted users."""
+        auth = AuthManager(data_dir=temp_dir, kdf_params={"n": 2**10})
+        timings = {}
+        credentials = [(f"user{i}", f"pass{i}") for i in range(8)]
+
+        results = auth.sign_up_many(credentials, workers=2, timings=timings)
+        assert all(ok for ok, _ in results)
+        assert set(timings) == {"hash", "persist"}
+        salts = {auth.storage.get(username)["salt"] for username, _ in credentials}
+        assert len(salts) == 8
+        assert auth.login("user7", "pass7")[0] is True
+
+    def test_users_file_is_cached_until_it_changes(
+        self, auth_manager, temp_dir, monkeypatch
+    ):
+        """Test that users.json is parsed again only after it changes."""
+        auth_manager.sign_up("alice", "alice_pass")
+        parses = []
+        original_loads = auth_manager.storage.codec.loads
+        monkeypatch.setattr(
+            auth_manager.storage.codec,
+            "loads",
+            lambda data: parses.append(1) or original_loads(data),
+        )
+
+        auth_manager.login("alice", "alice_pass")
+        auth_manager.login("alice", "wrong")
+        assert auth_manager.storage.get("alice") is not None
+        assert parses == []
+
+        AuthManager(data_dir=temp_dir).sign_up("bob", "bob_pass")
+        assert auth_manager.storage.get("bob") is not None
+        assert len(parses) == 1
+
+    # Session Token Tests
+
+    def test_issue_and_validate_token(self, auth_manager, temp_dir):
+        """Test that a token names its user and survives a restart."""
+        auth_manager.sign_up("alice", "password")
+        assert auth_manager.issue_token("alice", "wrong") is None
+
+        token = auth_manager.issue_token("alice", "password")
+        assert auth_manager.validate_token(token) == "alice"
+        assert auth_manager.validate_token("not-a-token") is None
+        assert token not in (Path(temp_dir) / "tokens.json").read_text()
+
+        restarted = AuthManager(data_dir=temp_dir)
+        assert restarted.validate_token(token) == "alice"
+
+    def test_revoked_token_is_rejected_everywhere(self, auth_manager, temp_dir):
+        """Test that revoking a token reaches other managers."""
+        auth_manager.sign_up("alice", "password")
+        token = auth_manager.issue_token("alice", "password")
+        other = AuthManager(data_dir=temp_dir)
+        assert other.validate_token(token) == "alice"
+
+        assert auth_manager.revoke_token(token) is True
+        assert auth_manager.revoke_token(token) is False
+        assert other.validate_token(token) is None
+
+    def test_expired_tokens_are_evicted(self, auth_manager, monkeypatch):
+        """Test token TTLs and the bound on stored tokens."""
+        auth_manager.sign_up("alice", "password")
+        auth_manager.tokens.max_tokens = 2
+        short = auth_manager.issue_token("alice", "password", ttl=60)
+        first = auth_manager.issue_token("alice", "password")
+        second = auth_manager.issue_token("alice", "password")
+        third = auth_manager.issue_token("alice", "password")
+
+        assert auth_manager.validate_token(short) is None
+        assert auth_manager.validate_token(first) is None
+        assert auth_manager.validate_token(second) == "alice"
+        assert auth_manager.validate_token(third) == "alice"
+
+        now = time.time()
+        monkeypatch.setattr(time, "time", lambda: now + 3601)
+        assert auth_manager.validate_token(third) is None
+        assert len(auth_manager.tokens._tokens) == 1
+
+    def test_async_sign_up_and_login(self, auth_manager):
+        """Test that AsyncAuthManager returns the sync results."""
+
+        async def run():
+            async with AsyncAuthManager(auth_manager) as async_auth:
+                signed_up = await async_auth.sign_up("async_user", "password")
+                return signed_up, await asyncio.gather(
+                    async_auth.login("async_user", "password"),
+                    async_auth.login("async_user", "wrong"),
+                )
+
+        signed_up, (good, bad) = asyncio.run(run())
+        assert signed_up[0] is True
+        assert good[0] is True
+        assert bad[0] is False
@@ -0,0 +1,232 @@
+"""
+Unit tests for the non-interactive command interface.
+"""
+
+import io
+import json
+import os
+import sys
+
+import pytest
+
+# cli.py imports its siblings as top-level modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+import cli
+from models import AuthManager, Status, TodoItem, TodoManager
+
+
+class TestCommandRunner:
+    """Test suite for CommandRunner."""
+
+    @pytest.fixture
+    def manager(self, tmp_path):
+        """Create a TodoManager in a temporary directory."""
+        return TodoManager(data_dir=str(tmp_path))
+
+    @pytest.fixture
+    def runner(self, manager):
+        """Create a runner acting as alice."""
+        return cli.CommandRunner(manager, "alice", io.BytesIO())
+
+    @staticmethod
+    def results(runner) -> list[dict]:
+        """Return the JSON lines written so far and reset the output."""
+        lines = runner.out.getvalue().splitlines()
+        runner.out.seek(0)
+        runner.out.truncate()
+        return [json.loads(line) for line in lines]
+
+    def test_add_list_complete_edit(self, runner, manager):
+        """Test the commands that manage a single todo."""
+        runner.run(["add", "--title", "Buy milk", "--priority", "high"])
+        [added] = self.results(runner)
+        assert added == {"op": "add", "id": added["id"], "ok": True}
+        todo_id = added["id"]
+
+        runner.run(["complete", todo_id])
+        runner.run(["edit", todo_id, "--title", "Buy oat milk", "--details", "2l"])
+        assert self.results(runner) == [
+            {"op": "complete", "id": todo_id, "ok": True},
+            {"op": "edit", "id": todo_id, "ok": True},
+        ]
+
+        runner.run(["list", "--status", "completed"])
+        todo, summary = self.results(runner)
+        assert todo["title"] == "Buy oat milk"
+        assert todo["details"] == "2l"
+        assert todo["priority"] == "HIGH"
+        assert todo["status"] == "COMPLETED"
+        assert summary == {"op": "list", "count": 1, "ok": True}
+        assert runner.failures == 0
+
+    def test_list_honours_limit(self, runner, manager):
+        """Test that list stops after --limit todos and only shows the user's."""
+        manager.add_todos(TodoItem(title=f"Todo {i}", owner="alice") for i in range(3))
+        manager.add_todo(TodoItem(title="Not mine", owner="bob"))
+
+        runner.run(["list", "--limit", "2"])
+        *todos, summary = self.results(runner)
+        assert [t["title"] for t in todos] == ["Todo 0", "Todo 1"]
+        assert summary["count"] == 2
+
+        runner.run(["list", "--limit", "0"])
+        assert self.results(runner) == [{"op": "list", "count": 0, "ok": True}]
+
+    def test_other_users_todos_are_not_found(self, runner, manager):
+        """Test that complete and edit only reach the user's own todos."""
+        todo = TodoItem(title="Not mine", owner="bob")
+        manager.add_todo(todo)
+
+        runner.run(["complete", todo.id])
+        runner.run(["edit", todo.id, "--title", "Mine now"])
+
+        error = f"No todo with id {todo.id!r}"
+        assert self.results(runner) == [
+            {"op": "complete", "ok": False, "error": error},
+            {"op": "edit", "ok": False, "error": error},
+        ]
+        assert runner.failures == 2
+        assert manager.get_todo_by_id(todo.id).status == Status.PENDING
+
+    @pytest.mark.parametrize(
+        "argv, error",
+        [
+            (["list", "--limit", "-1"], "argument --limit: must be at least 0: -1"),
+            (["list", "--limit", "x"], "argument --limit: invalid int value: 'x'"),
+            (["import", "--chunk-size", "0"], "must be at least 1: 0"),
+            (["import", "--chunk-size", "-1"], "must be at least 1: -1"),
+            (["add"], "the following arguments are required: --title"),
+            (["frobnicate"], "invalid choice: 'frobnicate'"),
+            (["import", "missing.jsonl"], "No such file or directory"),
+        ],
+    )
+    def test_bad_commands_are_reported(self, runner, argv, error):
+        """Test that invalid commands become error lines, not tracebacks."""
+        runner.run(argv)
+        [result] = self.results(runner)
+        assert result["ok"] is False
+        assert error in result["error"]
+        assert runner.failures == 1
+
+    def test_value_errors_from_commands_are_reported(self, runner, monkeypatch):
+        """Test that a ValueError raised while running a command is reported."""
+
+        def fail(*args, **kwargs):
+            raise ValueError("bad value")
+
+        monkeypatch.setattr(runner.todo_manager, "query", fail)
+        runner.run(["list"])
+        assert self.results(runner) == [
+            {"op": "list", "ok": False, "error": "bad value"}
+        ]
+
+    def test_import_and_export(self, runner, manager, tmp_path):
+        """Test that invalid records are reported by line and export follows."""
+        path = tmp_path / "todos.jsonl"
+        path.write_text(
+            '{"title": "First"}\n'
+            "not json\n"
+            '{"title": "Second", "priority": "LOW", "owner": "bob"}\n'
+        )
+
+        runner.run(["import", str(path), "--chunk-size", "1"])
+        error, summary = self.results(runner)
+        assert error["line"] == 2 and error["ok"] is False
+        assert summary == {"op": "import", "count": 2, "ok": True}
+        assert [t.owner for t in manager.get_all_todos()] == ["alice", "alice"]
+
+        runner.run(["add", "--title", "Third"])
+        runner.run(["export"])
+        added, *todos, summary = self.results(runner)
+        assert added["op"] == "add"
+        assert [t["title"] for t in todos] == ["First", "Second", "Third"]
+        assert summary == {"op": "export", "count": 3, "ok": True}
+
+        csv_path = tmp_path / "todos.csv"
+        runner.run(["export", str(csv_path)])
+        assert csv_path.read_text().splitlines()[0].startswith("id,")
+
+    def test_script_reports_each_line(self, runner, manager, tmp_path):
+        """Test that a bad line fails on its own without losing the others."""
+        script = tmp_path / "commands.txt"
+        script.write_text(
+            "# comment\n"
+            'add --title "Buy milk"\n'
+            "\n"
+            'add --title "Unbalanced\n'
+            "script other.txt\n"
+            "list --limit -1\n"
+            "add --title Bread\n"
+        )
+
+        runner.run(["script", str(script)])
+
+        results = self.results(runner)
+        assert [(r["line"], r["ok"]) for r in results[:-1]] == [
+            (2, True),
+            (4, False),
+            (5, False),
+            (6, False),
+            (7, True),
+        ]
+        assert results[1]["error"] == "No closing quotation"
+        assert results[2]["error"] == "Scripts cannot nest"
+        assert results[-1] == {"op": "script", "count": 5, "ok": True}
+        assert runner.failures == 3
+        assert [t.title for t in manager.get_all_todos()] == ["Buy milk", "Bread"]
+
+
+class TestMain:
+    """Test suite for cli.main authentication and exit status."""
+
+    @pytest.fixture
+    def data_dir(self, tmp_path, monkeypatch):
+        """Create a data directory with the user alice and a clean environment."""
+        monkeypatch.delenv(cli.TOKEN_ENV, raising=False)
+        monkeypatch.delenv(cli.PASSWORD_ENV, raising=False)
+        AuthManager(data_dir=str(tmp_path)).sign_up("alice", "secret")
+        return str(tmp_path)
+
+    @staticmethod
+    def main(data_dir, *command) -> int:
+        return cli.main(["--user", "alice", "--data-dir", data_dir, *command])
+
+    def test_password_and_token(self, data_dir, monkeypatch, capsysbinary):
+        """Test logging in with the password and with an issued token."""
+        monkeypatch.setenv(cli.PASSWORD_ENV, "secret")
+        assert self.main(data_dir, "add", "--title", "Milk") == 0
+        assert json.loads(capsysbinary.readouterr().out)["ok"] is True
+
+        assert self.main(data_dir, "token") == 0
+        token = capsysbinary.readouterr().out.decode().strip()
+        monkeypatch.setenv(cli.PASSWORD_ENV, "wrong")
+        monkeypatch.setenv(cli.TOKEN_ENV, token)
+        assert self.main(data_dir, "list") == 0
+        todo, summary = capsysbinary.readouterr().out.splitlines()
+        assert json.loads(todo)["title"] == "Milk"
+        assert json.loads(summary) == {"op": "list", "count": 1, "ok": True}
+
+    def test_bad_credentials(self, data_dir, monkeypatch, capsysbinary):
+        """Test that a wrong password or token fails with exit status 1."""
+        monkeypatch.setenv(cli.PASSWORD_ENV, "wrong")
+        assert self.main(data_dir, "token") == 1
+        assert self.main(data_dir, "list") == 1
+        assert json.loads(capsysbinary.readouterr().out)["ok"] is False
+
+        monkeypatch.setenv(cli.TOKEN_ENV, "not-a-token")
+        assert self.main(data_dir, "list") == 1
+        result = json.loads(capsysbinary.readouterr().out)
+        assert result == {"ok": False, "error": "Invalid or expired token."}
+
+    def test_failed_command_sets_exit_status(self, data_dir, monkeypatch):
+        """Test that a failing command exits with 1."""
+        monkeypatch.setenv(cli.PASSWORD_ENV, "secret")
+        assert self.main(data_dir, "list", "--limit", "-1") == 1
+
+    def test_missing_credentials_or_command(self, data_dir):
+        """Test that usage errors exit through argparse."""
+        with pytest.raises(SystemExit):
+            self.main(data_dir, "list")
+        with pytest.raises(SystemExit):
+            self.main(data_dir)
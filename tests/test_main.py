@@ -0,0 +1,192 @@
+"""
+Unit tests for the interactive App's paginated views.
+"""
+
+import os
+import sys
+
+import pytest
+
+# main.py imports its siblings as top-level modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from main import App
+from models import Status, TodoItem, TodoManager
+
+
+class TestApp:
+    """Test suite for the App's todo browsing."""
+
+    @pytest.fixture
+    def app(self, tmp_path, monkeypatch):
+        """Create an App logged in as user1 with 25 todos in a temp directory."""
+        monkeypatch.chdir(tmp_path)
+        app = App()
+        app.current_user = "user1"
+        app.todo_manager.add_todos(
+            TodoItem(title=f"Todo {i}", owner="user1") for i in range(1, 26)
+        )
+        app.todo_manager.add_todo(TodoItem(title="Not mine", owner="user2"))
+        return app
+
+    @pytest.fixture
+    def answers(self, monkeypatch):
+        """Feed input() from a list of answers."""
+        queue = []
+        monkeypatch.setattr("builtins.input", lambda prompt="": queue.pop(0))
+        return queue
+
+    def test_browse_moves_between_pages(self, app, answers, capsys):
+        """Test n/p, "g N" and the messages for moves that aren't possible."""
+        answers.extend(["p", "n", "n", "n", "g 1", "g 4", "gx", "x", ""])
+
+        assert app._browse("Your Todos", {}, app._count()) is None
+
+        out = capsys.readouterr().out
+        pages = [line for line in out.splitlines() if line.startswith("Page ")]
+        assert pages == [
+            "Page 1/3 (25 todos)",
+            "Page 1/3 (25 todos)",
+            "Page 2/3 (25 todos)",
+            "Page 3/3 (25 todos)",
+            "Page 3/3 (25 todos)",
+            "Page 1/3 (25 todos)",
+            "Page 1/3 (25 todos)",
+            "Page 1/3 (25 todos)",
+            "Page 1/3 (25 todos)",
+        ]
+        assert out.count("No more pages in that direction.") == 2
+        assert "Invalid page." in out
+        assert "Invalid input." in out
+        assert "Invalid option." in out
+        assert "[21] Todo 21" in out and "[25] Todo 25" in out
+        assert "Not mine" not in out
+
+    def test_browse_single_page_read_only_returns_at_once(self, app, answers):
+        """Test that a read-only view that fits one page asks for nothing."""
+        app.PAGE_SIZE = 30
+        assert app._browse("Your Todos", {}, app._count()) is None
+        assert answers == []
+
+    @pytest.mark.parametrize(
+        "choices, title",
+        [
+            (["3"], "Todo 3"),
+            (["n", "14"], "Todo 14"),
+            (["g 3", "12"], "Todo 12"),  # shown on another page
+            (["25"], "Todo 25"),
+        ],
+    )
+    def test_browse_chooses_todo_on_any_page(self, app, answers, choices, title):
+        """Test that a todo can be chosen by number from any page."""
+        answers.extend(choices)
+        todo = app._browse("Your Todos", {}, app._count(), prompt="Choose")
+        assert todo.title == title
+        assert answers == []
+
+    @pytest.mark.parametrize("choice", ["0", "26", "abc"])
+    def test_browse_rejects_out_of_range_choice(self, app, answers, capsys, choice):
+        """Test that invalid numbers choose nothing."""
+        answers.append(choice)
+        assert app._browse("Your Todos", {}, app._count(), prompt="Choose") is None
+        out = capsys.readouterr().out
+        assert ("Invalid input." if choice == "abc" else "Invalid choice.") in out
+
+    def test_pages_are_cached_until_the_data_changes(self, app, answers, monkeypatch):
+        """Test that pages are queried once and re-read after any write."""
+        queries = []
+        original_query = app.todo_manager.query
+
+        def counting_query(**kwargs):
+            queries.append(kwargs.get("offset"))
+            return original_query(**kwargs)
+
+        monkeypatch.setattr(app.todo_manager, "query", counting_query)
+        answers.extend(["n", "p", "n", ""])
+        app._browse("Your Todos", {}, 25)
+        assert queries == [0, 10]
+
+        # A write from another process moves the data version
+        TodoManager(data_dir=".").add_todo(TodoItem(title="Elsewhere", owner="user1"))
+        answers.append("")
+        app._browse("Your Todos", {}, 26)
+        assert queries == [0, 10, 0]
+
+    def test_mark_as_completed_pages_through_pending_only(self, app, answers, capsys):
+        """Test that only pending todos are listed and the choice is completed."""
+        todos = app.todo_manager.get_user_todos("user1")
+        app.todo_manager.mark_many_completed([todos[0].id, todos[1].id])
+        answers.extend(["n", "12"])
+
+        app.handle_mark_as_completed()
+
+        out = capsys.readouterr().out
+        assert "Page 1/3 (23 todos)" in out
+        assert "[1] Todo 3 - Priority" in out
+        assert "Todo 'Todo 14' marked as completed!" in out
+        completed = app.todo_manager.query(owner="user1", status=Status.COMPLETED)
+        assert [t.title for t in completed] == ["Todo 1", "Todo 2", "Todo 14"]
+
+    def test_edit_reads_the_todos_once(self, app, answers, monkeypatch):
+        """Test that an edit parses the todo file once, to fill the cache."""
+        app = App()  # nothing read yet
+        app.current_user = "user1"
+        storage = app.todo_manager.storage
+        reads = []
+        original_read = storage._read
+
+        def counting_read():
+            reads.append(1)
+            return original_read()
+
+        monkeypatch.setattr(storage, "_read", counting_read)
+        monkeypatch.setattr(storage, "_stream_records", lambda *a: pytest.fail())
+        answers.extend(["3", "Edited", "", "", ""])
+
+        app.handle_edit_todo()
+        assert app._page({}, 0)[2].title == "Edited"
+        assert len(reads) == 1
+        assert TodoManager(data_dir=".").get_user_todos("user1")[2].title == "Edited"
+
+    def test_app_writes_update_cached_pages(self, app, answers, monkeypatch):
+        """Test that the app's own writes keep the cache instead of dropping it."""
+        queries = []
+        original_query = app.todo_manager.query
+
+        def counting_query(**kwargs):
+            queries.append(kwargs)
+            return original_query(**kwargs)
+
+        monkeypatch.setattr(app.todo_manager, "query", counting_query)
+        assert app._count() == 25
+        assert app._count(status=Status.PENDING) == 25
+        app._page({}, 0)
+        app._page({"status": Status.PENDING}, 0)
+        assert len(queries) == 4
+
+        answers.extend(["3", "Edited", "", "", ""])
+        app.handle_edit_todo()
+        assert len(queries) == 4
+        assert app._page({}, 0)[2].title == "Edited"
+        assert app._page({"status": Status.PENDING}, 0)[2].title == "Edited"
+
+        answers.append("1")
+        app.handle_mark_as_completed()
+        assert app._count() == 25
+        assert app._count(status=Status.PENDING) == 24
+        assert app._page({}, 0)[0].status == Status.COMPLETED
+        assert len(queries) == 4
+        # Todos after it moved up a place, so that view is queried again
+        assert app._page({"status": Status.PENDING}, 0)[0].title == "Todo 2"
+        assert len(queries) == 5
+
+        answers.extend(["Added", "", "low"])
+        app.handle_add_todo()
+        assert app._count() == 26
+        assert app._count(status=Status.PENDING) == 25
+        assert len(queries) == 5
+
+        # A write from elsewhere still drops the cache
+        TodoManager(data_dir=".").add_todo(TodoItem(title="Elsewhere", owner="user1"))
+        assert app._count() == 27
+        assert len(queries) == 6
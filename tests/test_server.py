@@ -0,0 +1,225 @@
+"""
+Unit tests for the HTTP/JSON API server.
+"""
+
+import asyncio
+import base64
+import json
+import os
+import sys
+
+import pytest
+
+# server.py imports its siblings as top-level modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from server import TodoServer
+
+
+class TestTodoServer:
+    """Test suite for the TodoServer endpoints."""
+
+    @pytest.fixture
+    def serve(self, tmp_path):
+        """Return a function running a scenario against a fresh server.
+
+        The scenario is an async function taking ``call(method, path,
+        body=None, auth=None)``, which sends one request and returns the
+        status code and decoded JSON payload. ``setup`` is called with the
+        server before it starts.
+        """
+
+        def serve(scenario, setup=None):
+            async def run():
+                server = TodoServer(data_dir=str(tmp_path))
+                if setup is not None:
+                    setup(server)
+                listener = await server.start(port=0)
+                port = listener.sockets[0].getsockname()[1]
+
+                async def call(method, path, body=None, auth=None):
+                    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+                    data = b"" if body is None else json.dumps(body).encode()
+                    head = f"{method} {path} HTTP/1.1\r\nConnection: close\r\n"
+                    if auth is not None:
+                        head += f"Authorization: {auth}\r\n"
+                    head += f"Content-Length: {len(data)}\r\n\r\n"
+                    writer.write(head.encode() + data)
+                    response = await reader.read()
+                    writer.close()
+                    status_line, _, rest = response.partition(b"\r\n")
+                    payload = rest.partition(b"\r\n\r\n")[2]
+                    status = int(status_line.split()[1])
+                    return status, json.loads(payload) if payload else None
+
+                try:
+                    async with listener:
+                        return await scenario(call)
+                finally:
+                    await server.close()
+
+            return asyncio.run(run())
+
+        return serve
+
+    @staticmethod
+    async def login(call, username="alice", password="secret") -> str:
+        """Sign up and log in, returning the Authorization header value."""
+        credentials = {"username": username, "password": password}
+        await call("POST", "/users", credentials)
+        status, payload = await call("POST", "/login", credentials)
+        assert status == 200
+        return f"Bearer {payload['token']}"
+
+    def test_sign_up_login_and_logout(self, serve):
+        """Test the account endpoints and that todos need credentials."""
+
+        async def scenario(call):
+            credentials = {"username": "alice", "password": "secret"}
+            assert (await call("POST", "/users", credentials))[0] == 201
+            assert (await call("POST", "/users", credentials))[0] == 409
+            wrong = {"username": "alice", "password": "wrong"}
+            assert (await call("POST", "/login", wrong))[0] == 401
+
+            status, payload = await call("POST", "/login", credentials)
+            assert status == 200 and payload["expires_in"] > 0
+            auth = f"Bearer {payload['token']}"
+            assert (await call("GET", "/todos"))[0] == 401
+            assert (await call("GET", "/todos", auth="Bearer nope"))[0] == 401
+            assert await call("GET", "/todos", auth=auth) == (200, [])
+
+            basic = base64.b64encode(b"alice:secret").decode()
+            assert (await call("GET", "/todos", auth=f"Basic {basic}"))[0] == 200
+            bad = base64.b64encode(b"alice:wrong").decode()
+            assert (await call("GET", "/todos", auth=f"Basic {bad}"))[0] == 401
+
+            assert await call("POST", "/logout", auth=auth) == (204, None)
+            assert (await call("GET", "/todos", auth=auth))[0] == 401
+            assert (await call("POST", "/logout", auth=auth))[0] == 401
+
+        serve(scenario)
+
+    def test_todo_lifecycle(self, serve):
+        """Test creating, reading, updating, completing and deleting a todo."""
+
+        async def scenario(call):
+            auth = await self.login(call)
+            new = {"title": "Buy milk", "details": "2l", "priority": "HIGH"}
+            status, todo = await call("POST", "/todos", new, auth)
+            assert status == 201
+            assert (todo["title"], todo["owner"], todo["status"]) == (
+                "Buy milk",
+                "alice",
+                "PENDING",
+            )
+            path = f"/todos/{todo['id']}"
+            assert await call("GET", path, auth=auth) == (200, todo)
+
+            status, edited = await call("PATCH", path, {"title": "Buy oat milk"}, auth)
+            assert status == 200
+            assert (edited["title"], edited["details"]) == ("Buy oat milk", "2l")
+
+            status, completed = await call("POST", f"{path}/complete", auth=auth)
+            assert status == 200 and completed["status"] == "COMPLETED"
+            assert await call("GET", "/todos", auth=auth) == (200, [completed])
+
+            assert await call("DELETE", path, auth=auth) == (204, None)
+            assert (await call("GET", path, auth=auth))[0] == 404
+            assert (await call("DELETE", path, auth=auth))[0] == 404
+
+        serve(scenario)
+
+    def test_list_filters_and_pages(self, serve):
+        """Test status, limit and offset on the user's own todos."""
+
+        async def scenario(call):
+            auth = await self.login(call)
+            other = await self.login(call, "bob")
+            await call("POST", "/todos", {"title": "Not mine"}, other)
+            ids = []
+            for i in range(5):
+                _, todo = await call("POST", "/todos", {"title": f"Todo {i}"}, auth)
+                ids.append(todo["id"])
+            await call("POST", f"/todos/{ids[1]}/complete", auth=auth)
+
+            _, todos = await call("GET", "/todos?limit=2&offset=1", auth=auth)
+            assert [t["title"] for t in todos] == ["Todo 1", "Todo 2"]
+            _, todos = await call("GET", "/todos?status=COMPLETED", auth=auth)
+            assert [t["id"] for t in todos] == [ids[1]]
+            _, todos = await call("GET", "/todos?limit=0", auth=auth)
+            assert todos == []
+
+        serve(scenario)
+
+    def test_other_users_todos_are_not_found(self, serve):
+        """Test that a todo can only be reached by its owner."""
+
+        async def scenario(call):
+            auth = await self.login(call)
+            other = await self.login(call, "bob")
+            _, todo = await call("POST", "/todos", {"title": "Mine"}, auth)
+            path = f"/todos/{todo['id']}"
+
+            assert (await call("GET", path, auth=other))[0] == 404
+            assert (await call("PATCH", path, {"title": "Stolen"}, other))[0] == 404
+            assert (await call("POST", f"{path}/complete", auth=other))[0] == 404
+            assert (await call("DELETE", path, auth=other))[0] == 404
+            assert await call("GET", path, auth=auth) == (200, todo)
+
+        serve(scenario)
+
+    @pytest.mark.parametrize(
+        "method, path, body",
+        [
+            ("GET", "/todos?limit=-1", None),
+            ("GET", "/todos?offset=-5", None),
+            ("GET", "/todos?limit=ten", None),
+            ("GET", "/todos?offset=1.5", None),
+            ("GET", "/todos?status=DONE", None),
+            ("POST", "/todos", {"details": "No title"}),
+            ("POST", "/todos", {"title": "Bad", "priority": "URGENT"}),
+            ("POST", "/todos", ["not", "an", "object"]),
+            ("POST", "/users", {"username": "", "password": "x"}),
+        ],
+    )
+    def test_bad_input_is_rejected(self, serve, method, path, body):
+        """Test that invalid parameters and bodies get 400, not 500."""
+
+        async def scenario(call):
+            auth = await self.login(call)
+            status, payload = await call(method, path, body, auth)
+            assert status == 400
+            assert payload["error"]
+
+        serve(scenario)
+
+    def test_unknown_routes(self, serve):
+        """Test 404 for unknown paths and 405 for unsupported methods."""
+
+        async def scenario(call):
+            auth = await self.login(call)
+            assert (await call("GET", "/nowhere", auth=auth))[0] == 404
+            assert (await call("PUT", "/todos", auth=auth))[0] == 405
+
+        serve(scenario)
+
+    def test_storage_errors_are_server_errors(self, serve):
+        """Test that storage failures on reads and writes become 500s."""
+
+        def fail(*args, **kwargs):
+            raise OSError("disk on fire")
+
+        def setup(server):
+            server.todo_manager.query = fail
+            server.todo_manager.add_todo = fail
+
+        async def scenario(call):
+            auth = await self.login(call)
+            assert await call("GET", "/todos", auth=auth) == (
+                500,
+                {"error": "disk on fire"},
+            )
+            status, _ = await call("POST", "/todos", {"title": "Lost"}, auth)
+            assert status == 500
+
+        serve(scenario, setup)
@@ -3,10 +3,57 @@ Unit tests for the TodoManager todo management module.
 """
 
 import pytest
+import asyncio
+import dataclasses
+import io
 import json
+from datetime import datetime
+import multiprocessing
 import os
+import sqlite3
 import tempfile
-from src.models import TodoManager, TodoItem, Priority, Status
+import time
+from src.models import (
+    AsyncTodoManager,
+    JournalTodoStorage,
+    JsonTodoStorage,
+    ShardedTodoStorage,
+    SqliteTodoStorage,
+    migrate_storage,
+    TodoManager,
+    TodoItem,
+    Priority,
+    Status,
+    UpdateResult,
+    fcntl,
+    JSON_CODECS,
+    _decode_todo,
+    _encode_todo,
+    _iter_json_array,
+)
+
+
+def _concurrent_worker(data_dir, backend, counter_id, worker_id, ops):
+    """Add todos and CAS-increment a shared counter from a separate process."""
+    manager = TodoManager(data_dir=data_dir, storage=backend, cache=True)
+    for i in range(ops):
+        manager.add_todo(TodoItem(title=f"w{worker_id}-{i}", owner=f"user{worker_id}"))
+        while True:
+            counter = manager.get_todo_by_id(counter_id)
+            counter.title = str(int(counter.title) + 1)
+            result = manager.compare_and_update(counter_id, counter, counter.updated_at)
+            if result is UpdateResult.UPDATED:
+                break
+
+
+def _cross_shard_batch_worker(data_dir, first, second):
+    """Add a todo for ``first`` and then ``second`` inside one batch."""
+    manager = TodoManager(data_dir=data_dir, storage="sharded")
+    with manager.batch():
+        manager.add_todo(TodoItem(title=f"{first} first", owner=first))
+        # Long enough for the other worker to lock its first shard too
+        time.sleep(0.3)
+        manager.add_todo(TodoItem(title=f"{first} second", owner=second))
 
 
 class TestTodoManager:
@@ -18,10 +65,10 @@ class TestTodoManager:
         with tempfile.TemporaryDirectory() as tmp_dir:
             yield tmp_dir
 
-    @pytest.fixture
-    def todo_manager(self, temp_dir):
-        """Create a TodoManager instance with a temporary directory."""
-        return TodoManager(data_dir=temp_dir)
+    @pytest.fixture(params=["json", "journal", "sqlite"])
+    def todo_manager(self, request, temp_dir):
+        """Create a TodoManager instance for each storage backend."""
+        return TodoManager(data_dir=temp_dir, storage=request.param)
 
     # Initialization Tests
 
@@ -496,3 +543,1312 @@ class TestTodoManager:
         retrieved_todo = manager2.get_todo_by_id(todo_id)
         assert retrieved_todo is not None
         assert retrieved_todo.status == Status.COMPLETED
+
+    # Cached Mode Tests
+
+    def test_cached_mode_reads_file_once(self, temp_dir, monkeypatch):
+        """Test that cached mode does not re-parse an unchanged file."""
+        manager = TodoManager(data_dir=temp_dir, cache=True)
+        manager.add_todo(TodoItem(title="Cached", owner="user1"))
+
+        calls = []
+        original_read = manager.storage._read
+        monkeypatch.setattr(
+            manager.storage, "_read", lambda: calls.append(1) or original_read()
+        )
+
+        manager.get_all_todos()
+        manager.get_user_todos("user1")
+        manager.get_todo_by_id("nonexistent_id")
+        assert calls == []
+
+    def test_cached_mode_write_through(self, temp_dir):
+        """Test that cached mutations are persisted immediately."""
+        manager = TodoManager(data_dir=temp_dir, cache=True)
+        todo = TodoItem(title="Write Through", owner="user1")
+        manager.add_todo(todo)
+        manager.mark_as_completed(todo.id)
+
+        with open(os.path.join(temp_dir, "todos.json"), "r") as f:
+            stored = json.load(f)
+        assert len(stored) == 1
+        assert stored[0]["status"] == "COMPLETED"
+
+    def test_cached_mode_reloads_after_external_write(self, temp_dir):
+        """Test that a write by another instance invalidates the cache."""
+        cached = TodoManager(data_dir=temp_dir, cache=True)
+        cached.add_todo(TodoItem(title="First", owner="user1"))
+        assert len(cached.get_user_todos("user1")) == 1
+
+        other = TodoManager(data_dir=temp_dir)
+        other.add_todo(TodoItem(title="Second", owner="user1"))
+
+        titles = [todo.title for todo in cached.get_user_todos("user1")]
+        assert titles == ["First", "Second"]
+
+    # Journal Storage Tests
+
+    def test_unknown_storage_backend(self, temp_dir):
+        """Test that an unknown backend name is rejected."""
+        with pytest.raises(ValueError):
+            TodoManager(data_dir=temp_dir, storage="nope")
+
+    def test_journal_appends_instead_of_rewriting(self, temp_dir):
+        """Test that journal mutations leave the snapshot untouched."""
+        manager = TodoManager(data_dir=temp_dir, storage="journal")
+        todo = TodoItem(title="Journaled", owner="user1")
+        manager.add_todo(todo)
+        manager.mark_as_completed(todo.id)
+        manager.delete_todo("nonexistent_id")
+
+        with open(os.path.join(temp_dir, "todos.json"), "r") as f:
+            assert json.load(f) == []
+        with open(os.path.join(temp_dir, "todos.journal"), "r") as f:
+            ops = [json.loads(line)["op"] for line in f]
+        assert ops == ["add", "update"]
+
+    def test_journal_replay_across_instances(self, temp_dir):
+        """Test that a new instance replays the journal over the snapshot."""
+        manager1 = TodoManager(data_dir=temp_dir, storage="journal")
+        todo1 = TodoItem(title="Keep", owner="user1")
+        todo2 = TodoItem(title="Drop", owner="user1")
+        manager1.add_todo(todo1)
+        manager1.add_todo(todo2)
+        manager1.mark_as_completed(todo1.id)
+        manager1.delete_todo(todo2.id)
+
+        manager2 = TodoManager(data_dir=temp_dir, storage="journal")
+        todos = manager2.get_user_todos("user1")
+        assert len(todos) == 1
+        assert todos[0].title == "Keep"
+        assert todos[0].status == Status.COMPLETED
+
+    def test_journal_ignores_torn_final_line(self, temp_dir):
+        """Test that a partially written journal line is skipped on replay."""
+        manager = TodoManager(data_dir=temp_dir, storage="journal")
+        manager.add_todo(TodoItem(title="Complete", owner="user1"))
+        with open(os.path.join(temp_dir, "todos.journal"), "a") as f:
+            f.write('{"op": "add", "todo": {"id"')
+
+        reopened = TodoManager(data_dir=temp_dir, storage="journal")
+        assert [todo.title for todo in reopened.get_all_todos()] == ["Complete"]
+
+    def test_journal_compacts_past_ratio(self, temp_dir):
+        """Test that crossing the size ratio folds the journal into the snapshot."""
+        storage = JournalTodoStorage(temp_dir, cache=True, min_compact_bytes=0)
+        manager = TodoManager(data_dir=temp_dir, storage=storage)
+        todo = TodoItem(title="Compacted", owner="user1")
+        manager.add_todo(todo)
+
+        assert os.path.getsize(os.path.join(temp_dir, "todos.journal")) == 0
+        with open(os.path.join(temp_dir, "todos.json"), "r") as f:
+            assert [record["id"] for record in json.load(f)] == [todo.id]
+        assert manager.get_todo_by_id(todo.id).title == "Compacted"
+
+    def test_journal_replay_is_idempotent_after_compaction(self, temp_dir):
+        """Test that replaying an untrimmed journal over a new snapshot is safe."""
+        storage = JournalTodoStorage(temp_dir)
+        manager = TodoManager(data_dir=temp_dir, storage=storage)
+        todo = TodoItem(title="Once", owner="user1")
+        manager.add_todo(todo)
+        with open(os.path.join(temp_dir, "todos.journal"), "r") as f:
+            journal = f.read()
+
+        # Simulate a crash between writing the snapshot and trimming the journal
+        storage.compact()
+        with open(os.path.join(temp_dir, "todos.journal"), "w") as f:
+            f.write(journal)
+
+        todos = TodoManager(data_dir=temp_dir, storage="journal").get_all_todos()
+        assert [t.id for t in todos] == [todo.id]
+
+    def test_journal_background_compaction(self, temp_dir):
+        """Test that background compaction keeps all mutations."""
+        storage = JournalTodoStorage(
+            temp_dir, cache=True, min_compact_bytes=0, background_compaction=True
+        )
+        manager = TodoManager(data_dir=temp_dir, storage=storage)
+        for i in range(20):
+            manager.add_todo(TodoItem(title=f"Todo {i}", owner="user1"))
+        storage.wait_for_compaction()
+
+        reopened = TodoManager(data_dir=temp_dir, storage="journal")
+        assert len(reopened.get_user_todos("user1")) == 20
+
+    # SQLite Storage Tests
+
+    def test_sqlite_lookups_use_indexes(self, temp_dir):
+        """Test that id and owner lookups are index searches, not scans."""
+        storage = SqliteTodoStorage(temp_dir)
+        conn = sqlite3.connect(storage.db_path)
+        plans = {
+            "id": "SELECT * FROM todos WHERE id = 'x'",
+            "owner": "SELECT * FROM todos WHERE owner = 'x' ORDER BY rowid",
+            "status": "SELECT * FROM todos WHERE owner = 'x' AND status = 'PENDING'",
+            "priority": "SELECT * FROM todos WHERE owner = 'x' AND priority = 'HIGH'",
+        }
+        for query in plans.values():
+            plan = conn.execute(f"EXPLAIN QUERY PLAN {query}").fetchall()
+            detail = " ".join(str(row[-1]) for row in plan)
+            assert "USING" in detail and "INDEX" in detail
+        conn.close()
+
+    def test_sqlite_persistence(self, temp_dir):
+        """Test that SQLite-backed todos persist across instances."""
+        manager1 = TodoManager(data_dir=temp_dir, storage="sqlite")
+        todo = TodoItem(title="Stored", owner="user1")
+        manager1.add_todo(todo)
+        manager1.mark_as_completed(todo.id)
+
+        manager2 = TodoManager(data_dir=temp_dir, storage="sqlite")
+        retrieved = manager2.get_todo_by_id(todo.id)
+        assert retrieved.title == "Stored"
+        assert retrieved.status == Status.COMPLETED
+
+    def test_migrate_json_to_sqlite(self, temp_dir):
+        """Test that migration copies todos.json into the SQLite backend."""
+        json_manager = TodoManager(data_dir=temp_dir)
+        todos = [TodoItem(title=f"Todo {i}", owner=f"user{i % 2}") for i in range(5)]
+        for todo in todos:
+            json_manager.add_todo(todo)
+
+        copied, _ = migrate_storage(temp_dir, "sqlite")
+        assert copied == 5
+
+        sqlite_manager = TodoManager(data_dir=temp_dir, storage="sqlite")
+        assert [t.id for t in sqlite_manager.get_all_todos()] == [t.id for t in todos]
+        assert len(sqlite_manager.get_user_todos("user0")) == 3
+
+    # Index Tests
+
+    @pytest.mark.parametrize("backend", [JsonTodoStorage, JournalTodoStorage])
+    def test_indexes_stay_in_sync(self, temp_dir, backend):
+        """Test that the id and owner maps match the list after every mutation."""
+        storage = backend(temp_dir, cache=True)
+        manager = TodoManager(data_dir=temp_dir, storage=storage)
+        todos = [TodoItem(title=f"Todo {i}", owner=f"user{i % 3}") for i in range(9)]
+        for todo in todos:
+            manager.add_todo(todo)
+        manager.get_user_todos("user0")  # build the owner map
+
+        manager.delete_todo(todos[3].id)
+        moved = TodoItem(
+            id=todos[1].id, title="Moved", owner="user0", created_at=todos[1].created_at
+        )
+        manager.update_todo(todos[1].id, moved)
+        manager.mark_as_completed(todos[4].id)
+        manager.add_todo(TodoItem(title="Late", owner="user0"))
+
+        index = storage._cached_index
+        live = [todo for todo in index.todos if todo is not None]
+        assert len(index.positions) == len(live)
+        for todo_id, i in index.positions.items():
+            assert index.todos[i]["id"] == todo_id
+        for owner in ("user0", "user1", "user2"):
+            expected = [todo for todo in live if todo["owner"] == owner]
+            assert storage.by_owner(owner) == expected
+
+        titles = [todo.title for todo in manager.get_user_todos("user0")]
+        assert titles == ["Todo 0", "Moved", "Todo 6", "Late"]
+        assert manager.get_todo_by_id(todos[3].id) is None
+
+    def test_journal_replays_update_that_changes_id(self, temp_dir):
+        """Test that an update which renames a todo's id survives replay."""
+        manager = TodoManager(data_dir=temp_dir, storage="journal")
+        todo = TodoItem(title="Renamed", owner="user1")
+        manager.add_todo(todo)
+        renamed = TodoItem(id="new-id", title="Renamed", owner="user1")
+        assert manager.update_todo(todo.id, renamed) is True
+
+        reopened = TodoManager(data_dir=temp_dir, storage="journal")
+        assert [t.id for t in reopened.get_all_todos()] == ["new-id"]
+
+    # Sharded Storage Tests
+
+    def _shard_path(self, temp_dir, owner):
+        name = ShardedTodoStorage.shard_name(owner)
+        return os.path.join(temp_dir, "todos", f"{name}.json")
+
+    def test_sharded_writes_only_touch_owner_shard(self, temp_dir):
+        """Test that one user's edits leave other users' shards untouched."""
+        manager = TodoManager(data_dir=temp_dir, storage="sharded")
+        mine = TodoItem(title="Mine", owner="user1")
+        manager.add_todo(mine)
+        manager.add_todo(TodoItem(title="Theirs", owner="user2"))
+        other_shard = self._shard_path(temp_dir, "user2")
+        before = os.stat(other_shard).st_mtime_ns
+
+        manager.add_todo(TodoItem(title="Mine too", owner="user1"))
+        manager.mark_as_completed(mine.id, owner="user1")
+
+        assert os.stat(other_shard).st_mtime_ns == before
+        with open(self._shard_path(temp_dir, "user1"), "r") as f:
+            assert [todo["title"] for todo in json.load(f)] == ["Mine", "Mine too"]
+
+    def test_sharded_lookups_without_owner_hint(self, temp_dir):
+        """Test that id-only lookups find todos in any shard."""
+        manager1 = TodoManager(data_dir=temp_dir, storage="sharded")
+        todos = [TodoItem(title=f"Todo {i}", owner=f"user{i}") for i in range(3)]
+        for todo in todos:
+            manager1.add_todo(todo)
+
+        manager2 = TodoManager(data_dir=temp_dir, storage="sharded")
+        assert manager2.get_todo_by_id(todos[2].id).title == "Todo 2"
+        assert manager2.mark_as_completed(todos[1].id) is True
+        manager2.delete_todo(todos[0].id)
+        assert manager2.delete_todos([todos[0].id, todos[2].id]) == [False, True]
+        assert manager2.get_todo_by_id(todos[0].id) is None
+        assert manager2.get_todo_by_id("nonexistent_id") is None
+        assert manager2.get_user_todos("user1")[0].status == Status.COMPLETED
+
+    def test_sharded_owner_hint_skips_other_shards(self, temp_dir, monkeypatch):
+        """Test that a lookup with an owner hint only reads that shard."""
+        manager = TodoManager(data_dir=temp_dir, storage="sharded")
+        todos = [TodoItem(title=f"Todo {i}", owner=f"user{i}") for i in range(3)]
+        manager.add_todos(todos)
+        manager = TodoManager(data_dir=temp_dir, storage="sharded")
+        monkeypatch.setattr(
+            manager.storage, "_refresh_id_map", lambda: pytest.fail("scanned shards")
+        )
+
+        assert manager.get_todo_by_id("nonexistent_id", owner="user1") is None
+        assert manager.get_todo_by_id(todos[0].id, owner="user1") is None
+        assert manager.get_todo_by_id(todos[1].id, owner="user1").title == "Todo 1"
+        assert manager.mark_as_completed("nonexistent_id", owner="user2") is False
+
+    def test_sharded_update_moves_todo_between_owners(self, temp_dir):
+        """Test that changing a todo's owner moves it to the new shard."""
+        manager = TodoManager(data_dir=temp_dir, storage="sharded")
+        todo = TodoItem(title="Handover", owner="user1")
+        manager.add_todo(todo)
+
+        handed = TodoItem(
+            id=todo.id, title="Handover", owner="user2", created_at=todo.created_at
+        )
+        assert manager.update_todo(todo.id, handed) is True
+        assert manager.get_user_todos("user1") == []
+        assert [t.id for t in manager.get_user_todos("user2")] == [todo.id]
+
+    def test_migrate_json_to_sharded(self, temp_dir):
+        """Test that migration splits todos.json into per-owner shards."""
+        json_manager = TodoManager(data_dir=temp_dir)
+        for i in range(6):
+            json_manager.add_todo(TodoItem(title=f"Todo {i}", owner=f"user{i % 3}"))
+
+        copied, users = migrate_storage(temp_dir, "sharded")
+        assert (copied, users) == (6, 0)
+
+        for owner in ("user0", "user1", "user2"):
+            with open(self._shard_path(temp_dir, owner), "r") as f:
+                assert {todo["owner"] for todo in json.load(f)} == {owner}
+        sharded = TodoManager(data_dir=temp_dir, storage="sharded")
+        assert len(sharded.get_all_todos()) == 6
+        assert len(sharded.get_user_todos("user1")) == 2
+
+    # Durable Save Tests
+
+    def test_interrupted_save_keeps_previous_file(self, temp_dir, monkeypatch):
+        """Test that a save killed mid-write leaves the old todos intact."""
+        manager = TodoManager(data_dir=temp_dir)
+        manager.add_todo(TodoItem(title="Safe", owner="user1"))
+
+        def broken_dumps(obj, pretty=None):
+            # Killed while encoding, after the temp file was created
+            raise KeyboardInterrupt
+
+        monkeypatch.setattr(manager.storage.codec, "dumps", broken_dumps)
+        with pytest.raises(KeyboardInterrupt):
+            manager.add_todo(TodoItem(title="Lost", owner="user1"))
+        monkeypatch.undo()
+
+        assert [t.title for t in manager.get_all_todos()] == ["Safe"]
+        assert [name for name in os.listdir(temp_dir) if name.startswith(".")] == []
+
+    @pytest.mark.parametrize(
+        "durability, expected_fsyncs", [("none", 0), ("file", 1), ("dir", 2)]
+    )
+    def test_durability_levels(
+        self, temp_dir, monkeypatch, durability, expected_fsyncs
+    ):
+        """Test that each durability level performs the matching fsyncs."""
+        manager = TodoManager(data_dir=temp_dir, durability=durability)
+        calls = []
+        original_fsync = os.fsync
+        monkeypatch.setattr(
+            os, "fsync", lambda fd: calls.append(fd) or original_fsync(fd)
+        )
+
+        manager.add_todo(TodoItem(title="Durable", owner="user1"))
+        assert len(calls) == expected_fsyncs
+
+    def test_unknown_durability_level(self, temp_dir):
+        """Test that an unknown durability level is rejected."""
+        with pytest.raises(ValueError):
+            TodoManager(data_dir=temp_dir, durability="paranoid")
+
+    # Concurrency Tests
+
+    def test_compare_and_update(self, todo_manager):
+        """Test that a stale compare-and-swap reports a conflict."""
+        todo = TodoItem(title="Original", owner="user1")
+        todo_manager.add_todo(todo)
+        first = todo_manager.get_todo_by_id(todo.id)
+        second = todo_manager.get_todo_by_id(todo.id)
+
+        first.title = "First"
+        result = todo_manager.compare_and_update(todo.id, first, todo.updated_at)
+        assert result is UpdateResult.UPDATED
+
+        second.title = "Second"
+        result = todo_manager.compare_and_update(todo.id, second, todo.updated_at)
+        assert result is UpdateResult.CONFLICT
+        assert todo_manager.get_todo_by_id(todo.id).title == "First"
+
+        missing = TodoItem(title="Missing", owner="user1")
+        result = todo_manager.compare_and_update(missing.id, missing, "x")
+        assert result is UpdateResult.NOT_FOUND
+
+    def test_mark_as_completed_keeps_concurrent_edit(self, todo_manager, monkeypatch):
+        """Test that mark_as_completed re-reads instead of overwriting an edit."""
+        todo = TodoItem(title="Original", owner="user1")
+        todo_manager.add_todo(todo)
+        original_get = todo_manager.get_todo_by_id
+        edits = []
+
+        def get_then_edit(todo_id, owner=None):
+            found = original_get(todo_id, owner)
+            if not edits:
+                edited = original_get(todo_id, owner)
+                edited.title = "Edited elsewhere"
+                edited.updated_at = "2030-01-01T00:00:00"
+                todo_manager.update_todo(todo_id, edited)
+                edits.append(edited)
+            return found
+
+        monkeypatch.setattr(todo_manager, "get_todo_by_id", get_then_edit)
+        assert todo_manager.mark_as_completed(todo.id) is True
+
+        stored = original_get(todo.id)
+        assert stored.title == "Edited elsewhere"
+        assert stored.status == Status.COMPLETED
+
+    @pytest.mark.skipif(fcntl is None, reason="needs fcntl.flock")
+    @pytest.mark.parametrize("backend", ["json", "journal", "sqlite", "sharded"])
+    def test_concurrent_processes_lose_no_updates(self, temp_dir, backend):
+        """Test that concurrent adds and CAS updates from processes all land."""
+        workers, ops = 4, 10
+        manager = TodoManager(data_dir=temp_dir, storage=backend)
+        counter = TodoItem(title="0", owner="counter")
+        manager.add_todo(counter)
+
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context("fork" if "fork" in methods else None)
+        processes = [
+            context.Process(
+                target=_concurrent_worker,
+                args=(temp_dir, backend, counter.id, w, ops),
+            )
+            for w in range(workers)
+        ]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+            assert process.exitcode == 0
+
+        manager = TodoManager(data_dir=temp_dir, storage=backend)
+        assert manager.get_todo_by_id(counter.id).title == str(workers * ops)
+        assert len(manager.get_all_todos()) == workers * ops + 1
+
+    @pytest.mark.skipif(fcntl is None, reason="needs fcntl.flock")
+    def test_sharded_batches_touching_shards_in_opposite_order(self, temp_dir):
+        """Test that batches in two processes don't deadlock on shard locks."""
+        TodoManager(data_dir=temp_dir, storage="sharded")
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context("fork" if "fork" in methods else None)
+        processes = [
+            context.Process(
+                target=_cross_shard_batch_worker,
+                args=(temp_dir, first, second),
+            )
+            for first, second in (("user1", "user2"), ("user2", "user1"))
+        ]
+        for process in processes:
+            process.start()
+        try:
+            for process in processes:
+                process.join(20)
+                assert process.exitcode == 0
+        finally:
+            for process in processes:
+                process.kill()
+
+        manager = TodoManager(data_dir=temp_dir, storage="sharded")
+        assert len(manager.get_user_todos("user1")) == 2
+        assert len(manager.get_user_todos("user2")) == 2
+
+    # Batch Tests
+
+    def test_add_todos_batch(self, todo_manager):
+        """Test adding several todos in one batch."""
+        todos = [TodoItem(title=f"Todo {i}", owner="user1") for i in range(5)]
+        assert todo_manager.add_todos(todos) == [True] * 5
+        assert [t.title for t in todo_manager.get_user_todos("user1")] == [
+            f"Todo {i}" for i in range(5)
+        ]
+
+    def test_update_delete_and_complete_many(self, todo_manager):
+        """Test the batch update, delete and complete methods' per-item results."""
+        todos = [TodoItem(title=f"Todo {i}", owner="user1") for i in range(4)]
+        todo_manager.add_todos(todos)
+
+        renamed = [
+            TodoItem(id=todos[0].id, title="Renamed", owner="user1"),
+            TodoItem(id="nonexistent_id", title="Ghost", owner="user1"),
+        ]
+        assert todo_manager.update_todos(renamed) == [True, False]
+        assert todo_manager.mark_many_completed([todos[1].id, "nonexistent_id"]) == [
+            True,
+            False,
+        ]
+        assert todo_manager.delete_todos(
+            [todos[2].id, "nonexistent_id", todos[3].id]
+        ) == [True, False, True]
+
+        remaining = todo_manager.get_user_todos("user1")
+        assert [t.title for t in remaining] == ["Renamed", "Todo 1"]
+        assert remaining[1].status == Status.COMPLETED
+
+    def test_batch_persists_once(self, temp_dir, monkeypatch):
+        """Test that a batch writes todos.json a single time on exit."""
+        manager = TodoManager(data_dir=temp_dir)
+        writes = []
+        original_write = manager.storage._write
+        monkeypatch.setattr(
+            manager.storage,
+            "_write",
+            lambda todos: writes.append(1) or original_write(todos),
+        )
+
+        with manager.batch():
+            for i in range(10):
+                manager.add_todo(TodoItem(title=f"Todo {i}", owner="user1"))
+            assert len(manager.get_user_todos("user1")) == 10
+            assert writes == []
+
+        assert writes == [1]
+        assert len(TodoManager(data_dir=temp_dir).get_all_todos()) == 10
+
+    @pytest.mark.parametrize("backend", ["json", "journal", "sqlite", "sharded"])
+    @pytest.mark.parametrize("cache", [False, True])
+    def test_batch_rolls_back_on_exception(self, temp_dir, backend, cache):
+        """Test that a failing batch leaves the stored todos unchanged."""
+        manager = TodoManager(data_dir=temp_dir, storage=backend, cache=cache)
+        kept = TodoItem(title="Kept", owner="user1")
+        manager.add_todo(kept)
+
+        with pytest.raises(RuntimeError), manager.batch():
+            manager.add_todo(TodoItem(title="Discarded", owner="user2"))
+            manager.mark_as_completed(kept.id)
+            manager.delete_todo(kept.id)
+            raise RuntimeError("abort")
+
+        for reader in (manager, TodoManager(data_dir=temp_dir, storage=backend)):
+            todos = reader.get_all_todos()
+            assert [t.title for t in todos] == ["Kept"]
+            assert todos[0].status == Status.PENDING
+
+    # Streaming Tests
+    @pytest.mark.parametrize("backend", ["json", "journal", "sqlite", "sharded"])
+    def test_iter_todos_filters_by_owner_and_status(self, temp_dir, backend):
+        """Test that iter_todos yields only the matching todos, in order."""
+        manager = TodoManager(data_dir=temp_dir, storage=backend)
+        todos = [TodoItem(title=f"Todo {i}", owner=f"user{i % 2}") for i in range(6)]
+        for todo in todos:
+            manager.add_todo(todo)
+        manager.mark_as_completed(todos[2].id)
+
+        # Sharded storage groups records by shard, so only compare membership
+        assert sorted(t.id for t in manager.iter_todos()) == sorted(t.id for t in todos)
+        assert [t.id for t in manager.iter_todos(owner="user0")] == [
+            todos[0].id,
+            todos[2].id,
+            todos[4].id,
+        ]
+        completed = list(manager.iter_todos(owner="user0", status=Status.COMPLETED))
+        assert [t.id for t in completed] == [todos[2].id]
+        assert completed[0].status == Status.COMPLETED
+        assert list(manager.iter_todos(owner="nobody")) == []
+
+    @pytest.mark.parametrize("chunk_size", [1, 7, 64 * 1024])
+    def test_iter_json_array_across_chunk_boundaries(self, chunk_size):
+        """Test that elements split over chunks decode like json.load."""
+        data = [{"title": "a, [b] {c}", "n": 12345}, 678, 'x"]', [], {"nested": [1, 2]}]
+        text = json.dumps(data, indent=2)
+        assert list(_iter_json_array(io.StringIO(text), chunk_size)) == data
+        assert list(_iter_json_array(io.StringIO(" [ ] "), chunk_size)) == []
+
+    @pytest.mark.parametrize("chunk_size", [1, 2, 3, 5])
+    def test_iter_json_array_numbers_split_across_chunks(self, chunk_size):
+        """Test that numbers cut by a chunk boundary aren't read truncated."""
+        text = "[1, null, 0.1, -2.5e3, 12345678 , true,1e-2]"
+        assert list(_iter_json_array(io.StringIO(text), chunk_size)) == json.loads(text)
+        assert list(_iter_json_array(io.StringIO("[1, 0."), chunk_size)) == [1]
+
+    def test_iter_json_array_stops_on_malformed_input(self):
+        """Test that truncated or invalid files end iteration quietly."""
+        assert list(_iter_json_array(io.StringIO('[{"a": 1}, {"b"'), 4)) == [{"a": 1}]
+        assert list(_iter_json_array(io.StringIO("not json"), 4)) == []
+        assert list(_iter_json_array(io.StringIO(""), 4)) == []
+
+    def test_iter_todos_memory_is_bounded(self, temp_dir):
+        """Test that streaming a large file never holds the whole list."""
+        import tracemalloc
+
+        manager = TodoManager(data_dir=temp_dir)
+        manager.storage.save(
+            [
+                {
+                    "id": f"id-{i}",
+                    "title": f"Todo {i}",
+                    "details": "x" * 200,
+                    "priority": "MID",
+                    "status": "PENDING",
+                    "owner": f"user{i % 10}",
+                    "created_at": "2024-01-01T00:00:00",
+                    "updated_at": "2024-01-01T00:00:00",
+                }
+                for i in range(10_000)
+            ]
+        )
+        file_size = os.path.getsize(manager.todos_file_path)
+
+        tracemalloc.start()
+        try:
+            count = sum(1 for _ in manager.iter_todos(owner="user3"))
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        assert count == 1000
+        assert peak < file_size / 5
+
+    # TodoItem Representation Tests
+    def test_todo_item_is_slotted_with_interned_owner(self):
+        """Test that items carry no __dict__ and share owner strings."""
+        owner = "user" + str(1)  # built at runtime, so not interned yet
+        first = TodoItem(title="A", owner=owner)
+        second = TodoItem(title="B", owner="user1")
+
+        assert not hasattr(first, "__dict__")
+        assert first.owner is second.owner
+        assert first.id != second.id
+        assert TodoItem(id=None).id
+
+    def test_records_missing_optional_fields_load(self, temp_dir):
+        """Test that records without optional fields get the TodoItem defaults."""
+        with open(os.path.join(temp_dir, "todos.json"), "w") as f:
+            json.dump(
+                [
+                    {"id": "old", "title": "Old", "owner": "user1"},
+                    {
+                        "id": "dated",
+                        "title": "Dated",
+                        "priority": "HIGH",
+                        "owner": "user1",
+                        "created_at": "2023-01-01T00:00:00",
+                    },
+                ],
+                f,
+            )
+        manager = TodoManager(data_dir=temp_dir)
+
+        old, dated = manager.get_user_todos("user1")
+        assert (old.details, old.priority, old.status) == (
+            "",
+            Priority.MID,
+            Status.PENDING,
+        )
+        assert old.created_at == old.updated_at
+        datetime.fromisoformat(old.created_at)
+        assert dated.priority == Priority.HIGH
+        assert dated.created_at == "2023-01-01T00:00:00"
+        datetime.fromisoformat(dated.updated_at)
+        assert manager.get_todo_by_id("old").title == "Old"
+        assert [t.id for t in manager.get_all_todos()] == ["old", "dated"]
+
+    def test_todo_item_keeps_dataclass_behaviour(self):
+        """Test that replace, asdict, fields and repr see the timestamps."""
+        todo = TodoItem(
+            title="Original",
+            owner="user1",
+            created_at="2023-01-01T00:00:00",
+            updated_at="2023-01-02T00:00:00",
+        )
+
+        renamed = dataclasses.replace(todo, title="Renamed")
+        assert renamed.title == "Renamed"
+        assert (renamed.id, renamed.created_at, renamed.updated_at) == (
+            todo.id,
+            "2023-01-01T00:00:00",
+            "2023-01-02T00:00:00",
+        )
+        assert dataclasses.replace(todo) == todo
+        assert [f.name for f in dataclasses.fields(TodoItem)] == [
+            "id",
+            "title",
+            "details",
+            "priority",
+            "status",
+            "owner",
+            "created_at",
+            "updated_at",
+        ]
+        assert dataclasses.asdict(todo) == {
+            "id": todo.id,
+            "title": "Original",
+            "details": "",
+            "priority": Priority.MID,
+            "status": Status.PENDING,
+            "owner": "user1",
+            "created_at": "2023-01-01T00:00:00",
+            "updated_at": "2023-01-02T00:00:00",
+        }
+        assert "created_at='2023-01-01T00:00:00'" in repr(todo)
+        assert "updated_at='2023-01-02T00:00:00'" in repr(todo)
+
+    @pytest.mark.parametrize(
+        "timestamp",
+        [
+            "2023-01-01T00:00:00",
+            "2023-01-01T12:34:56.789012",
+            "1969-12-31T23:59:59.999999",
+            "2023-01-01T00:00:00+02:00",
+            "2023-01-01",
+            "2023-01-01 12:34:56",
+            "2023-01-01T12:34:56.000000",
+            "2023-01-01T12:34:56.123",
+            "2023-W01-1T12:34:56",
+            "2023-01-01T123456.0",
+            "not a timestamp",
+        ],
+    )
+    def test_todo_item_timestamps_round_trip_exactly(self, timestamp):
+        """Test that any timestamp string reads back unchanged."""
+        todo = TodoItem(created_at=timestamp, updated_at=timestamp)
+        assert todo.created_at == timestamp
+        assert todo.updated_at == timestamp
+
+        todo.updated_at = "2030-01-01T00:00:00"
+        assert todo.updated_at == "2030-01-01T00:00:00"
+        assert todo == TodoItem(
+            id=todo.id,
+            created_at=timestamp,
+            updated_at="2030-01-01T00:00:00",
+        )
+
+    def test_decode_and_encode_round_trip(self):
+        """Test that the record codec matches the public constructor."""
+        record = {
+            "id": "todo-1",
+            "title": "Title",
+            "details": "Details",
+            "priority": "HIGH",
+            "status": "COMPLETED",
+            "owner": "user1",
+            "created_at": "2023-01-01T00:00:00",
+            "updated_at": "2023-01-02T03:04:05.000006+00:00",
+        }
+        todo = _decode_todo(record)
+
+        assert todo == TodoItem(
+            id="todo-1",
+            title="Title",
+            details="Details",
+            priority=Priority.HIGH,
+            status=Status.COMPLETED,
+            owner="user1",
+            created_at="2023-01-01T00:00:00",
+            updated_at="2023-01-02T03:04:05.000006+00:00",
+        )
+        assert _encode_todo(todo) == record
+
+    # JSON Codec Tests
+    @pytest.mark.parametrize("writer", sorted(JSON_CODECS))
+    @pytest.mark.parametrize("pretty", [True, False])
+    @pytest.mark.parametrize("backend", ["json", "journal"])
+    def test_files_are_readable_by_every_codec(self, temp_dir, writer, pretty, backend):
+        """Test that any codec reads what any other wrote, pretty or compact."""
+        manager = TodoManager(
+            data_dir=temp_dir, storage=backend, codec=writer, pretty=pretty
+        )
+        todo = TodoItem(title="Caf\u00e9 \u2615", details="a/b", owner="user1")
+        manager.add_todo(todo)
+        manager.storage.save(manager.storage.load())  # fold the journal in
+
+        with open(manager.todos_file_path, "rb") as f:
+            assert (b"\n" in f.read()) is pretty
+        for reader in sorted(JSON_CODECS):
+            todos = TodoManager(
+                data_dir=temp_dir, storage=backend, codec=reader
+            ).get_all_todos()
+            assert todos == [todo]
+
+    def test_unknown_codec_raises(self, temp_dir):
+        """Test that asking for a codec that isn't available fails loudly."""
+        with pytest.raises(ValueError, match="JSON codec"):
+            TodoManager(data_dir=temp_dir, codec="simdjson")
+
+    # Columnar Snapshot Tests
+    def test_snapshot_round_trips_todos(self, temp_dir):
+        """Test that a snapshot yields the same todos as the storage."""
+        manager = TodoManager(data_dir=temp_dir)
+        manager.add_todo(TodoItem(title="Café", details="x" * 100, owner="alice"))
+        manager.add_todo(
+            TodoItem(owner="bob", created_at="2023-01-01T00:00:00+02:00", updated_at="")
+        )
+        path = manager.write_snapshot()
+
+        assert os.path.basename(path) == "todos.snapshot"
+        with manager.open_snapshot() as snapshot:
+            assert len(snapshot) == 2
+            assert list(snapshot.iter_todos()) == manager.get_all_todos()
+
+    def test_snapshot_counts_without_decoding_strings(self, temp_dir, monkeypatch):
+        """Test that filtering and counting only read the code columns."""
+        from src.models import ColumnarSnapshot
+
+        manager = TodoManager(data_dir=temp_dir)
+        todos = [
+            TodoItem(
+                title=f"Todo {i}",
+                owner=f"user{i % 3}",
+                priority=[Priority.HIGH, Priority.MID, Priority.LOW][i % 3],
+            )
+            for i in range(12)
+        ]
+        manager.add_todos(todos)
+        manager.mark_many_completed([todo.id for todo in todos[:5]])
+        manager.write_snapshot()
+
+        with manager.open_snapshot() as snapshot:
+            monkeypatch.setattr(ColumnarSnapshot, "_string", None)
+            assert snapshot.count() == 12
+            assert snapshot.count(status=Status.COMPLETED) == 5
+            assert snapshot.count(status=Status.PENDING, priority=Priority.HIGH) == 2
+            assert snapshot.count_by("status") == {
+                Status.PENDING: 7,
+                Status.COMPLETED: 5,
+            }
+            monkeypatch.undo()
+
+            assert snapshot.count(owner="user1", status=Status.COMPLETED) == 2
+            assert [t.id for t in snapshot.iter_todos(priority=Priority.LOW)] == [
+                todos[i].id for i in (2, 5, 8, 11)
+            ]
+
+    def test_snapshot_rejects_other_files(self, temp_dir):
+        """Test that opening a non-snapshot file raises ValueError."""
+        manager = TodoManager(data_dir=temp_dir)
+        with pytest.raises(ValueError, match="snapshot"):
+            manager.open_snapshot(manager.todos_file_path)
+
+    # Query Tests
+    def _seed_query_todos(self, manager):
+        todos = []
+        for i in range(9):
+            todo = TodoItem(
+                title=f"Todo {i}",
+                owner=f"user{i % 2}",
+                priority=[Priority.LOW, Priority.HIGH, Priority.MID][i % 3],
+                created_at=f"2024-01-0{i + 1}T00:00:00",
+            )
+            manager.add_todo(todo)
+            todos.append(todo)
+        for todo in todos[:4]:
+            manager.mark_as_completed(todo.id)
+        return todos
+
+    def test_query_filters(self, todo_manager):
+        """Test that every filter is applied and combined."""
+        todos = self._seed_query_todos(todo_manager)
+
+        def titles(query):
+            return [t.title for t in query]
+
+        assert titles(todo_manager.query(owner="user0")) == [
+            "Todo 0",
+            "Todo 2",
+            "Todo 4",
+            "Todo 6",
+            "Todo 8",
+        ]
+        assert titles(todo_manager.query(owner="user0", status=Status.PENDING)) == [
+            "Todo 4",
+            "Todo 6",
+            "Todo 8",
+        ]
+        assert titles(todo_manager.query(priority=Priority.HIGH)) == [
+            "Todo 1",
+            "Todo 4",
+            "Todo 7",
+        ]
+        assert titles(todo_manager.query(created_after=todos[6].created_at)) == [
+            "Todo 7",
+            "Todo 8",
+        ]
+        assert titles(todo_manager.query(created_after=datetime(2024, 1, 8, 12))) == [
+            "Todo 8"
+        ]
+
+    def test_query_order_limit_offset(self, todo_manager):
+        """Test ordering and pagination, including descending order."""
+        self._seed_query_todos(todo_manager)
+
+        def titles(query):
+            return [t.title for t in query]
+
+        assert titles(todo_manager.query(order_by="-created_at", limit=3)) == [
+            "Todo 8",
+            "Todo 7",
+            "Todo 6",
+        ]
+        assert titles(todo_manager.query(order_by="priority", limit=4, offset=2)) == [
+            "Todo 7",
+            "Todo 2",
+            "Todo 5",
+            "Todo 8",
+        ]
+        assert titles(todo_manager.query(offset=7)) == ["Todo 7", "Todo 8"]
+        assert todo_manager.query(order_by="-title").first().title == "Todo 8"
+
+        with pytest.raises(ValueError):
+            todo_manager.query(order_by="owner")
+        with pytest.raises(ValueError):
+            todo_manager.query(limit=-1)
+
+    def test_query_count(self, todo_manager):
+        """Test that count() matches the number of todos a query yields."""
+        self._seed_query_todos(todo_manager)
+
+        assert todo_manager.query().count() == 9
+        assert todo_manager.query(owner="user1", status=Status.COMPLETED).count() == 2
+        assert todo_manager.query(offset=7).count() == 2
+        assert todo_manager.query(limit=3, offset=8).count() == 1
+        assert todo_manager.query(owner="nobody", limit=1).count() == 0
+
+    def test_query_is_lazy(self, todo_manager):
+        """Test that building a query reads nothing until it is used."""
+        self._seed_query_todos(todo_manager)
+        query = todo_manager.query(owner="user0")
+
+        todo_manager.add_todo(TodoItem(title="Late", owner="user0"))
+        assert query.count() == 6
+        assert query.all()[-1].title == "Late"
+
+    # Search Tests
+    def test_search_prefix_and_multi_term(self, todo_manager):
+        """Test that every term must prefix-match a word of the todo."""
+        milk = TodoItem(title="Buy groceries", details="milk, eggs", owner="user1")
+        bread = TodoItem(title="Buy bread", details="Wholegrain", owner="user1")
+        other = TodoItem(title="Buy groceries", details="milk", owner="user2")
+        todo_manager.add_todos([milk, bread, other])
+
+        assert todo_manager.search("user1", "buy") == [milk, bread]
+        assert todo_manager.search("user1", "GRO mil") == [milk]
+        assert todo_manager.search("user1", "whole") == [bread]
+        assert todo_manager.search("user1", "gro bread") == []
+        assert todo_manager.search("user1", "  ") == []
+        assert todo_manager.search("user3", "buy") == []
+
+    def test_search_index_follows_changes(self, todo_manager):
+        """Test that adds, edits and deletes update the index incrementally."""
+        todo = TodoItem(title="Draft report", owner="user1")
+        todo_manager.add_todo(todo)
+        assert todo_manager.search("user1", "draft") == [todo]
+
+        todo.title = "Final report"
+        todo_manager.update_todo(todo.id, todo)
+        assert todo_manager.search("user1", "draft") == []
+        assert todo_manager.search("user1", "final")[0].title == "Final report"
+
+        todo_manager.delete_todo(todo.id)
+        assert todo_manager.search("user1", "report") == []
+
+        with open(todo_manager.search_index.path) as f:
+            # Built by the first search, then one line per change
+            assert [json.loads(line)["op"] for line in f] == ["add", "add", "delete"]
+
+    def test_search_index_is_shared_and_persisted(self, temp_dir):
+        """Test that another manager sees appended changes without a rebuild."""
+        first = TodoManager(data_dir=temp_dir)
+        first.add_todo(TodoItem(title="Alpha", owner="user1"))
+        assert [t.title for t in first.search("user1", "alp")] == ["Alpha"]
+
+        second = TodoManager(data_dir=temp_dir)
+        assert [t.title for t in second.search("user1", "alpha")] == ["Alpha"]
+        second.add_todo(TodoItem(title="Alphabet", owner="user1"))
+        assert [t.title for t in first.search("user1", "alpha")] == [
+            "Alpha",
+            "Alphabet",
+        ]
+
+    def test_search_index_skips_rolled_back_batches(self, todo_manager):
+        """Test that a failed batch leaves no trace in the index."""
+        kept = TodoItem(title="Kept", owner="user1")
+        todo_manager.add_todo(kept)
+        todo_manager.search("user1", "kept")  # builds the index
+
+        with pytest.raises(RuntimeError), todo_manager.batch():
+            todo_manager.add_todo(TodoItem(title="Discarded", owner="user1"))
+            todo_manager.delete_todo(kept.id)
+            raise RuntimeError("abort")
+
+        assert todo_manager.search_index.search("user1", "discarded", list) == set()
+        assert todo_manager.search("user1", "kept") == [kept]
+
+    def test_search_ignores_stale_index_entries(self, todo_manager):
+        """Test that hits are re-checked against the stored todos."""
+        todo = TodoItem(title="Stale", owner="user1")
+        todo_manager.add_todo(todo)
+        todo_manager.search("user1", "stale")
+
+        # Changed behind the manager's back, so the index still says "stale"
+        todo.title = "Fresh"
+        todo_manager.storage.replace(todo.id, _encode_todo(todo))
+        assert todo_manager.search("user1", "stale") == []
+
+        todo_manager.search_index.build(todo_manager.storage.iter_records())
+        assert todo_manager.search("user1", "fresh") == [todo]
+
+    # Data Version Tests
+    @pytest.mark.parametrize("backend", ["json", "journal", "sqlite", "sharded"])
+    def test_data_version_moves_only_on_writes(self, temp_dir, backend):
+        """Test that data_version changes on local and external writes only."""
+        manager = TodoManager(data_dir=temp_dir, storage=backend)
+        other = TodoManager(data_dir=temp_dir, storage=backend)
+        todo = TodoItem(title="Versioned", owner="user1")
+
+        before = manager.data_version("user1")
+        manager.add_todo(todo)
+        after_add = manager.data_version("user1")
+        assert after_add != before
+
+        manager.get_user_todos("user1")
+        manager.query(owner="user1").count()
+        assert manager.data_version("user1") == after_add
+
+        other.mark_as_completed(todo.id)
+        assert manager.data_version("user1") != after_add
+        assert manager.data_version() != before
+
+    # Import/Export Tests
+    @pytest.mark.parametrize("format", ["jsonl", "csv"])
+    def test_export_import_round_trip(self, todo_manager, temp_dir, format):
+        """Test that exported todos import unchanged into another store."""
+        todos = [
+            TodoItem(title="Plain", owner="user1"),
+            TodoItem(title='Quotes "and", commas', details="two\nlines", owner="user1"),
+            TodoItem(title="Other", priority=Priority.LOW, owner="user2"),
+        ]
+        todos[1].status = Status.COMPLETED
+        todo_manager.add_todos(todos)
+
+        f = io.StringIO(newline="")
+        assert todo_manager.export_stream(f, format, owner="user1") == 2
+        f.seek(0)
+        os.makedirs(os.path.join(temp_dir, "copy"))
+        target = TodoManager(data_dir=os.path.join(temp_dir, "copy"))
+        assert target.import_stream(f, format) == 2
+
+        assert [t.to_dict() for t in target.get_all_todos()] == [
+            t.to_dict() for t in todos[:2]
+        ]
+
+    def test_import_validates_and_fills_defaults(self, todo_manager):
+        """Test enum validation and generated ids and timestamps."""
+        rows = io.StringIO(
+            "title,priority,status,created_at\n"
+            "Lower,high,completed,2024-01-02T03:04:05\n"
+            "Defaults,,,\n"
+            "Bad priority,URGENT,,\n"
+            ",LOW,,\n"
+            "Bad date,,,yesterday\n",
+            newline="",
+        )
+        errors = []
+        count = todo_manager.import_stream(
+            rows, "csv", owner="user1", on_error=lambda *e: errors.append(e)
+        )
+
+        assert count == 2
+        assert errors == [
+            (4, "Invalid priority: 'URGENT'"),
+            (5, "Missing title"),
+            (6, "Invalid created_at: 'yesterday'"),
+        ]
+        lower, defaults = todo_manager.get_user_todos("user1")
+        assert lower.priority == Priority.HIGH
+        assert lower.status == Status.COMPLETED
+        assert lower.created_at == lower.updated_at == "2024-01-02T03:04:05"
+        assert defaults.priority == Priority.MID
+        assert defaults.status == Status.PENDING
+        assert lower.id and defaults.id and lower.id != defaults.id
+        datetime.fromisoformat(defaults.created_at)
+
+    def test_import_without_on_error_raises(self, todo_manager):
+        """Test that an invalid record raises with its line number."""
+        lines = io.StringIO('{"title": "Kept", "owner": "user1"}\nnot json\n')
+        with pytest.raises(ValueError, match="^line 2: "):
+            todo_manager.import_stream(lines, chunk_size=1)
+        with pytest.raises(ValueError, match="Missing owner"):
+            todo_manager.import_stream(io.StringIO('{"title": "No owner"}\n'))
+        with pytest.raises(ValueError, match="^line 1: Expected an object$"):
+            todo_manager.import_stream(io.StringIO('["not", "a", "todo"]\n'))
+        with pytest.raises(ValueError, match="^line 1: id must be a string$"):
+            todo_manager.import_stream(
+                io.StringIO('{"id": 5, "title": "T"}\n'), owner="u"
+            )
+        with pytest.raises(ValueError, match="Unknown format"):
+            todo_manager.import_stream(io.StringIO(""), "xml")
+        assert [t.title for t in todo_manager.get_all_todos()] == ["Kept"]
+
+    def test_import_replaces_own_ids_only(self, todo_manager):
+        """Test that an existing id is replaced for its owner, else rejected."""
+        todo = TodoItem(title="Before", owner="user1")
+        todo_manager.add_todo(todo)
+        line = json.dumps({"id": todo.id, "title": "After"}) + "\n"
+        errors = []
+
+        todo_manager.import_stream(io.StringIO(line), owner="user1")
+        todo_manager.import_stream(
+            io.StringIO(line), owner="user2", on_error=lambda *e: errors.append(e)
+        )
+
+        assert todo_manager.get_todo_by_id(todo.id).title == "After"
+        assert len(todo_manager.get_all_todos()) == 1
+        assert errors == [(1, f"Id {todo.id!r} belongs to another user")]
+
+    @pytest.mark.parametrize("chunk_size", [0, -1])
+    def test_import_rejects_chunk_size_below_one(self, todo_manager, chunk_size):
+        """Test that a chunk size that could never finish is rejected."""
+        with pytest.raises(ValueError, match="chunk_size"):
+            todo_manager.import_stream(io.StringIO(""), chunk_size=chunk_size)
+
+    def test_import_looks_up_given_ids_once_per_chunk(self, todo_manager, monkeypatch):
+        """Test that only ids from the input are looked up, a chunk at a time."""
+        todo = TodoItem(title="Before", owner="user1")
+        todo_manager.add_todo(todo)
+        lookups = []
+        original_get_many = todo_manager.storage.get_many
+
+        def recording_get_many(todo_ids, owner=None):
+            todo_ids = list(todo_ids)
+            lookups.append(todo_ids)
+            return original_get_many(todo_ids, owner)
+
+        monkeypatch.setattr(todo_manager.storage, "get_many", recording_get_many)
+        monkeypatch.setattr(
+            todo_manager.storage, "get", lambda *a, **k: pytest.fail("looked up")
+        )
+        lines = [
+            {"title": "New"},
+            {"id": todo.id, "title": "After"},
+            {"id": "given", "title": "First"},
+            {"id": "given", "title": "Second"},
+        ]
+        count = todo_manager.import_stream(
+            io.StringIO("".join(json.dumps(line) + "\n" for line in lines)),
+            owner="user1",
+            chunk_size=3,
+        )
+
+        assert count == 4
+        assert lookups == [[todo.id, "given"], ["given"]]
+        monkeypatch.undo()
+        assert todo_manager.get_todo_by_id(todo.id).title == "After"
+        assert todo_manager.get_todo_by_id("given").title == "Second"
+        assert len(todo_manager.get_all_todos()) == 3
+
+    def test_sharded_import_rereads_only_changed_shards(self, temp_dir, monkeypatch):
+        """Test that id lookups on a miss only read shards that changed."""
+        manager = TodoManager(data_dir=temp_dir, storage="sharded")
+        todos = [TodoItem(title=f"Todo {i}", owner=f"user{i}") for i in range(3)]
+        manager.add_todos(todos)
+        manager = TodoManager(data_dir=temp_dir, storage="sharded")
+        storage = manager.storage
+        read = []
+        original_shard = storage._shard
+
+        def recording_shard(name, join=True):
+            if not join:
+                read.append(name)
+            return original_shard(name, join)
+
+        monkeypatch.setattr(storage, "_shard", recording_shard)
+        line = json.dumps({"id": todos[1].id, "title": "Taken"}) + "\n"
+        errors = []
+        manager.import_stream(
+            io.StringIO(line), owner="user0", on_error=lambda *e: errors.append(e)
+        )
+        assert errors == [(1, f"Id {todos[1].id!r} belongs to another user")]
+        assert len(read) == 3
+
+        read.clear()
+        assert manager.get_todo_by_id("nonexistent_id") is None
+        assert read == []
+
+        TodoManager(data_dir=temp_dir, storage="sharded").add_todo(
+            TodoItem(id="elsewhere", title="Elsewhere", owner="user2")
+        )
+        assert manager.get_todo_by_id("elsewhere").title == "Elsewhere"
+        assert read == [storage.shard_name("user2")]
+
+    def test_import_commits_in_chunks(self, temp_dir, monkeypatch):
+        """Test that each chunk is one save and progress follows the chunks."""
+        manager = TodoManager(data_dir=temp_dir)
+        saves = []
+        original_save = manager.storage.save
+
+        def counting_save(todos):
+            saves.append(len(todos))
+            original_save(todos)
+
+        monkeypatch.setattr(manager.storage, "save", counting_save)
+        lines = io.StringIO("".join(f'{{"title": "T{i}"}}\n' for i in range(25)))
+        progress = []
+
+        count = manager.import_stream(
+            lines,
+            owner="user1",
+            chunk_size=10,
+            progress=lambda done, rate: progress.append((done, rate > 0)),
+        )
+
+        assert count == 25
+        assert saves == [10, 20, 25]
+        assert progress == [(10, True), (20, True), (25, True)]
+
+        out = io.StringIO()
+        exported = []
+        manager.export_stream(
+            out, chunk_size=10, progress=lambda n, _: exported.append(n)
+        )
+        assert exported == [10, 20, 25]
+        assert len(out.getvalue().splitlines()) == 25
+
+    # Async Manager Tests
+    def test_async_adds_are_group_committed(self, temp_dir, monkeypatch):
+        """Test that concurrent async adds share one save."""
+        manager = TodoManager(data_dir=temp_dir)
+        saves = []
+        original_save = manager.storage.save
+
+        def counting_save(todos):
+            saves.append(len(todos))
+            original_save(todos)
+
+        monkeypatch.setattr(manager.storage, "save", counting_save)
+        todos = [TodoItem(title=f"Todo {i}", owner="user1") for i in range(50)]
+
+        async def run():
+            async with AsyncTodoManager(manager) as async_manager:
+                results = await asyncio.gather(*map(async_manager.add_todo, todos))
+                return results, await async_manager.get_user_todos("user1")
+
+        results, stored = asyncio.run(run())
+        assert results == [True] * 50
+        assert saves == [50]
+        assert [t.id for t in stored] == [t.id for t in todos]
+
+    @pytest.mark.parametrize("backend", ["json", "journal"])
+    def test_loaded_records_are_not_changed_by_later_writes(self, temp_dir, backend):
+        """Test that load() never hands out the shared cached list."""
+        manager = TodoManager(data_dir=temp_dir, storage=backend, cache=True)
+        todos = [TodoItem(title=f"Todo {i}", owner="user1") for i in range(3)]
+        manager.add_todos(todos)
+
+        records = manager.storage.load()
+        manager.delete_todo(todos[1].id)
+        with manager.batch():
+            in_batch = manager.storage.load()
+            manager.delete_todo(todos[2].id)
+
+        assert [record["title"] for record in records] == ["Todo 0", "Todo 1", "Todo 2"]
+        assert [record["title"] for record in in_batch] == ["Todo 0", "Todo 2"]
+
+    def test_async_reads_race_group_committed_deletes(self, temp_dir):
+        """Test that reads running alongside deletes see whole lists."""
+        manager = TodoManager(data_dir=temp_dir, cache=True)
+        todos = [TodoItem(title=f"Todo {i}", owner="user1") for i in range(5000)]
+        manager.add_todos(todos)
+
+        async def run():
+            async with AsyncTodoManager(manager, commit_window=0) as async_manager:
+                # The newest todos are decoded last, so deleting them is most
+                # likely to overlap a read still in progress
+                for todo in reversed(todos[-20:]):
+                    before, deleted, _ = await asyncio.gather(
+                        async_manager.get_all_todos(),
+                        async_manager.delete_todo(todo.id),
+                        async_manager.get_user_todos("user1"),
+                    )
+                    assert deleted is True
+                    assert None not in before
+
+        asyncio.run(run())
+        assert len(manager.get_all_todos()) == 4980
+
+    def test_async_group_errors_reach_the_callers(self, todo_manager, monkeypatch):
+        """Test that storage errors fail one caller and other errors the group."""
+        original_add = todo_manager.add_todo
+
+        def add_todo(todo):
+            if todo.title == "Bad":
+                raise ValueError("bad todo")
+            if todo.title == "Bug":
+                raise RuntimeError("bug")
+            return original_add(todo)
+
+        monkeypatch.setattr(todo_manager, "add_todo", add_todo)
+
+        async def run(*titles):
+            async with AsyncTodoManager(todo_manager) as async_manager:
+                return await asyncio.wait_for(
+                    asyncio.gather(
+                        *(
+                            async_manager.add_todo(TodoItem(title=t, owner="user1"))
+                            for t in titles
+                        ),
+                        return_exceptions=True,
+                    ),
+                    timeout=10,
+                )
+
+        kept, bad = asyncio.run(run("Kept", "Bad"))
+        assert kept is True
+        assert isinstance(bad, ValueError)
+        lost, bug = asyncio.run(run("Lost", "Bug"))
+        assert isinstance(lost, RuntimeError) and isinstance(bug, RuntimeError)
+        assert [t.title for t in todo_manager.get_all_todos()] == ["Kept"]
+
+    def test_async_mutations_keep_sync_results(self, todo_manager):
+        """Test that each caller in a group gets the sync method's result."""
+        todo = TodoItem(title="Async", owner="user1")
+        todo_manager.add_todo(todo)
+
+        async def run():
+            async with AsyncTodoManager(todo_manager) as async_manager:
+                return await asyncio.gather(
+                    async_manager.mark_as_completed(todo.id),
+                    async_manager.mark_as_completed("missing"),
+                    async_manager.compare_and_update(todo.id, todo, "stale"),
+                    async_manager.get_todo_by_id(todo.id),
+                )
+
+        completed, missing, conflict, fetched = asyncio.run(run())
+        assert completed is True
+        assert missing is False
+        assert conflict is UpdateResult.CONFLICT
+        assert fetched is not None
+        assert todo_manager.get_todo_by_id(todo.id).status == Status.COMPLETED